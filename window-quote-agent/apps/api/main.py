@@ -6,20 +6,56 @@ FastAPI Demo：供测试 Agent 的聊天接口。
 请求示例：
   curl -X POST http://localhost:8001/chat -H "Content-Type: application/json" -d '{"message": "我想装窗户"}'
   多轮对话需传 session_id，以便服务端保留 flow_stage、current_intent、requirements 等状态。
+  同一 session 的请求串行执行；客户端重试时带上相同 session_id 与 idempotency_key，会复用进行中/已完成的结果而不重复跑图。
+  流式（SSE）：POST /chat/stream，请求体同 /chat，逐步推送 thinking / token / done 事件。
+  表单报价：POST /quote，直接传 w/h/opening_count/model（或 series_id），不经过对话流程、零 LLM 调用：
+    curl -X POST http://localhost:8001/quote -H "Content-Type: application/json" -d '{"w": 1.5, "h": 1.2, "series_id": "65"}'
+
+会话状态默认按轮写入 SESSION_STORE_URL 的会话存储（TTL / LRU 预算）；设置 CHECKPOINTER_URL（memory:// / sqlite:///…）
+时改由 LangGraph checkpointer 按 session_id（thread_id）逐步持久化，每轮结束后按 CHECKPOINT_* 清理旧的 checkpoint 与会话。
+
+启动时在后台预热（构建图、加载 BM25 索引、price.json、全部 prompt 模板）；
+/health 为存活探针，/ready 在预热完成前返回 503，供滚动发布判断是否可接流量。
 
 max_step：通过环境变量 MAX_STEP 设置（整数），超过该步数自动结束；不设则不限制。
 """
+import asyncio
+import json
 import os
+import threading
 import uuid
 from contextlib import asynccontextmanager
 from typing import Any
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-# 按 session 持久化上一轮图状态，使报价流程中 flow_stage/current_intent 等能延续（生产环境可改为 Redis/DB）
-_session_store: dict[str, dict[str, Any]] = {}
+from apps.api.routers.health import readiness
+from apps.api.routers.health import router as health_router
+from apps.api.routers.metrics import router as metrics_router
+from apps.api.routers.quote import router as quote_router
+from packages.agent.streaming import REPLY_START_CALLBACK_KEY, TOKEN_CALLBACK_KEY
+from packages.agent.state import ReplaceList
+from packages.memory import (
+    RequestCoalescer,
+    SessionLocks,
+    close_checkpointer,
+    create_checkpoint_retention,
+    create_session_store,
+    open_checkpointer,
+    thread_config,
+)
+from packages.observability.metrics import metrics
+
+# 按 session 持久化上一轮图状态，使报价流程中 flow_stage/current_intent 等能延续。
+# 后端由 SESSION_STORE_URL 决定（memory:// / sqlite:/// / redis://），多 worker 部署时用 sqlite 或 redis 共享
+_session_store = create_session_store()
+# 同一 session 的请求排队执行，避免并发读到同一份旧状态、后写覆盖前写
+_session_locks = SessionLocks()
+# 带 idempotency_key 的重复请求合并到同一次执行
+_coalescer = RequestCoalescer(result_ttl=float(os.environ.get("IDEMPOTENCY_TTL_SECONDS") or 300))
 # 单会话保留的最大消息条数，避免内存膨胀
 _MAX_MESSAGES_IN_SESSION = 100
 
@@ -36,11 +72,11 @@ def _get_max_step() -> int | None:
         return None
 
 
-def _build_graph():
-    """懒加载图，首次请求时构建。"""
+def _build_graph(checkpointer: Any = None):
+    """构建图：启动预热时调用；预热未完成时首个请求也会触发构建。"""
     from packages.agent.graph import build_quote_graph
     from packages.agent.tools import bm25_retrieve
-    from packages.llm import get_all_node_chat_completions
+    from packages.llm import get_all_node_async_chat_completions, get_all_node_chat_completions
 
     return build_quote_graph(
         retrieve=bm25_retrieve,
@@ -50,23 +86,76 @@ def _build_graph():
             {"id": "80", "name": "80系列"},
         ],
         chat_completions=get_all_node_chat_completions(),
+        achat_completions=get_all_node_async_chat_completions(),
+        checkpointer=checkpointer,
     )
 
 
+# LangGraph checkpointer：在 lifespan 中打开（sqlite 后端需事件循环），图构建时传入
+_checkpointer: Any = None
+_checkpoint_retention: Any = None
 _graph: Any = None
+_graph_lock = threading.Lock()
 
 
 def get_graph():
     global _graph
     if _graph is None:
-        _graph = _build_graph()
+        # 预热线程与首个请求可能同时进入，只构建一次
+        with _graph_lock:
+            if _graph is None:
+                _graph = _build_graph(_checkpointer)
     return _graph
 
 
+def _warmup_steps() -> list[tuple[str, Any]]:
+    """预热步骤 (组件名, 同步函数)，按顺序执行。"""
+    from packages.agent.prompts import preload_prompts
+    from packages.agent.tools import get_bm25_retriever
+    from packages.tools.pricing import get_pricing_table
+
+    return [
+        ("prompts", preload_prompts),
+        ("pricing", get_pricing_table),
+        ("retriever", get_bm25_retriever),
+        ("graph", get_graph),
+    ]
+
+
+async def _warmup() -> None:
+    """后台预热：各步骤放到线程里执行，不阻塞事件循环（/health 在预热期间照常响应）。"""
+    try:
+        steps = _warmup_steps()
+    except Exception as e:
+        readiness.error = f"预热模块导入失败: {e}"
+        return
+    for name, _ in steps:
+        readiness.components[name] = "pending"
+    for name, fn in steps:
+        try:
+            await asyncio.to_thread(fn)
+        except Exception as e:
+            readiness.components[name] = f"error: {e}"
+            readiness.error = f"{name} 预热失败: {e}"
+            return
+        readiness.components[name] = "ok"
+    readiness.ready = True
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    global _checkpointer, _checkpoint_retention
+    _checkpointer = await open_checkpointer()
+    _checkpoint_retention = create_checkpoint_retention(_checkpointer)
+    warmup_task = asyncio.create_task(_warmup())
     yield
-    # shutdown 如有需要可在此清理
+    if not warmup_task.done():
+        warmup_task.cancel()
+    _session_store.close()
+    await close_checkpointer(_checkpointer)
+    from packages.llm.client import aclose_clients
+
+    await aclose_clients()
 
 
 app = FastAPI(
@@ -82,11 +171,15 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.include_router(health_router)
+app.include_router(metrics_router)
+app.include_router(quote_router)
 
 
 class ChatRequest(BaseModel):
     message: str
     session_id: str | None = None  # 多轮对话必传：首次可不传，响应里会返回 session_id，后续请求带上
+    idempotency_key: str | None = None  # 可选：重试同一条消息时带相同 key，挂到进行中的结果上而不是重新执行（需同时带 session_id）
 
 
 class ChatResponse(BaseModel):
@@ -99,7 +192,16 @@ class ChatResponse(BaseModel):
 
 @app.get("/")
 def root():
-    return {"status": "ok", "docs": "/docs", "chat": "POST /chat"}
+    return {
+        "status": "ok",
+        "docs": "/docs",
+        "chat": "POST /chat",
+        "chat_stream": "POST /chat/stream",
+        "quote": "POST /quote",
+        "health": "GET /health",
+        "ready": "GET /ready",
+        "metrics": "GET /metrics",
+    }
 
 
 def _trim_messages(messages: list[dict[str, Any]], max_len: int = _MAX_MESSAGES_IN_SESSION) -> list[dict[str, Any]]:
@@ -109,25 +211,40 @@ def _trim_messages(messages: list[dict[str, Any]], max_len: int = _MAX_MESSAGES_
     return messages[-max_len:]
 
 
-@app.post("/chat", response_model=ChatResponse)
-def chat(request: ChatRequest):
-    """发送一条消息，获取 Agent 回复。多轮对话请传 session_id，否则每轮 state 会丢失、报价流程会断。"""
-    if not request.message.strip():
-        raise HTTPException(status_code=400, detail="message 不能为空")
+def _coalesce_key(request: ChatRequest) -> tuple[str, str, str] | None:
+    """
+    幂等键：(session_id, idempotency_key, message)；未传 idempotency_key 或 session_id 时不合并。
+    新会话（无 session_id）的请求互不相关，合并会让不同客户端拿到同一个回复与 session_id。
+    """
+    key = (request.idempotency_key or "").strip()
+    session_id = (request.session_id or "").strip()
+    if not key or not session_id:
+        return None
+    return (session_id, key, request.message.strip())
 
-    try:
-        graph = get_graph()
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"图构建失败，请检查依赖与环境变量: {e}",
-        ) from e
 
-    session_id = (request.session_id or "").strip() or uuid.uuid4().hex
+def _uses_checkpointer(graph: Any) -> bool:
+    return getattr(graph, "checkpointer", None) is not None
+
+
+async def _prepare_turn(session_id: str, request: ChatRequest, graph: Any) -> dict[str, Any]:
+    """组装本轮图输入：恢复上一轮状态，仅追加本条用户消息。需在会话锁内调用。"""
     new_user_msg = {"role": "user", "content": request.message.strip()}
 
+    if _uses_checkpointer(graph):
+        # 上一轮状态由 checkpointer 按 thread_id 恢复，只传增量：新消息 + 每轮重置的字段
+        initial: dict[str, Any] = {
+            "messages": [new_user_msg],
+            "thinking_steps": ReplaceList(),
+            "llm_calls_saved": 0,
+        }
+        if (max_step := _get_max_step()) is not None:
+            initial["max_step"] = max_step
+        return initial
+
     # 恢复上一轮状态（含 flow_stage、current_intent、requirements 等），仅追加本条用户消息
-    prev = _session_store.get(session_id)
+    # 存储可能是 SQLite/Redis，放到线程里执行避免阻塞事件循环
+    prev = await asyncio.to_thread(_session_store.get, session_id)
     if prev:
         messages = list(prev.get("messages") or [])
         messages.append(new_user_msg)
@@ -137,21 +254,29 @@ def chat(request: ChatRequest):
         initial = {"messages": [new_user_msg]}
     # 每轮对话重新记录思考过程，供前端展示
     initial["thinking_steps"] = []
+    initial["llm_calls_saved"] = 0
 
     if (max_step := _get_max_step()) is not None:
         initial["max_step"] = max_step
+    return initial
 
-    try:
-        result = graph.invoke(initial)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) from e
 
-    # 持久化本轮结果，供下一轮使用（保证 flow_stage/current_intent 等延续）
+async def _finish_turn(session_id: str, result: dict[str, Any], graph: Any) -> ChatResponse:
+    """持久化本轮结果，供下一轮使用（保证 flow_stage/current_intent 等延续），并组装响应。"""
     result_messages = result.get("messages") or []
-    _session_store[session_id] = {
-        **result,
-        "messages": _trim_messages(result_messages),
-    }
+    metrics.incr("chat_turns_total")
+    metrics.observe("planner_llm_calls_saved_per_turn", result.get("llm_calls_saved") or 0)
+    if not _uses_checkpointer(graph):
+        # 无 checkpointer 时整轮快照写入 session store；有 checkpointer 时每步已持久化
+        await asyncio.to_thread(
+            _session_store.set,
+            session_id,
+            {**result, "messages": _trim_messages(result_messages)},
+        )
+    elif _checkpoint_retention is not None:
+        # 清理本会话较早的 checkpoint 与过期 / 超出预算的会话；正在执行的会话不删
+        pruned = await _checkpoint_retention.after_turn(session_id, is_active=_session_locks.locked)
+        metrics.incr("checkpoints_pruned_total", pruned)
 
     reply = ""
     for m in reversed(result_messages):
@@ -166,6 +291,132 @@ def chat(request: ChatRequest):
         session_id=session_id,
         thinking_steps=result.get("thinking_steps") or [],
     )
+
+
+def _get_graph_or_500():
+    try:
+        return get_graph()
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"图构建失败，请检查依赖与环境变量: {e}",
+        ) from e
+
+
+@app.post("/chat", response_model=ChatResponse)
+async def chat(request: ChatRequest):
+    """
+    发送一条消息，获取 Agent 回复。多轮对话请传 session_id，否则每轮 state 会丢失、报价流程会断。
+    图通过 graph.ainvoke 异步执行，LLM 调用期间不占用线程池，单 worker 可同时处理大量会话。
+    """
+    if not request.message.strip():
+        raise HTTPException(status_code=400, detail="message 不能为空")
+
+    graph = _get_graph_or_500()
+
+    async def run_turn() -> ChatResponse:
+        session_id = (request.session_id or "").strip() or uuid.uuid4().hex
+        async with _session_locks.hold(session_id):
+            initial = await _prepare_turn(session_id, request, graph)
+            result = await graph.ainvoke(initial, thread_config(session_id))
+            return await _finish_turn(session_id, result, graph)
+
+    try:
+        if (key := _coalesce_key(request)) is not None:
+            return await _coalescer.run(key, run_turn)
+        return await run_turn()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+def _sse(event: str, data: Any) -> str:
+    """按 text/event-stream 格式编码一条事件。"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    SSE 版 /chat：每个节点执行完即推送其 thinking_step，chat 节点的回复按 token 增量推送，最后推送完整响应。
+    事件：thinking {"step"} → reply_start {} → token {"text"} → done（同 ChatResponse）；出错时推送 error {"detail"}。
+    一轮中 chat 可能执行多次，每条回复前都有 reply_start，客户端收到后清空已拼接的 token；最终回复以 done.reply 为准。
+    带 idempotency_key 的重试若命中进行中/已完成的同一请求，只推送 done。
+    """
+    if not request.message.strip():
+        raise HTTPException(status_code=400, detail="message 不能为空")
+
+    graph = _get_graph_or_500()
+    queue: asyncio.Queue[tuple[str, Any]] = asyncio.Queue()
+
+    async def run_turn() -> ChatResponse:
+        session_id = (request.session_id or "").strip() or uuid.uuid4().hex
+        config = thread_config(session_id, **{
+            TOKEN_CALLBACK_KEY: lambda text: queue.put_nowait(("token", text)),
+            REPLY_START_CALLBACK_KEY: lambda: queue.put_nowait(("reply_start", None)),
+        })
+        try:
+            async with _session_locks.hold(session_id):
+                initial = await _prepare_turn(session_id, request, graph)
+                final: dict[str, Any] | None = None
+                async for state in graph.astream(initial, config, stream_mode="values"):
+                    final = state
+                    queue.put_nowait(("state", state))
+                response = await _finish_turn(session_id, final or {}, graph)
+        except Exception as e:
+            queue.put_nowait(("error", str(e)))
+            raise
+        queue.put_nowait(("done", response))
+        return response
+
+    async def events():
+        key = _coalesce_key(request)
+        if key is None:
+            task, owner = asyncio.ensure_future(run_turn()), True
+        else:
+            task, owner = _coalescer.submit(key, run_turn)
+        if not owner:
+            # 重试请求：等待已有执行的结果，不重复推送中间过程
+            try:
+                response = await asyncio.shield(task)
+            except Exception as e:
+                yield _sse("error", {"detail": str(e)})
+            else:
+                yield _sse("done", response.model_dump())
+            return
+
+        sent_steps = 0
+        try:
+            while True:
+                kind, payload = await queue.get()
+                if kind == "token":
+                    yield _sse("token", {"text": payload})
+                elif kind == "reply_start":
+                    yield _sse("reply_start", {})
+                elif kind == "state":
+                    steps = payload.get("thinking_steps") or []
+                    for step in steps[sent_steps:]:
+                        yield _sse("thinking", {"step": step})
+                    sent_steps = max(sent_steps, len(steps))
+                elif kind == "done":
+                    yield _sse("done", payload.model_dump())
+                    break
+                else:
+                    yield _sse("error", {"detail": payload})
+                    break
+        finally:
+            # 客户端断开时取消图的执行，避免继续消耗 LLM 调用；带幂等键的请求保留执行，供重试挂载
+            if key is None and not task.done():
+                task.cancel()
+            elif task.done() and not task.cancelled():
+                task.exception()  # 异常已通过 error 事件推送，此处仅标记为已处理
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # @app.post("/chat")
 # def chat(req: ChatRequest):
 #     print("1️⃣ start", flush=True)
@@ -0,0 +1,40 @@
+"""
+健康检查：
+- /health：存活探针，进程能响应即返回 200；
+- /ready：就绪探针，启动预热（图、检索索引、price.json、prompt）全部完成前返回 503，滚动发布时不会把流量打到冷 worker。
+"""
+from typing import Any
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+router = APIRouter(tags=["health"])
+
+
+class Readiness:
+    """预热进度：components 记录各组件状态（pending / ok / error: ...）。"""
+
+    def __init__(self) -> None:
+        self.ready = False
+        self.error: str | None = None
+        self.components: dict[str, str] = {}
+
+    def snapshot(self) -> dict[str, Any]:
+        status = "ready" if self.ready else ("failed" if self.error else "warming_up")
+        body: dict[str, Any] = {"status": status, "components": dict(self.components)}
+        if self.error:
+            body["error"] = self.error
+        return body
+
+
+readiness = Readiness()
+
+
+@router.get("/health")
+def health():
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+def ready():
+    return JSONResponse(readiness.snapshot(), status_code=200 if readiness.ready else 503)
@@ -0,0 +1,19 @@
+"""进程内指标：GET /metrics 返回计数器与汇总（见 packages/observability/metrics.py）、LLM 响应缓存与意图结果缓存命中情况、prompt 版本。"""
+from fastapi import APIRouter
+
+from packages.observability.metrics import metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics")
+def get_metrics():
+    from packages.agent.prompts import prompt_versions
+    from packages.intent.pipeline import intent_cache_stats
+    from packages.llm.cache import get_llm_cache
+
+    body = metrics.snapshot()
+    body["llm_cache"] = get_llm_cache().stats()
+    body["intent_cache"] = intent_cache_stats()
+    body["prompts"] = prompt_versions()
+    return body
@@ -0,0 +1,81 @@
+"""
+/quote：一步到位报价。直接调用定价工具与报价单渲染，不经过 intent → router → ... 的对话流程，零 LLM 调用。
+/quote/batch：整栋楼的门窗清单一次报价，按 NumPy 向量化批量计算。
+"""
+import asyncio
+import json
+import os
+
+from fastapi import APIRouter, HTTPException, Request
+
+from apps.api.schemas.quote import QuoteBatchResponse, QuoteRequest, QuoteResponse
+from packages.agent.nodes.generate_quote import render_quote_md
+from packages.tools.pricing import calculate_price
+
+router = APIRouter(tags=["quote"])
+
+
+@router.post("/quote", response_model=QuoteResponse)
+async def quote(request: QuoteRequest):
+    """
+    按尺寸、开扇数与型号/系列直接报价，返回与对话流程一致的 price_result 与 quote_md。
+    price.json 已在进程内缓存，纯 CPU 计算，直接在事件循环中执行。
+    """
+    price_result = calculate_price(request.requirements(), request.selection())
+    if price_result.get("error"):
+        raise HTTPException(status_code=404, detail=f"{price_result['error']}: {price_result.get('series_id', '')}")
+    return QuoteResponse(price_result=price_result, quote_md=render_quote_md(price_result))
+
+
+def _batch_max_lines() -> int:
+    try:
+        return int(os.environ.get("QUOTE_BATCH_MAX_LINES") or 50_000)
+    except ValueError:
+        return 50_000
+
+
+# 请求体直接读取，不经过 pydantic；在 OpenAPI 中声明两种可接受的格式
+_BATCH_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": {"type": "array", "items": {"$ref": "#/components/schemas/QuoteRequest"}}},
+            "text/csv": {"schema": {"type": "string"}, "example": "w,h,opening_count,model\n1.5,1.2,2,ROW100P\n"},
+        },
+    }
+}
+CSV_CONTENT_TYPES = ("text/csv", "application/csv", "text/plain")
+
+
+@router.post("/quote/batch", response_model=QuoteBatchResponse, openapi_extra=_BATCH_REQUEST_BODY)
+async def quote_batch(request: Request):
+    """
+    批量报价。请求体二选一：
+    - application/json：行数组 [{"w", "h", "opening_count", "model"|"series_id"}, ...]，或 {"items": [...]}；
+    - text/csv：CSV 文件内容作为原始请求体直接发送（curl --data-binary @items.csv -H "Content-Type: text/csv"），
+      首行为表头（w,h,opening_count,model,series_id,location）。不支持 multipart/form-data 表单上传（返回 415）。
+    返回每行的 price_result（失败行带 error，不影响其他行）与项目总价。
+    """
+    from packages.tools.pricing.batch import calculate_price_batch, parse_quote_csv
+
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type == "multipart/form-data":
+        raise HTTPException(
+            status_code=415,
+            detail="CSV 请以原始请求体发送（Content-Type: text/csv），不支持 multipart/form-data 表单上传",
+        )
+    body = await request.body()
+    try:
+        if content_type in CSV_CONTENT_TYPES:
+            items = parse_quote_csv(body.decode("utf-8"))
+        else:
+            payload = json.loads(body or b"[]")
+            items = payload.get("items") if isinstance(payload, dict) else payload
+    except (UnicodeDecodeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"请求体解析失败: {e}") from e
+    if not isinstance(items, list) or not all(isinstance(it, dict) for it in items):
+        raise HTTPException(status_code=422, detail="请求体应为对象数组或 CSV")
+    if len(items) > (limit := _batch_max_lines()):
+        raise HTTPException(status_code=413, detail=f"单次最多 {limit} 行")
+    # 上万行时组装结果需数十毫秒，放到线程里避免卡住其他请求
+    return await asyncio.to_thread(calculate_price_batch, items)
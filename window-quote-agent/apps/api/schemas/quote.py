@@ -0,0 +1,50 @@
+"""/quote 请求与响应：表单字段已齐全的调用方（如 CRM）一步拿到报价，不经过对话流程。"""
+from typing import Any
+
+from pydantic import BaseModel, Field, model_validator
+
+
+class QuoteRequest(BaseModel):
+    w: float = Field(gt=0, description="宽（米）")
+    h: float = Field(gt=0, description="高（米）")
+    opening_count: int = Field(default=1, ge=1, description="开扇数量")
+    model: str | None = Field(default=None, description="price.json 中的型号，如 ROW100P")
+    series_id: str | None = Field(default=None, description="系列编号，如 65；未传 model 时按系列映射型号")
+    location: str | None = Field(default=None, description="安装地点或城市，仅透传，不参与计价")
+
+    @model_validator(mode="after")
+    def _require_model_or_series(self) -> "QuoteRequest":
+        if not (self.model or "").strip() and not (self.series_id or "").strip():
+            raise ValueError("model 与 series_id 至少传一个")
+        return self
+
+    def requirements(self) -> dict[str, Any]:
+        """转为与图状态一致的 requirements 结构。"""
+        req: dict[str, Any] = {"w": self.w, "h": self.h, "opening_count": self.opening_count}
+        if self.location:
+            req["location"] = self.location
+        return req
+
+    def selection(self) -> dict[str, Any]:
+        """转为与图状态一致的 selection 结构。"""
+        sel: dict[str, Any] = {}
+        if self.model:
+            sel["model"] = self.model.strip()
+        if self.series_id:
+            sel["series_id"] = self.series_id.strip()
+        return sel
+
+
+class QuoteResponse(BaseModel):
+    price_result: dict[str, Any]  # 同图中 state.price_result：total、breakdown、model、各因子等
+    quote_md: str  # 同 generate_quote 节点生成的 Markdown 报价单
+
+
+class QuoteBatchResponse(BaseModel):
+    """/quote/batch 的响应；请求体为 QuoteRequest 数组（application/json）或原始 CSV 文本（text/csv，非表单上传）。"""
+
+    lines: list[dict[str, Any]]  # 与输入行一一对应，每项结构同 price_result；失败行带 error
+    total: float  # 项目总价（成功行合计）
+    count: int
+    failed: int
+    pricing_version: str  # 本批次所用价目表版本（price.json 内容哈希）
@@ -6,28 +6,60 @@ import type { Message } from "./types";
 
 const API_BASE = "/api";
 
-async function sendMessage(
-  message: string,
-  sessionId: string | null
-): Promise<{
+interface ChatResult {
   reply: string;
   quote_md?: string;
   current_intent?: string;
   session_id: string;
   thinking_steps?: string[];
-}> {
+}
+
+interface StreamHandlers {
+  onThinking: (step: string) => void;
+  /** 新一条回复开始：一轮中可能有多条，之前拼接的 token 应丢弃 */
+  onReplyStart: () => void;
+  onToken: (text: string) => void;
+}
+
+/** 调用 /chat/stream（SSE）：逐步回调 thinking / reply_start / token，最终返回与 /chat 相同的完整结果。 */
+async function streamMessage(
+  message: string,
+  sessionId: string | null,
+  handlers: StreamHandlers
+): Promise<ChatResult> {
   const body: { message: string; session_id?: string } = { message };
   if (sessionId) body.session_id = sessionId;
-  const res = await fetch(`${API_BASE}/chat`, {
+  const res = await fetch(`${API_BASE}/chat/stream`, {
     method: "POST",
     headers: { "Content-Type": "application/json" },
     body: JSON.stringify(body),
   });
-  if (!res.ok) {
+  if (!res.ok || !res.body) {
     const err = await res.json().catch(() => ({ detail: res.statusText }));
     throw new Error(err.detail || "请求失败");
   }
-  return res.json();
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let sep: number;
+    while ((sep = buffer.indexOf("\n\n")) !== -1) {
+      const raw = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+      const event = /^event: (.*)$/m.exec(raw)?.[1];
+      const data = JSON.parse(/^data: (.*)$/m.exec(raw)?.[1] ?? "null");
+      if (event === "thinking") handlers.onThinking(data.step);
+      else if (event === "reply_start") handlers.onReplyStart();
+      else if (event === "token") handlers.onToken(data.text);
+      else if (event === "done") return data as ChatResult;
+      else if (event === "error") throw new Error(data?.detail || "请求失败");
+    }
+  }
+  throw new Error("连接已中断");
 }
 
 export default function App() {
@@ -47,8 +79,24 @@ export default function App() {
     setLoading(true);
     setMessages((prev) => [...prev, { role: "assistant", content: "", status: "loading" }]);
 
+    // 流式过程中原地更新最后一条（loading 中的）助手消息
+    const updateLoading = (patch: (m: Message) => Message) =>
+      setMessages((prev) => {
+        const next = [...prev];
+        const last = next[next.length - 1];
+        if (last?.role === "assistant" && last?.status === "loading") {
+          next[next.length - 1] = patch(last);
+        }
+        return next;
+      });
+
     try {
-      const data = await sendMessage(text.trim(), sessionIdRef.current);
+      const data = await streamMessage(text.trim(), sessionIdRef.current, {
+        onThinking: (step) =>
+          updateLoading((m) => ({ ...m, thinking_steps: [...(m.thinking_steps ?? []), step] })),
+        onReplyStart: () => updateLoading((m) => ({ ...m, content: "" })),
+        onToken: (token) => updateLoading((m) => ({ ...m, content: m.content + token })),
+      });
       if (data.session_id) sessionIdRef.current = data.session_id;
       setMessages((prev) => {
         const next = [...prev];
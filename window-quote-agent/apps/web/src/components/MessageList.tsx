@@ -14,8 +14,8 @@ export function MessageList({ messages }: Props) {
               <div className="message-avatar message-avatar--assistant" />
             )}
             <div className="message-content">
-              {msg.role === "assistant" && msg.thinking_steps && msg.thinking_steps.length > 0 && !msg.status && (
-                <details className="message-thinking">
+              {msg.role === "assistant" && msg.thinking_steps && msg.thinking_steps.length > 0 && msg.status !== "error" && (
+                <details className="message-thinking" open={msg.status === "loading"}>
                   <summary className="message-thinking-summary">思考过程</summary>
                   <ul className="message-thinking-steps">
                     {msg.thinking_steps.map((step, j) => (
@@ -24,7 +24,7 @@ export function MessageList({ messages }: Props) {
                   </ul>
                 </details>
               )}
-              {msg.status === "loading" ? (
+              {msg.status === "loading" && !msg.content ? (
                 <div className="message-loading">
                   <span className="dot" />
                   <span className="dot" />
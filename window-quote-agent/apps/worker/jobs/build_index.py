@@ -0,0 +1,65 @@
+"""
+离线构建 BM25 检索索引：读取产品卡片 JSON，写入版本化产物并原子切换 CURRENT，旧版本按 --keep 清理。
+API 进程首次检索时 mmap 加载 CURRENT 指向的版本，启动不建索引。
+
+用法（在 window-quote-agent 目录下）：
+  python -m apps.worker.jobs.build_index                       # 输出到 RAG_INDEX_PATH（默认 data/rag_index）
+  python -m apps.worker.jobs.build_index --source cards.json --out /srv/rag_index --keep 5
+  python -m apps.worker.jobs.build_index --tokenizer zh+uni        # 中文 bigram 之外再加单字
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+from packages.rag.indexing.bm25_index import (
+    DEFAULT_INDEX_PATH,
+    DEFAULT_SOURCE,
+    DEFAULT_TOKENIZER,
+    TOKENIZERS,
+    build_bm25_index,
+    load_documents,
+    prune_index_versions,
+)
+
+
+def build_index(
+    source: Path = DEFAULT_SOURCE,
+    out: Path | None = None,
+    *,
+    tokenizer: str | None = None,
+    keep: int = 3,
+) -> Path:
+    """构建并发布索引，返回版本目录。分词器默认取 RAG_TOKENIZER，未设置时为 zh。"""
+    out = Path(out or os.environ.get("RAG_INDEX_PATH") or DEFAULT_INDEX_PATH)
+    docs = load_documents(source)
+    if not docs:
+        raise ValueError(f"没有可索引的文档: {source}")
+    index = build_bm25_index(docs, tokenizer=tokenizer or os.environ.get("RAG_TOKENIZER") or DEFAULT_TOKENIZER)
+    target = index.save(out)
+    prune_index_versions(out, keep=keep)
+    return target
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="构建 BM25 检索索引")
+    parser.add_argument("--source", type=Path, default=DEFAULT_SOURCE, help="产品卡片 JSON")
+    parser.add_argument("--out", type=Path, default=None, help=f"产物根目录（默认 RAG_INDEX_PATH 或 {DEFAULT_INDEX_PATH}）")
+    parser.add_argument("--tokenizer", choices=sorted(TOKENIZERS), default=None, help=f"默认 RAG_TOKENIZER 或 {DEFAULT_TOKENIZER}")
+    parser.add_argument("--keep", type=int, default=3, help="保留最近几个版本")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        target = build_index(args.source, args.out, tokenizer=args.tokenizer, keep=args.keep)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    size = sum(p.stat().st_size for p in target.iterdir())
+    print(f"已发布 {target}（{size / 1024:.0f} KB），用时 {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,37 @@
 """LangGraph 工作流：intent → router(planner) → 闲聊/产品推荐/产品咨询/价格咨询 四条分支。"""
-from typing import Any, Callable
+import os
+from typing import Any, Awaitable, Callable
 
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import END, START, StateGraph
+from langgraph.types import Send
 
 from packages.agent.state import AgentState
-from packages.agent.nodes.chat_node import create_chat_node
-from packages.agent.nodes.collect_recommend_params import create_collect_recommend_params_node
-from packages.agent.nodes.collect_requirements import create_collect_requirements_node
-from packages.agent.nodes.check_node import create_check_node
+from packages.agent.nodes.chat_node import create_async_chat_node, create_chat_node
+from packages.agent.nodes.collect_recommend_params import (
+    create_async_collect_recommend_params_node,
+    create_collect_recommend_params_node,
+)
+from packages.agent.nodes.collect_requirements import (
+    create_async_collect_requirements_node,
+    create_collect_requirements_node,
+)
+from packages.agent.nodes.check_node import create_async_check_node, create_check_node
+from packages.agent.nodes.fan_out import (
+    branch_payload,
+    create_async_branch_node,
+    create_branch_node,
+    join_branches,
+)
 from packages.agent.nodes.generate_quote import generate_quote
-from packages.agent.nodes.intent_node import create_intent_node
+from packages.agent.nodes.intent_node import create_async_intent_node, create_intent_node
 from packages.agent.nodes.price_quote import create_price_quote_node
-from packages.agent.nodes.recommend import create_recommend_node
-from packages.agent.nodes.router import create_router_planner_node
+from packages.agent.nodes.rag_prefetch import create_async_rag_prefetch_node, create_rag_prefetch_node
+from packages.agent.nodes.recommend import create_async_recommend_node, create_recommend_node
+from packages.agent.nodes.router import create_async_router_planner_node, create_router_planner_node
+from packages.agent.nodes.step_controller import create_async_step_controller_node, create_step_controller_node
 from packages.agent.tools import bm25_retrieve, create_rag_tool
+from packages.llm.chat_completion import to_async_chat_completion
 
 # router 只做 planner：输出下一节点；是否 END 由 check 节点决定
 ROUTER_NEXT_NODES = (
@@ -28,6 +46,16 @@ ROUTER_NEXT_NODES = (
 # 报价相关节点：进入前必须已有 requirement，否则先走 collect_requirements
 QUOTE_NODES_REQUIRE_REQUIREMENTS = ("price_quote", "generate_quote")
 
+# 规划模式：split = 业务节点 → check → router 两次 LLM 调用；step_controller = 合并为一次调用
+PLANNER_MODES = ("split", "step_controller")
+
+
+def _resolve_planner_mode(planner_mode: str | None) -> str:
+    mode = (planner_mode or os.environ.get("PLANNER_MODE") or "split").strip().lower()
+    if mode not in PLANNER_MODES:
+        raise ValueError(f"未知 planner_mode: {mode}，可选 {PLANNER_MODES}")
+    return mode
+
 
 def _has_requirements(state: AgentState) -> bool:
     """是否已收集到至少一项需求（宽、高、地点、开扇数），用于进入报价前校验。"""
@@ -51,6 +79,13 @@ def _route_after_check(state: AgentState) -> str:
     return "router"
 
 
+def _route_after_step_controller(state: AgentState) -> str:
+    """step_controller 之后：结束条件同 check，不结束则按 next_node 路由（校验规则同 router）。"""
+    if _route_after_check(state) == "END":
+        return "END"
+    return _route_after_router(state)
+
+
 def _route_after_router(state: AgentState) -> str:
     """router 之后：以 planner 输出的 next_node 为准（意图与上下文仅作参考，由 router 自由判断）。
     仅做合法性校验：进入 price_quote / generate_quote 前须有 requirement，否则先走 collect_requirements。
@@ -85,7 +120,7 @@ def _route_after_router(state: AgentState) -> str:
         return "recommend"
     if last_step == "collect_recommend_params":
         return "chat"  # fallback
-    if last_step in ("chat", "intent", "router", "check", ""):
+    if last_step in ("chat", "intent", "router", "check", "step_controller", ""):
         if intent in ("其他", "公司介绍", "产品咨询"):
             return "chat"
         if intent == "产品推荐":
@@ -95,6 +130,19 @@ def _route_after_router(state: AgentState) -> str:
     return "chat"
 
 
+def _route_or_fan_out(state: AgentState) -> str | list[Send]:
+    """router 之后：给出 >= 2 个可并行子任务时经 Send 扇出到 branch 并发执行，否则同 _route_after_router。"""
+    parallel_nodes = state.get("parallel_nodes") or []
+    if len(parallel_nodes) >= 2:
+        return [Send("branch", branch_payload(state, node)) for node in parallel_nodes]
+    return _route_after_router(state)
+
+
+def _dual(sync_node: Callable[..., Any], async_node: Callable[..., Awaitable[Any]]) -> RunnableLambda:
+    """同一节点同时提供同步与异步实现：graph.invoke 走 sync_node，graph.ainvoke 走 async_node。"""
+    return RunnableLambda(sync_node, afunc=async_node)
+
+
 def build_quote_graph(
     retrieve: Callable[[str], list[str]],
     list_series: Callable[[], list[dict[str, Any]]],
@@ -102,9 +150,13 @@ def build_quote_graph(
     *,
     chat_completion: Callable[..., str] | None = None,
     chat_completions: dict[str, Callable[..., str]] | None = None,
+    achat_completion: Callable[..., Awaitable[str]] | None = None,
+    achat_completions: dict[str, Callable[..., Awaitable[str]]] | None = None,
     run_intent_pipeline: Callable[[str], Any] | None = None,
     stale_threshold: int = 3,
     router_llm: Any = None,
+    planner_mode: str | None = None,
+    checkpointer: Any = None,
 ):
     """
     构建工作流图：intent（pipeline + intent_check）→ router(planner) → 四条分支。
@@ -114,7 +166,21 @@ def build_quote_graph(
     模型注入：
     - router_llm：可选，传给 router 的 LangChain ChatOpenAI 实例；未传时在节点内用 OPENAI_API_KEY 创建 gpt-4o。
     - chat_completions / chat_completion：同上，用于 chat/collect_recommend_params/collect_requirements/recommend。
+    - achat_completions / achat_completion：异步版本，供 graph.ainvoke 使用；未传时将同步版本放入线程执行，
+      两者都未传时按 model_config 创建 AsyncOpenAI 调用。
+
+    多意图并行：router 给出 >= 2 个可并行子任务（如闲聊 + 收集推荐参数）时，经 Send 扇出到 branch 同时执行，
+    join 合并各分支输出后再进入 check / step_controller，见 packages/agent/nodes/fan_out.py。
+
+    planner_mode（未传时读环境变量 PLANNER_MODE，默认 split）：
+    - split：业务节点 → check（是否结束）→ router（下一节点），每步两次规划调用；
+    - step_controller：业务节点 → step_controller，一次调用同时给出 should_end 与 next_node；
+      intent 之后仍由 router 规划首个节点（此时无需判断结束）。
+
+    checkpointer：可选，见 packages/memory/checkpoint.py；传入后调用时需带 config={"configurable": {"thread_id": session_id}}，
+    图每执行一步即持久化，下一轮只需传入新消息。
     """
+    planner_mode = _resolve_planner_mode(planner_mode)
     from packages.intent.pipeline import run_intent_pipeline as _run_intent_pipeline
 
     if calculate_price is None:
@@ -131,6 +197,16 @@ def build_quote_graph(
         from packages.llm.model_config import get_chat_completion_for_node
         return get_chat_completion_for_node(node_name)
 
+    def _achat(node_name: str) -> Callable[..., Awaitable[str]]:
+        if achat_completions and node_name in achat_completions:
+            return achat_completions[node_name]
+        if achat_completion is not None:
+            return achat_completion
+        if (chat_completions and node_name in chat_completions) or chat_completion is not None:
+            return to_async_chat_completion(_chat(node_name))
+        from packages.llm.model_config import get_async_chat_completion_for_node
+        return get_async_chat_completion_for_node(node_name)
+
     builder = StateGraph(AgentState)
 
     # 使用传入的 retrieve，或 tools 里定义的默认 bm25_retrieve
@@ -138,34 +214,73 @@ def build_quote_graph(
     rag_tool = create_rag_tool(_retrieve)
     # RAG 工具始终传入 chat 节点；仅当提供 router_llm 时 chat 会走 tool call 分支
     chat_tools = [rag_tool]
-    builder.add_node("intent", create_intent_node(intent_fn, stale_threshold=stale_threshold))
-    builder.add_node("router", create_router_planner_node(llm=router_llm))
-    builder.add_node("check", create_check_node(llm=router_llm))
-    builder.add_node(
-        "chat",
-        create_chat_node(_chat("chat"), tools=chat_tools, llm=router_llm),
-    )
-    builder.add_node("collect_recommend_params", create_collect_recommend_params_node(_chat("collect_recommend_params")))
-    builder.add_node("collect_requirements", create_collect_requirements_node(_chat("collect_requirements")))
+    builder.add_node("intent", _dual(
+        create_intent_node(intent_fn, stale_threshold=stale_threshold),
+        create_async_intent_node(intent_fn, stale_threshold=stale_threshold),
+    ))
+    # 与 intent 并行：用本轮用户消息预取 RAG，chat 的检索工具与 recommend 命中时直接复用
+    builder.add_node("rag_prefetch", _dual(
+        create_rag_prefetch_node(_retrieve),
+        create_async_rag_prefetch_node(_retrieve),
+    ))
+    builder.add_node("router", _dual(
+        create_router_planner_node(llm=router_llm),
+        create_async_router_planner_node(llm=router_llm),
+    ))
+    if planner_mode == "step_controller":
+        builder.add_node("step_controller", _dual(
+            create_step_controller_node(llm=router_llm),
+            create_async_step_controller_node(llm=router_llm),
+        ))
+    else:
+        builder.add_node("check", _dual(create_check_node(llm=router_llm), create_async_check_node(llm=router_llm)))
+    # 可并行的业务节点：既单独注册，也供 branch 在扇出时调用同一实现
+    parallel_nodes = {
+        "chat": _dual(
+            create_chat_node(_chat("chat"), tools=chat_tools, llm=router_llm),
+            create_async_chat_node(_achat("chat"), tools=chat_tools, llm=router_llm),
+        ),
+        "collect_recommend_params": _dual(
+            create_collect_recommend_params_node(_chat("collect_recommend_params")),
+            create_async_collect_recommend_params_node(_achat("collect_recommend_params")),
+        ),
+        "collect_requirements": _dual(
+            create_collect_requirements_node(_chat("collect_requirements")),
+            create_async_collect_requirements_node(_achat("collect_requirements")),
+        ),
+    }
+    for name, runnable in parallel_nodes.items():
+        builder.add_node(name, runnable)
+    builder.add_node("branch", _dual(create_branch_node(parallel_nodes), create_async_branch_node(parallel_nodes)))
+    builder.add_node("join", join_branches)
     # recommend 与 chat 共用同一 RAG 检索（_retrieve），产品推荐/价格咨询在收集到足够信息后都会走 RAG 推荐
-    builder.add_node("recommend", create_recommend_node(_retrieve, list_series, _chat("recommend")))
+    builder.add_node("recommend", _dual(
+        create_recommend_node(_retrieve, list_series, _chat("recommend")),
+        create_async_recommend_node(_retrieve, list_series, _achat("recommend")),
+    ))
+    # 纯本地计算的节点无需异步版本
     builder.add_node("price_quote", create_price_quote_node(calculate_price))
     builder.add_node("generate_quote", generate_quote)
 
     builder.add_edge(START, "intent")
-    builder.add_edge("intent", "router")
-    builder.add_conditional_edges(
-        "router",
-        _route_after_router,
-        {
-            "chat": "chat",
-            "collect_recommend_params": "collect_recommend_params",
-            "collect_requirements": "collect_requirements",
-            "recommend": "recommend",
-            "price_quote": "price_quote",
-            "generate_quote": "generate_quote",
-        },
-    )
+    builder.add_edge(START, "rag_prefetch")
+    # router 等 intent 与 rag_prefetch 都完成后再执行
+    builder.add_edge(["intent", "rag_prefetch"], "router")
+    business_nodes = {node: node for node in ROUTER_NEXT_NODES}
+    builder.add_conditional_edges("router", _route_or_fan_out, {**business_nodes, "branch": "branch"})
+    # 所有并行分支完成后 join 合并，再与普通业务节点一样进入 check / step_controller
+    builder.add_edge("branch", "join")
+    if planner_mode == "step_controller":
+        # 业务节点都回到 step_controller：一次调用决定 END 或直接进入下一业务节点
+        for node in (*ROUTER_NEXT_NODES, "join"):
+            builder.add_edge(node, "step_controller")
+        builder.add_conditional_edges(
+            "step_controller",
+            _route_after_step_controller,
+            {**business_nodes, "END": END},
+        )
+        return builder.compile(checkpointer=checkpointer)
+
     # 除 intent 外所有节点都回到 check；check 决定是否 END，不 END 则交给 router（planner）决定下一步
     builder.add_edge("chat", "check")
     builder.add_edge("collect_recommend_params", "check")
@@ -173,13 +288,14 @@ def build_quote_graph(
     builder.add_edge("recommend", "check")
     builder.add_edge("price_quote", "check")
     builder.add_edge("generate_quote", "check")
+    builder.add_edge("join", "check")
     builder.add_conditional_edges(
         "check",
         _route_after_check,
         {"router": "router", "END": END},
     )
 
-    return builder.compile()
+    return builder.compile(checkpointer=checkpointer)
 
 
 def get_graph_topology(builder_or_compiled) -> dict[str, Any]:
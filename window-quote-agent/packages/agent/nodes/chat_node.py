@@ -1,7 +1,18 @@
 """闲聊节点：其他/公司介绍/产品咨询 → 直接用模型返回；可选 RAG 等工具由模型按需调用。"""
-from typing import Any, Callable
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable
 
+from packages.agent.nodes.rag_prefetch import lookup_prefetched
 from packages.agent.state import AgentState, append_thinking_step, next_step_count
+from packages.agent.streaming import get_reply_start_callback, get_token_callback
+from packages.llm.chat_completion import ainvoke_llm
+from packages.observability.metrics import metrics
+
+# 同一条 LLM 回复中多个 tool_call 并发执行的最大线程数（同步路径）
+MAX_TOOL_WORKERS = 4
 
 
 def _last_user_message(state: AgentState) -> str:
@@ -49,6 +60,164 @@ def _get_tool_call_info(tc: Any) -> tuple[str, dict, str]:
 RAG_TOOL_NAME = "product_knowledge_search"
 
 
+def _final_content(response: Any) -> str:
+    """取 LLM 最终回复文本；content 为分段列表时拼接。"""
+    final_content = getattr(response, "content", None) or str(response)
+    if isinstance(final_content, list):
+        parts = [
+            c.get("text", str(c)) if isinstance(c, dict) else (c if isinstance(c, str) else getattr(c, "content", str(c)))
+            for c in final_content
+        ]
+        final_content = "\n".join(parts)
+    return final_content
+
+
+def _chat_result(state: AgentState, messages: list[dict[str, Any]], rag_context: list[str] | None = None) -> dict[str, Any]:
+    out: dict[str, Any] = {
+        "step": "chat",
+        "step_count": next_step_count(state),
+        "messages": messages,
+        "thinking_steps": append_thinking_step(state, "生成回复（闲聊/产品咨询）"),
+    }
+    if rag_context is not None:
+        out["rag_context"] = rag_context
+    return out
+
+
+def _tools_result(state: AgentState, response: Any, rag_context: list[str]) -> dict[str, Any]:
+    content = "" if response is None else _final_content(response)
+    return _chat_result(state, [{"role": "assistant", "content": content}], rag_context)
+
+
+def _prefetched_tool_result(state: AgentState, name: str, args: dict) -> str | None:
+    """RAG 工具的 query 与本轮预取一致时直接返回预取结果，不再检索。"""
+    if name != RAG_TOOL_NAME:
+        return None
+    chunks = lookup_prefetched(state, (args or {}).get("query") or "")
+    if chunks is None:
+        return None
+    from packages.agent.tools.rag_tool import format_knowledge
+
+    return format_knowledge(chunks)
+
+
+def _tool_map(tools: list[Any]) -> dict[str, Any]:
+    """工具名 → 工具，每次对话只构建一次。"""
+    return {t.name: t for t in tools}
+
+
+def _memo_key(name: str, args: dict) -> tuple[str, str]:
+    """(工具名, 参数) 作为本轮去重的 key；参数按 key 排序序列化，顺序不同视为同一调用。"""
+    return name, json.dumps(args or {}, ensure_ascii=False, sort_keys=True, default=str)
+
+
+def _invoke_tool(tool_by_name: dict[str, Any], name: str, args: dict) -> Any:
+    func = tool_by_name.get(name)
+    if not func:
+        return "（工具未找到）"
+    return func.invoke(args) if hasattr(func, "invoke") else func(args)
+
+
+async def _ainvoke_tool(tool_by_name: dict[str, Any], name: str, args: dict) -> Any:
+    func = tool_by_name.get(name)
+    if not func:
+        return "（工具未找到）"
+    if hasattr(func, "ainvoke"):
+        return await func.ainvoke(args)
+    return await asyncio.to_thread(func.invoke if hasattr(func, "invoke") else func, args)
+
+
+def _timed_tool(tool_by_name: dict[str, Any], name: str, args: dict) -> Any:
+    start = time.perf_counter()
+    try:
+        return _invoke_tool(tool_by_name, name, args)
+    finally:
+        metrics.observe("chat_tool_latency_seconds", time.perf_counter() - start, tool=name)
+
+
+async def _atimed_tool(tool_by_name: dict[str, Any], name: str, args: dict) -> Any:
+    start = time.perf_counter()
+    try:
+        return await _ainvoke_tool(tool_by_name, name, args)
+    finally:
+        metrics.observe("chat_tool_latency_seconds", time.perf_counter() - start, tool=name)
+
+
+def _pending_calls(
+    state: AgentState, tool_calls: list[Any], memo: dict[tuple[str, str], str]
+) -> tuple[list[tuple[str, dict, str, tuple[str, str]]], dict[tuple[str, str], tuple[str, dict]]]:
+    """
+    解析一条回复中的 tool_calls：命中预取或本轮 memo 的直接写入 memo；
+    返回 (全部调用 [(name, args, id, key)], 需实际执行的去重调用 {key: (name, args)})。
+    """
+    calls = []
+    todo: dict[tuple[str, str], tuple[str, dict]] = {}
+    for tc in tool_calls:
+        name, args, tid = _get_tool_call_info(tc)
+        key = _memo_key(name, args)
+        calls.append((name, args, tid, key))
+        if key in memo or key in todo:
+            metrics.incr("chat_tool_calls_total", tool=name, source="memo")
+            continue
+        prefetched = _prefetched_tool_result(state, name, args)
+        if prefetched is not None:
+            memo[key] = prefetched
+            metrics.incr("chat_tool_calls_total", tool=name, source="prefetch")
+            continue
+        todo[key] = (name, args)
+        metrics.incr("chat_tool_calls_total", tool=name, source="invoke")
+    return calls, todo
+
+
+def _append_tool_messages(
+    lc_messages: list,
+    calls: list[tuple[str, dict, str, tuple[str, str]]],
+    memo: dict[tuple[str, str], str],
+    rag_context: list[str],
+) -> None:
+    """按 tool_calls 原顺序追加 ToolMessage；RAG 结果写入 rag_context（同一检索只记一次）。"""
+    from langchain_core.messages import ToolMessage
+
+    for name, _args, tid, key in calls:
+        result = memo[key]
+        if name == RAG_TOOL_NAME and result not in rag_context:
+            rag_context.append(result)
+        lc_messages.append(ToolMessage(content=result, tool_call_id=tid))
+
+
+def _run_tool_calls(
+    state: AgentState,
+    tool_by_name: dict[str, Any],
+    tool_calls: list[Any],
+    memo: dict[tuple[str, str], str],
+) -> list[tuple[str, dict, str, tuple[str, str]]]:
+    """同一条回复中的 tool_calls 去重后放入线程池并发执行，结果写入 memo。"""
+    calls, todo = _pending_calls(state, tool_calls, memo)
+    if len(todo) == 1:
+        (key, (name, args)), = todo.items()
+        memo[key] = str(_timed_tool(tool_by_name, name, args))
+    elif todo:
+        with ThreadPoolExecutor(max_workers=min(MAX_TOOL_WORKERS, len(todo))) as pool:
+            futures = {key: pool.submit(_timed_tool, tool_by_name, name, args) for key, (name, args) in todo.items()}
+            for key, future in futures.items():
+                memo[key] = str(future.result())
+    return calls
+
+
+async def _arun_tool_calls(
+    state: AgentState,
+    tool_by_name: dict[str, Any],
+    tool_calls: list[Any],
+    memo: dict[tuple[str, str], str],
+) -> list[tuple[str, dict, str, tuple[str, str]]]:
+    """_run_tool_calls 的异步版本：去重后的调用经 asyncio.gather 并发执行。"""
+    calls, todo = _pending_calls(state, tool_calls, memo)
+    results = await asyncio.gather(*(_atimed_tool(tool_by_name, name, args) for name, args in todo.values()))
+    for key, result in zip(todo, results):
+        memo[key] = str(result)
+    return calls
+
+
 def _chat_with_tools(
     state: AgentState,
     *,
@@ -56,12 +225,14 @@ def _chat_with_tools(
     tools: list[Any],
     max_tool_rounds: int = 5,
 ) -> dict[str, Any]:
-    """带工具调用的对话：LLM 可请求调用 RAG 等工具，循环直到无 tool_calls 或达上限。将 RAG 返还结果写入 rag_context 供 router 读取。"""
-    from langchain_core.messages import ToolMessage
-
-    messages = list(state.get("messages") or [])
-    lc_messages = _dict_to_langchain_messages(messages)
+    """
+    带工具调用的对话：LLM 可请求调用 RAG 等工具，循环直到无 tool_calls 或达上限。将 RAG 返还结果写入 rag_context 供 router 读取。
+    同一条回复中的多个 tool_call 并发执行；相同 (工具名, 参数) 在本次对话的各轮之间只执行一次。
+    """
+    lc_messages = _dict_to_langchain_messages(state.get("messages") or [])
     bound = llm.bind_tools(tools)
+    tool_by_name = _tool_map(tools)
+    memo: dict[tuple[str, str], str] = {}
     response = None
     rag_context: list[str] = []  # 本轮 RAG 工具返还结果，供 router 决定是否结束
 
@@ -70,42 +241,40 @@ def _chat_with_tools(
         if not getattr(response, "tool_calls", None):
             break
         lc_messages.append(response)
-        for tc in response.tool_calls:
-            name, args, tid = _get_tool_call_info(tc)
-            tool_by_name = {t.name: t for t in tools}
-            func = tool_by_name.get(name)
-            if func:
-                result = func.invoke(args) if hasattr(func, "invoke") else func(args)
-            else:
-                result = "（工具未找到）"
-            if name == RAG_TOOL_NAME:
-                rag_context.append(str(result))
-            lc_messages.append(ToolMessage(content=str(result), tool_call_id=tid))
-
-    if response is None:
-        messages.append({"role": "assistant", "content": ""})
-        return {
-            "step": "chat",
-            "step_count": next_step_count(state),
-            "messages": messages,
-            "rag_context": rag_context,
-            "thinking_steps": append_thinking_step(state, "生成回复（闲聊/产品咨询）"),
-        }
-    final_content = getattr(response, "content", None) or str(response)
-    if isinstance(final_content, list):
-        parts = [
-            c.get("text", str(c)) if isinstance(c, dict) else (c if isinstance(c, str) else getattr(c, "content", str(c)))
-            for c in final_content
-        ]
-        final_content = "\n".join(parts)
-    messages.append({"role": "assistant", "content": final_content})
-    return {
-        "step": "chat",
-        "step_count": next_step_count(state),
-        "messages": messages,
-        "rag_context": rag_context,
-        "thinking_steps": append_thinking_step(state, "生成回复（闲聊/产品咨询）"),
-    }
+        calls = _run_tool_calls(state, tool_by_name, response.tool_calls, memo)
+        _append_tool_messages(lc_messages, calls, memo, rag_context)
+
+    return _tools_result(state, response, rag_context)
+
+
+async def _achat_with_tools(
+    state: AgentState,
+    *,
+    llm: Any,
+    tools: list[Any],
+    max_tool_rounds: int = 5,
+    on_token: Callable[[str], Any] | None = None,
+) -> dict[str, Any]:
+    """_chat_with_tools 的异步版本：LLM 与工具调用均 await，不阻塞事件循环。最终回复整段回调 on_token。"""
+    lc_messages = _dict_to_langchain_messages(state.get("messages") or [])
+    bound = llm.bind_tools(tools)
+    tool_by_name = _tool_map(tools)
+    memo: dict[tuple[str, str], str] = {}
+    response = None
+    rag_context: list[str] = []
+
+    for _ in range(max_tool_rounds):
+        response = await ainvoke_llm(bound, lc_messages)
+        if not getattr(response, "tool_calls", None):
+            break
+        lc_messages.append(response)
+        calls = await _arun_tool_calls(state, tool_by_name, response.tool_calls, memo)
+        _append_tool_messages(lc_messages, calls, memo, rag_context)
+
+    out = _tools_result(state, response, rag_context)
+    if on_token is not None and response is not None:
+        on_token(out["messages"][-1]["content"])
+    return out
 
 
 def chat(
@@ -122,15 +291,27 @@ def chat(
     """
     if tools and llm is not None:
         return _chat_with_tools(state, llm=llm, tools=tools)
+    response = chat_completion(list(state.get("messages") or []))
+    return _chat_result(state, [{"role": "assistant", "content": response}])
+
+
+async def achat(
+    state: AgentState,
+    *,
+    achat_completion: Callable[..., Awaitable[str]],
+    tools: list[Any] | None = None,
+    llm: Any = None,
+    on_token: Callable[[str], Any] | None = None,
+) -> dict[str, Any]:
+    """chat 的异步版本，供 graph.ainvoke / astream 使用。传入 on_token 时回复以增量方式回调。"""
+    if tools and llm is not None:
+        return await _achat_with_tools(state, llm=llm, tools=tools, on_token=on_token)
     messages = list(state.get("messages") or [])
-    response = chat_completion(messages)
-    messages.append({"role": "assistant", "content": response})
-    return {
-        "step": "chat",
-        "step_count": next_step_count(state),
-        "messages": messages,
-        "thinking_steps": append_thinking_step(state, "生成回复（闲聊/产品咨询）"),
-    }
+    if on_token is not None:
+        response = await achat_completion(messages, on_token=on_token)
+    else:
+        response = await achat_completion(messages)
+    return _chat_result(state, [{"role": "assistant", "content": response}])
 
 
 def create_chat_node(
@@ -145,3 +326,28 @@ def create_chat_node(
         tools=tools,
         llm=llm,
     )
+
+
+def create_async_chat_node(
+    achat_completion: Callable[..., Awaitable[str]],
+    tools: list[Any] | None = None,
+    llm: Any = None,
+):
+    """
+    返回异步节点函数 async (state, config) -> partial_state；config 中带 token 回调时流式输出回复，
+    并在输出前调用回复开始回调（同一轮内 chat 可能执行多次，每次都是一条新回复）。
+    """
+
+    async def node(state: AgentState, config: Any = None) -> dict[str, Any]:
+        on_token = get_token_callback(config)
+        if on_token is not None and (on_reply_start := get_reply_start_callback(config)) is not None:
+            on_reply_start()
+        return await achat(
+            state,
+            achat_completion=achat_completion,
+            tools=tools,
+            llm=llm,
+            on_token=on_token,
+        )
+
+    return node
@@ -2,16 +2,15 @@
 import json
 import os
 import re
-from pathlib import Path
 from typing import Any
 
+from packages.agent.policies.transitions import match_transition, record_saved_calls
+from packages.agent.prompts import render_prompt
 from packages.agent.state import AgentState, append_thinking_step, next_step_count
-
-CHECK_PROMPT_PATH = Path(__file__).resolve().parent.parent / "prompts" / "check.md"
-
-
-def _load_prompt() -> str:
-    return CHECK_PROMPT_PATH.read_text(encoding="utf-8")
+from packages.llm.chat_completion import ainvoke_llm
+from packages.llm.cache import CachedChatModel
+from packages.llm.client import get_langchain_chat_model
+from packages.llm.model_config import is_llm_cache_enabled
 
 
 def _last_user_message(state: AgentState) -> str:
@@ -76,69 +75,59 @@ def _parse_check_response(response: str) -> bool:
         return False
 
 
-def check_node(state: AgentState, *, llm: Any = None) -> dict[str, Any]:
-    """
-    根据 state（上一节点、对话、RAG、报价单等）用 GPT-4o 决定是否结束。
-    返回 { should_end }。不覆盖 state.step，以便 router 仍能读到上一节点。
-    """
-    last_step = state.get("step") or "（未知）"
-    current_intent = state.get("current_intent") or "（未知）"
-    user_message = _last_user_message(state)
-    recent = _recent_messages_summary(state)
-    rag_summary = _rag_context_summary(state)
-    has_quote = "是" if (state.get("quote_md") or "").strip() else "否"
-    state_summary = _state_summary(state)
-
-    if llm is None:
-        api_key = (os.environ.get("OPENAI_API_KEY") or "").strip()
-        if api_key:
-            try:
-                from langchain_openai import ChatOpenAI
-                llm = ChatOpenAI(
-                    model="gpt-4o",
-                    api_key=api_key,
-                    temperature=0.1,
-                )
-            except Exception:
-                llm = None
+def _resolve_llm(llm: Any) -> Any:
+    """未传入 llm 时用 OPENAI_API_KEY 创建 gpt-4o；无有效 key 时返回 None 走 fallback。"""
+    if llm is not None:
+        return llm
+    api_key = (os.environ.get("OPENAI_API_KEY") or "").strip()
+    if not api_key:
         # 无有效 API key 时直接用 fallback，避免发请求卡住（如本地跑测）
+        return None
+    try:
+        # 进程内复用同一个 ChatOpenAI 实例与连接池，不再每次调用新建
+        llm = get_langchain_chat_model(model="gpt-4o", api_key=api_key, temperature=0.1, model_key="planner")
+        if is_llm_cache_enabled("check"):
+            llm = CachedChatModel(llm, namespace="check", model="gpt-4o", temperature=0.1)
+        return llm
+    except Exception:
+        return None
+
 
+def _check_without_llm(state: AgentState, llm: Any) -> dict[str, Any] | None:
+    """无需调用 LLM 即可确定结果时返回 partial_state，否则返回 None。"""
+    last_step = state.get("step") or "（未知）"
     if llm is None:
         # fallback：generate_quote 后结束，其余不结束
         should_end = (last_step == "generate_quote")
         return {"step_count": next_step_count(state), "should_end": should_end}
 
-    # 刚向用户索要参数/需求时，必须结束本轮，等用户回复后再继续（避免同一轮继续 recommend/chat 导致“思考流程”与“实际回复”不一致）
-    if last_step == "collect_recommend_params" and not state.get("recommend_params_ready"):
-        return {
-            "step_count": next_step_count(state),
-            "should_end": True,
-            "thinking_steps": append_thinking_step(state, "已向用户索要推荐参数，结束本轮等待回复"),
-        }
-    if last_step == "collect_requirements" and not state.get("requirements_ready"):
-        return {
-            "step_count": next_step_count(state),
-            "should_end": True,
-            "thinking_steps": append_thinking_step(state, "已向用户索要报价需求，结束本轮等待回复"),
-        }
-
-    prompt_tpl = _load_prompt()
-    prompt = (
-        prompt_tpl.replace("{{last_step}}", last_step)
-        .replace("{{current_intent}}", current_intent)
-        .replace("{{user_message}}", user_message or "（无）")
-        .replace("{{recent_messages}}", recent)
-        .replace("{{rag_context}}", rag_summary)
-        .replace("{{has_quote}}", has_quote)
-        .replace("{{state_summary}}", state_summary)
+    # 转移表已能确定是否结束（如刚向用户索要参数、报价单已生成、算价后必然生成报价单）时不调用 LLM
+    forced = match_transition(state)
+    if forced is None or forced.should_end is None:
+        return None
+    step_desc = forced.reason if forced.should_end else "继续对话，规划下一步"
+    return {
+        "step_count": next_step_count(state),
+        "should_end": forced.should_end,
+        "thinking_steps": append_thinking_step(state, step_desc),
+        **record_saved_calls(state, "check"),
+    }
+
+
+def _build_check_prompt(state: AgentState) -> str:
+    return render_prompt(
+        "check",
+        last_step=state.get("step") or "（未知）",
+        current_intent=state.get("current_intent") or "（未知）",
+        user_message=_last_user_message(state) or "（无）",
+        recent_messages=_recent_messages_summary(state),
+        rag_context=_rag_context_summary(state),
+        has_quote="是" if (state.get("quote_md") or "").strip() else "否",
+        state_summary=_state_summary(state),
     )
 
-    try:
-        from langchain_core.messages import HumanMessage
-        response = llm.invoke([HumanMessage(content=prompt)])
-        response_text = getattr(response, "content", None) or str(response)
-    except Exception:
-        response_text = ""
+
+def _check_result(state: AgentState, response_text: str) -> dict[str, Any]:
     should_end = _parse_check_response(response_text)
     step_desc = "判断结束本轮" if should_end else "继续对话，规划下一步"
     return {
@@ -148,6 +137,52 @@ def check_node(state: AgentState, *, llm: Any = None) -> dict[str, Any]:
     }
 
 
+def check_node(state: AgentState, *, llm: Any = None) -> dict[str, Any]:
+    """
+    根据 state（上一节点、对话、RAG、报价单等）用 GPT-4o 决定是否结束。
+    返回 { should_end }。不覆盖 state.step，以便 router 仍能读到上一节点。
+    """
+    llm = _resolve_llm(llm)
+    early = _check_without_llm(state, llm)
+    if early is not None:
+        return early
+
+    prompt = _build_check_prompt(state)
+    try:
+        from langchain_core.messages import HumanMessage
+        response = llm.invoke([HumanMessage(content=prompt)])
+        response_text = getattr(response, "content", None) or str(response)
+    except Exception:
+        response_text = ""
+    return _check_result(state, response_text)
+
+
+async def acheck_node(state: AgentState, *, llm: Any = None) -> dict[str, Any]:
+    """check_node 的异步版本：LLM 调用走 ainvoke，不占用线程池。"""
+    llm = _resolve_llm(llm)
+    early = _check_without_llm(state, llm)
+    if early is not None:
+        return early
+
+    prompt = _build_check_prompt(state)
+    try:
+        from langchain_core.messages import HumanMessage
+        response = await ainvoke_llm(llm, [HumanMessage(content=prompt)])
+        response_text = getattr(response, "content", None) or str(response)
+    except Exception:
+        response_text = ""
+    return _check_result(state, response_text)
+
+
 def create_check_node(llm: Any = None):
     """返回供 LangGraph 使用的单参节点函数 (state) -> partial_state。"""
     return lambda state: check_node(state, llm=llm)
+
+
+def create_async_check_node(llm: Any = None):
+    """返回异步单参节点函数 async (state) -> partial_state。"""
+
+    async def node(state: AgentState) -> dict[str, Any]:
+        return await acheck_node(state, llm=llm)
+
+    return node
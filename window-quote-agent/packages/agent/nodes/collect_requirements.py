@@ -5,17 +5,11 @@
 """
 import json
 import re
-from pathlib import Path
-from typing import Any, Callable
+from typing import Any, Awaitable, Callable
 
+from packages.agent.prompts import render_prompt
 from packages.agent.state import AgentState, append_thinking_step, next_step_count
 
-COLLECT_PROMPT_PATH = Path(__file__).resolve().parent.parent / "prompts" / "collect_requirements.md"
-
-
-def _load_prompt() -> str:
-    return COLLECT_PROMPT_PATH.read_text(encoding="utf-8")
-
 
 REQUIREMENT_KEYS = ("w", "h", "location", "opening_count")
 
@@ -128,24 +122,21 @@ def _parse_requirements_from_response(response: str) -> dict[str, Any]:
         return {}
 
 
-def collect_requirements(
-    state: AgentState, chat_completion: Callable[..., str]
-) -> dict[str, Any]:
-    """
-    根据 messages 中最后一条用户消息调用 LLM 提取需求，更新 state.requirements。
-    若合并后仍无任何一项（宽、高、地点、开扇数），则追加一条「请提供…」的 assistant 消息并返回，
-    由上层路由到 check 后 END 或再进 router；若有任一项，则更新 requirements，由上层路由进入 recommend。
-    chat_completion(messages: list[dict]) -> str。
-    """
-    messages = list(state.get("messages") or [])
-    user_message = ""
-    for m in reversed(messages):
+def _last_user_message(state: AgentState) -> str:
+    for m in reversed(state.get("messages") or []):
         if m.get("role") == "user":
-            user_message = m.get("content") or ""
-            break
-    prompt = _load_prompt().replace("{{user_message}}", user_message)
-    llm_messages = [{"role": "user", "content": prompt}]
-    response = chat_completion(llm_messages)
+            return m.get("content") or ""
+    return ""
+
+
+def _build_llm_messages(state: AgentState) -> list[dict[str, Any]]:
+    prompt = render_prompt("collect_requirements", user_message=_last_user_message(state))
+    return [{"role": "user", "content": prompt}]
+
+
+def _apply_response(state: AgentState, response: str) -> dict[str, Any]:
+    """解析 LLM 回复并与已有 requirements 合并，生成 partial_state。"""
+    user_message = _last_user_message(state)
     extracted = _parse_requirements_from_response(response)
     # 以 LLM 结构化 JSON 为准；仅当 LLM 未解析出某字段时用规则兜底，保证「宽度为1」等能推进状态
     if extracted.get("opening_count") is None:
@@ -162,11 +153,10 @@ def collect_requirements(
     merged = {**existing, **extracted}
 
     if not _has_any_requirement(merged):
-        messages.append({"role": "assistant", "content": _ask_message()})
         return {
             "step": "collect_requirements",
             "step_count": next_step_count(state),
-            "messages": messages,
+            "messages": [{"role": "assistant", "content": _ask_message()}],
             "requirements": merged,
             "requirements_ready": False,
             "flow_stage": "collect_requirements",
@@ -177,11 +167,10 @@ def collect_requirements(
         content = _confirm_message(merged)
     else:
         content = _off_topic_in_flow_message()
-    messages.append({"role": "assistant", "content": content})
     return {
         "step": "collect_requirements",
         "step_count": next_step_count(state),
-        "messages": messages,
+        "messages": [{"role": "assistant", "content": content}],
         "requirements": merged,
         "requirements_ready": True,
         "flow_stage": "collect_requirements",
@@ -189,6 +178,36 @@ def collect_requirements(
     }
 
 
+def collect_requirements(
+    state: AgentState, chat_completion: Callable[..., str]
+) -> dict[str, Any]:
+    """
+    根据 messages 中最后一条用户消息调用 LLM 提取需求，更新 state.requirements。
+    若合并后仍无任何一项（宽、高、地点、开扇数），则追加一条「请提供…」的 assistant 消息并返回，
+    由上层路由到 check 后 END 或再进 router；若有任一项，则更新 requirements，由上层路由进入 recommend。
+    chat_completion(messages: list[dict]) -> str。
+    """
+    response = chat_completion(_build_llm_messages(state))
+    return _apply_response(state, response)
+
+
+async def acollect_requirements(
+    state: AgentState, achat_completion: Callable[..., Awaitable[str]]
+) -> dict[str, Any]:
+    """collect_requirements 的异步版本：achat_completion(messages) -> Awaitable[str]。"""
+    response = await achat_completion(_build_llm_messages(state))
+    return _apply_response(state, response)
+
+
 def create_collect_requirements_node(chat_completion: Callable[..., str]):
     """返回供 LangGraph 使用的单参节点函数 (state) -> partial_state。"""
     return lambda state: collect_requirements(state, chat_completion)
+
+
+def create_async_collect_requirements_node(achat_completion: Callable[..., Awaitable[str]]):
+    """返回异步单参节点函数 async (state) -> partial_state。"""
+
+    async def node(state: AgentState) -> dict[str, Any]:
+        return await acollect_requirements(state, achat_completion)
+
+    return node
@@ -0,0 +1,78 @@
+"""
+多意图并行：router 给出 >= 2 个互不依赖的子任务时，经 LangGraph Send 扇出到 branch 节点同时执行，再由 join 合并。
+
+- 只有只依赖对话、写入互不重叠字段的节点可并行（router.PARALLEL_SAFE_NODES）；recommend / price_quote / generate_quote
+  依赖前一步的输出，仍按单节点串行；
+- branch 节点运行被选中的业务节点，但不直接写 state，而是追加 {node, update} 到 branch_updates，避免并行分支同时写
+  step / step_count 等单值字段产生冲突；
+- join 按 router 给出的顺序合并：各分支的 assistant 回复拼成一条消息（一轮对话只回复一次），thinking_steps 依次追加，
+  其余字段后者覆盖前者，step 取最后一个分支。
+"""
+from typing import Any, Mapping
+
+from packages.agent.state import AgentState, ReplaceList, append_thinking_step
+
+# Send 载荷中指定分支要执行的节点
+BRANCH_NODE_KEY = "branch_node"
+# 合并多个分支回复时的分隔
+REPLY_SEPARATOR = "\n\n"
+
+
+def branch_payload(state: AgentState, node: str) -> dict[str, Any]:
+    """Send 给 branch 的输入：当前 state 的浅拷贝 + 要执行的节点名。"""
+    return {**state, BRANCH_NODE_KEY: node}
+
+
+def _branch_update(payload: dict[str, Any], update: dict[str, Any] | None) -> dict[str, Any]:
+    return {"branch_updates": [{"node": payload[BRANCH_NODE_KEY], "update": dict(update or {})}]}
+
+
+def create_branch_node(nodes: Mapping[str, Any]):
+    """nodes：节点名 → Runnable（与图中注册的同一实现）。返回同步 branch 节点 (payload, config)。"""
+
+    def node(payload: dict[str, Any], config: Any = None) -> dict[str, Any]:
+        return _branch_update(payload, nodes[payload[BRANCH_NODE_KEY]].invoke(payload, config))
+
+    return node
+
+
+def create_async_branch_node(nodes: Mapping[str, Any]):
+    """异步版本：各分支的 LLM 调用并发进行，本轮耗时约等于最慢的分支。"""
+
+    async def node(payload: dict[str, Any], config: Any = None) -> dict[str, Any]:
+        return _branch_update(payload, await nodes[payload[BRANCH_NODE_KEY]].ainvoke(payload, config))
+
+    return node
+
+
+def _merge_replies(messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """各分支的 assistant 回复按顺序拼成一条，放在其余消息之后。"""
+    replies = [m["content"] for m in messages if m.get("role") == "assistant" and m.get("content")]
+    others = [m for m in messages if m.get("role") != "assistant"]
+    if not replies:
+        return others
+    return others + [{"role": "assistant", "content": REPLY_SEPARATOR.join(replies)}]
+
+
+def join_branches(state: AgentState) -> dict[str, Any]:
+    """合并并行分支的输出，并清空 branch_updates / parallel_nodes。"""
+    order = {n: i for i, n in enumerate(state.get("parallel_nodes") or [])}
+    updates = sorted(state.get("branch_updates") or [], key=lambda u: order.get(u.get("node"), len(order)))
+    merged: dict[str, Any] = {}
+    messages: list[dict[str, Any]] = []
+    steps: list[str] = []
+    for item in updates:
+        update = dict(item.get("update") or {})
+        messages.extend(update.pop("messages", None) or [])
+        steps.extend(update.pop("thinking_steps", None) or [])
+        update.pop("step_count", None)
+        merged.update(update)
+    names = "、".join(u.get("node", "") for u in updates)
+    return {
+        **merged,
+        "step_count": (state.get("step_count") or 0) + len(updates),
+        "messages": _merge_replies(messages),
+        "thinking_steps": steps + append_thinking_step(state, f"合并并行子任务：{names}"),
+        "branch_updates": ReplaceList(),
+        "parallel_nodes": [],
+    }
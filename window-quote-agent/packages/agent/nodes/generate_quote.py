@@ -4,12 +4,12 @@ from typing import Any
 from packages.agent.state import AgentState, append_thinking_step, next_step_count
 
 
-def generate_quote(state: AgentState) -> dict[str, Any]:
+def render_quote_md(price_result: dict[str, Any]) -> str:
     """
-    从 state.price_result 生成 Markdown 格式报价单，
-    必须包含「总价」和「明细表格」。
+    将 price_result 渲染为 Markdown 报价单，必须包含「总价」和「明细表格」。
+    纯函数，供 generate_quote 节点与 /quote 接口共用。
     """
-    price_result = state.get("price_result") or {}
+    price_result = price_result or {}
     total = price_result.get("total", 0)
     breakdown = price_result.get("breakdown") or []
     series_id = price_result.get("series_id", "")
@@ -31,14 +31,19 @@ def generate_quote(state: AgentState) -> dict[str, Any]:
     lines.append("")
     if series_id:
         lines.append(f"*系列：{series_id}*")
+    if pricing_version := price_result.get("pricing_version"):
+        lines.append(f"*价目表版本：{pricing_version}*")
+
+    return "\n".join(lines)
 
-    quote_md = "\n".join(lines)
-    messages = list(state.get("messages") or [])
-    messages.append({"role": "assistant", "content": quote_md})
+
+def generate_quote(state: AgentState) -> dict[str, Any]:
+    """从 state.price_result 生成 Markdown 格式报价单，并作为 assistant 消息追加。"""
+    quote_md = render_quote_md(state.get("price_result") or {})
     return {
         "step": "generate_quote",
         "step_count": next_step_count(state),
-        "messages": messages,
+        "messages": [{"role": "assistant", "content": quote_md}],
         "quote_md": quote_md,
         "flow_stage": "",  # 报价流程结束，清空阶段以便后续轮次可重新意图识别
         "thinking_steps": append_thinking_step(state, "生成报价单"),
@@ -1,4 +1,5 @@
 """意图节点：跑 intent pipeline 或 intent_check，输出 current_intent 作为**参考**，不强控路由。"""
+import asyncio
 from typing import Any, Callable
 
 from packages.agent.state import AgentState, append_thinking_step, next_step_count
@@ -35,11 +36,13 @@ def resolve_intent(
         primary = out.get("primary_intent") if isinstance(out, dict) else getattr(out, "primary_intent", "其他")
         if primary not in INTENTS:
             primary = "其他"
+        tasks = out.get("tasks") if isinstance(out, dict) else getattr(out, "tasks", None)
         return {
             "step": "intent",
             "step_count": next_step_count(state),
             "current_intent": primary,
             "turns_with_same_intent": 1,
+            "intent_tasks": list(tasks or []),
             "rag_context": [],  # 新轮开始时清空，供 chat→router 时写入本轮 RAG 结果
             "thinking_steps": append_thinking_step(state, f"识别用户意图：{primary}"),
         }
@@ -56,6 +59,7 @@ def resolve_intent(
         "step_count": next_step_count(state),
         "current_intent": new_intent,
         "turns_with_same_intent": new_turns,
+        "intent_tasks": [],  # intent_check 只给出主意图，不拆分任务
         "rag_context": [],  # 新轮开始时清空
         "thinking_steps": append_thinking_step(state, f"识别用户意图：{new_intent}"),
     }
@@ -77,3 +81,25 @@ def create_intent_node(
         )
 
     return node
+
+
+def create_async_intent_node(
+    run_intent_pipeline_fn: Callable[[str], Any] | None = None,
+    *,
+    stale_threshold: int = 3,
+):
+    """
+    返回异步单参节点函数。意图流水线以规则为主、仅规则未命中时才调用小模型，
+    整体放入线程执行，避免阻塞事件循环。
+    """
+    fn = run_intent_pipeline_fn or run_intent_pipeline
+
+    async def node(state: AgentState) -> dict[str, Any]:
+        return await asyncio.to_thread(
+            resolve_intent,
+            state,
+            run_intent_pipeline_fn=fn,
+            stale_threshold=stale_threshold,
+        )
+
+    return node
@@ -0,0 +1,95 @@
+"""
+RAG 预取节点：与 intent 并行执行，请求一到就用用户消息（以及上一轮已有推荐参数时 recommend 的检索 query）检索，
+结果存入 state.rag_prefetch（归一化 query -> chunks）。chat 的 product_knowledge_search 与 recommend 检索前先查预取结果，
+query 一致时直接复用，检索不再位于 LLM 调用之后的关键路径上。
+
+检索用原始 query（与下游未命中时的检索一致，不经过术语映射改写），归一化后的 query 只作为查找的 key。
+"""
+import asyncio
+from typing import Any, Callable
+
+from packages.agent.state import AgentState
+from packages.intent.preprocess import preprocess
+from packages.observability.metrics import metrics
+
+
+def normalize_query(query: str) -> str:
+    """预取与查找共用的 key：与意图流水线相同的文本清洗（含术语映射），只用于比较，不用于检索。"""
+    return preprocess((query or "").strip())["cleaned_prompt"]
+
+
+def _last_user_message(state: AgentState) -> str:
+    for m in reversed(state.get("messages") or []):
+        if m.get("role") == "user":
+            return m.get("content") or ""
+    return ""
+
+
+def prefetch_queries(state: AgentState) -> dict[str, str]:
+    """
+    推测本轮可能用到的检索 query：用户消息；上一轮已收集推荐参数/需求时再加 recommend 的 query。
+    返回 {归一化 key: 原始 query}，归一化后相同的只检索一次。
+    """
+    from packages.agent.nodes.recommend import _build_query
+
+    queries = [_last_user_message(state).strip()]
+    if state.get("recommend_params") or state.get("requirements"):
+        queries.append(_build_query(state).strip())
+    out: dict[str, str] = {}
+    for query in queries:
+        if query and (key := normalize_query(query)):
+            out.setdefault(key, query)
+    return out
+
+
+def lookup_prefetched(state: AgentState, query: str) -> list[str] | None:
+    """query 与预取 query 一致时返回预取结果，否则返回 None（调用方照常检索）。"""
+    prefetched = state.get("rag_prefetch") or {}
+    if not prefetched:
+        return None
+    chunks = prefetched.get(normalize_query(query))
+    metrics.incr("rag_prefetch_lookups_total", result="miss" if chunks is None else "hit")
+    return chunks
+
+
+def _to_text_chunks(chunks: Any) -> list[str]:
+    if not chunks:
+        return []
+    if isinstance(chunks[0], str):
+        return list(chunks)
+    return [c.get("content", str(c)) for c in chunks]
+
+
+def _prefetch(state: AgentState, retrieve: Callable[[str], list[str]]) -> dict[str, Any]:
+    out: dict[str, list[str]] = {}
+    for key, query in prefetch_queries(state).items():
+        try:
+            out[key] = _to_text_chunks(retrieve(query))
+        except Exception:
+            # 预取只是推测，失败时由下游节点照常检索
+            continue
+    return {"rag_prefetch": out}
+
+
+def rag_prefetch(state: AgentState, retrieve: Callable[[str], list[str]]) -> dict[str, Any]:
+    """返回 { rag_prefetch }；不写 step / step_count，以便与 intent 在同一步并行执行。"""
+    return _prefetch(state, retrieve)
+
+
+async def arag_prefetch(state: AgentState, retrieve: Callable[[str], list[str]]) -> dict[str, Any]:
+    """异步版本：BM25 为 CPU 计算，放到线程中执行，与 intent 的 LLM 调用并行。"""
+    return await asyncio.to_thread(_prefetch, state, retrieve)
+
+
+def create_rag_prefetch_node(retrieve: Callable[[str], list[str]]):
+    """返回供 LangGraph 使用的单参节点函数 (state) -> partial_state。"""
+    return lambda state: rag_prefetch(state, retrieve)
+
+
+def create_async_rag_prefetch_node(retrieve: Callable[[str], list[str]]):
+    """返回异步单参节点函数 async (state) -> partial_state。"""
+
+    async def node(state: AgentState) -> dict[str, Any]:
+        return await arag_prefetch(state, retrieve)
+
+    return node
@@ -33,7 +33,6 @@ def rag_query(
     """
     产品咨询：用最后一条用户消息做 retrieve，再拼成带上下文的 prompt 交给 chat_completion，回复追加到 messages。
     """
-    messages = list(state.get("messages") or [])
     user_message = _last_user_message(state)
     query = user_message.strip() or "窗户 型材 产品"
     chunks = retrieve(query)
@@ -41,10 +40,9 @@ def rag_query(
     prompt = _build_rag_prompt(user_message, rag_context)
     llm_messages = [{"role": "user", "content": prompt}]
     response = chat_completion(llm_messages)
-    messages.append({"role": "assistant", "content": response})
     return {
         "step": "rag_query",
-        "messages": messages,
+        "messages": [{"role": "assistant", "content": response}],
         "rag_context": rag_context,
     }
 
@@ -1,17 +1,13 @@
 """推荐节点：调用 RAG + Catalog，由 LLM 推荐系列，更新 state.selection。"""
+import asyncio
 import json
 import re
-from pathlib import Path
-from typing import Any, Callable
+from typing import Any, Awaitable, Callable
 
+from packages.agent.nodes.rag_prefetch import lookup_prefetched
+from packages.agent.prompts import render_prompt
 from packages.agent.state import AgentState, append_thinking_step, next_step_count
 
-RECOMMEND_PROMPT_PATH = Path(__file__).resolve().parent.parent / "prompts" / "recommend.md"
-
-
-def _load_prompt() -> str:
-    return RECOMMEND_PROMPT_PATH.read_text(encoding="utf-8")
-
 
 def _parse_series_id_from_response(response: str) -> str | None:
     """从 LLM 回复中解析 series_id。"""
@@ -39,19 +35,8 @@ def _query_from_recommend_params(recommend_params: dict[str, Any]) -> str | None
     return " ".join(parts) + " 型材推荐"
 
 
-def recommend(
-    state: AgentState,
-    retrieve: Callable[[str], list[str]],
-    list_series: Callable[[], list[dict[str, Any]]],
-    chat_completion: Callable[..., str],
-) -> dict[str, Any]:
-    """
-    根据 state.recommend_params（产品推荐）或 state.requirements（报价）或最后一条消息构造 query，
-    检索 RAG，结合 catalog 列表，调用 LLM 推荐 series_id，更新 state.selection 和 state.rag_context。
-    - retrieve(query) -> list[str] 文本片段
-    - list_series() -> list[{"id": str, "name": str}, ...]
-    """
-    messages = state.get("messages") or []
+def _build_query(state: AgentState) -> str:
+    """根据 recommend_params（产品推荐）或 requirements（报价）构造检索 query。"""
     requirements = state.get("requirements") or {}
     recommend_params = state.get("recommend_params") or {}
     query = "窗户型材选型 断桥铝 系列推荐"
@@ -66,7 +51,15 @@ def recommend(
             parts.append(requirements["location"])
         if parts:
             query = " ".join(parts) + " 型材推荐"
-    chunks = retrieve(query)
+    return query
+
+
+def _prepare(
+    state: AgentState,
+    chunks: list[Any],
+    list_series: Callable[[], list[dict[str, Any]]],
+) -> tuple[list[str], list[dict[str, Any]], list[dict[str, Any]]]:
+    """用检索结果拼 prompt，返回 (rag_context, series_list, llm_messages)。"""
     if not chunks:
         rag_context = []
     elif isinstance(chunks[0], str):
@@ -76,13 +69,16 @@ def recommend(
     rag_text = "\n".join(rag_context) if rag_context else "（无检索结果）"
     series_list = list_series()
     series_text = "\n".join(f"- id: {s.get('id', '')}, name: {s.get('name', s.get('id', ''))}" for s in series_list)
-    prompt = (
-        _load_prompt()
-        .replace("{{rag_context}}", rag_text)
-        .replace("{{series_list}}", series_text)
-    )
-    llm_messages = [{"role": "user", "content": prompt}]
-    response = chat_completion(llm_messages)
+    prompt = render_prompt("recommend", rag_context=rag_text, series_list=series_text)
+    return rag_context, series_list, [{"role": "user", "content": prompt}]
+
+
+def _apply_response(
+    state: AgentState,
+    response: str,
+    rag_context: list[str],
+    series_list: list[dict[str, Any]],
+) -> dict[str, Any]:
     series_id = _parse_series_id_from_response(response)
     if not series_id and series_list:
         series_id = str(series_list[0].get("id", ""))
@@ -99,6 +95,43 @@ def recommend(
     }
 
 
+def recommend(
+    state: AgentState,
+    retrieve: Callable[[str], list[str]],
+    list_series: Callable[[], list[dict[str, Any]]],
+    chat_completion: Callable[..., str],
+) -> dict[str, Any]:
+    """
+    根据 state.recommend_params（产品推荐）或 state.requirements（报价）或最后一条消息构造 query，
+    检索 RAG，结合 catalog 列表，调用 LLM 推荐 series_id，更新 state.selection 和 state.rag_context。
+    - retrieve(query) -> list[str] 文本片段
+    - list_series() -> list[{"id": str, "name": str}, ...]
+    """
+    query = _build_query(state)
+    chunks = lookup_prefetched(state, query)
+    if chunks is None:
+        chunks = retrieve(query)
+    rag_context, series_list, llm_messages = _prepare(state, chunks, list_series)
+    response = chat_completion(llm_messages)
+    return _apply_response(state, response, rag_context, series_list)
+
+
+async def arecommend(
+    state: AgentState,
+    retrieve: Callable[[str], list[str]],
+    list_series: Callable[[], list[dict[str, Any]]],
+    achat_completion: Callable[..., Awaitable[str]],
+) -> dict[str, Any]:
+    """recommend 的异步版本：与本轮预取不一致时 BM25 检索放到线程中执行，LLM 调用 await。"""
+    query = _build_query(state)
+    chunks = lookup_prefetched(state, query)
+    if chunks is None:
+        chunks = await asyncio.to_thread(retrieve, query)
+    rag_context, series_list, llm_messages = _prepare(state, chunks, list_series)
+    response = await achat_completion(llm_messages)
+    return _apply_response(state, response, rag_context, series_list)
+
+
 def create_recommend_node(
     retrieve: Callable[[str], list[str]],
     list_series: Callable[[], list[dict[str, Any]]],
@@ -106,3 +139,16 @@ def create_recommend_node(
 ):
     """返回供 LangGraph 使用的单参节点函数 (state) -> partial_state。"""
     return lambda state: recommend(state, retrieve, list_series, chat_completion)
+
+
+def create_async_recommend_node(
+    retrieve: Callable[[str], list[str]],
+    list_series: Callable[[], list[dict[str, Any]]],
+    achat_completion: Callable[..., Awaitable[str]],
+):
+    """返回异步单参节点函数 async (state) -> partial_state。"""
+
+    async def node(state: AgentState) -> dict[str, Any]:
+        return await arecommend(state, retrieve, list_series, achat_completion)
+
+    return node
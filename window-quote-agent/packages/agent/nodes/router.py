@@ -2,13 +2,16 @@
 import json
 import os
 import re
-from pathlib import Path
 from typing import Any, Callable
 
+from packages.agent.policies.transitions import match_transition, record_saved_calls
+from packages.agent.prompts import render_prompt
 from packages.agent.state import AgentState, append_thinking_step, next_step_count
+from packages.llm.chat_completion import ainvoke_llm
+from packages.llm.cache import CachedChatModel
+from packages.llm.client import get_langchain_chat_model
+from packages.llm.model_config import is_llm_cache_enabled
 
-ROUTER_PROMPT_PATH = Path(__file__).resolve().parent.parent / "prompts" / "router.md"
-ROUTER_PLANNER_PROMPT_PATH = Path(__file__).resolve().parent.parent / "prompts" / "router_planner.md"
 
 # router 只做 planner：输出下一节点；是否 END 由 check 节点决定
 VALID_NEXT_NODES = (
@@ -26,10 +29,8 @@ INTENT_TO_NODE = {
     "产品咨询": "chat",  # RAG 作为 chat 的 tool，由模型按需调用
     "价格咨询": "collect_requirements",
 }
-
-
-def _load_prompt(path: Path) -> str:
-    return path.read_text(encoding="utf-8")
+# 只依赖对话、写入字段互不重叠，可在同一轮并行执行的节点；其余节点依赖前一步输出，仍串行
+PARALLEL_SAFE_NODES = ("chat", "collect_recommend_params", "collect_requirements")
 
 
 def _last_user_message(state: AgentState) -> str:
@@ -112,6 +113,120 @@ def _fallback_next_node(state: AgentState) -> str:
     return "chat"
 
 
+def _resolve_planner_llm(llm: Any) -> Any:
+    """未传入 llm 时用 OPENAI_API_KEY 创建 gpt-4o；无有效 key 时返回 None 走 fallback。"""
+    if llm is not None:
+        return llm
+    api_key = (os.environ.get("OPENAI_API_KEY") or "").strip()
+    if not api_key:
+        # 无有效 API key 时直接用 fallback，避免发请求卡住（如本地跑测）
+        return None
+    try:
+        # 进程内复用同一个 ChatOpenAI 实例与连接池，不再每次调用新建
+        llm = get_langchain_chat_model(model="gpt-4o", api_key=api_key, temperature=0, model_key="planner")
+        if is_llm_cache_enabled("router"):
+            llm = CachedChatModel(llm, namespace="router", model="gpt-4o", temperature=0)
+        return llm
+    except Exception:
+        return None
+
+
+def _task_node(task: Any) -> str:
+    """plan_tasks / intent_tasks 的单项 → 节点名：支持 "chat"、{"node"}、{"next_node"}、{"intent"}。"""
+    if isinstance(task, str):
+        return task.strip()
+    if isinstance(task, dict):
+        node = (task.get("node") or task.get("next_node") or "").strip()
+        return node or INTENT_TO_NODE.get((task.get("intent") or "").strip(), "")
+    return ""
+
+
+def _parallel_nodes(state: AgentState, plan_tasks: list[Any] | None) -> list[str]:
+    """
+    仅在 intent 之后的首次规划时并行：取 plan_tasks（为空时用 intent_tasks）中可并行的节点，
+    去重后不少于 2 个才返回，否则返回 []（按 next_node 单节点执行）。
+    """
+    if (state.get("step") or "") != "intent":
+        return []
+    tasks = plan_tasks or state.get("intent_tasks") or []
+    nodes = list(dict.fromkeys(n for n in map(_task_node, tasks) if n in PARALLEL_SAFE_NODES))
+    return nodes if len(nodes) >= 2 else []
+
+
+def _plan_steps(state: AgentState, next_node: str, parallel_nodes: list[str]) -> list[str]:
+    if parallel_nodes:
+        return append_thinking_step(state, f"并行执行子任务：{'、'.join(parallel_nodes)}")
+    return append_thinking_step(state, f"规划下一步：{next_node}")
+
+
+def _planner_fallback(state: AgentState) -> dict[str, Any]:
+    next_node = _fallback_next_node(state)
+    parallel_nodes = _parallel_nodes(state, None)
+    return {
+        "step": "router",
+        "next_node": next_node,
+        "task_split": bool(parallel_nodes),
+        "plan_tasks": [],
+        "parallel_nodes": parallel_nodes,
+        "thinking_steps": _plan_steps(state, next_node, parallel_nodes),
+    }
+
+
+def _forced_plan(state: AgentState) -> dict[str, Any] | None:
+    """转移表已确定下一节点时直接返回规划结果，不调用 LLM。"""
+    forced = match_transition(state)
+    if forced is None or not forced.next_node:
+        return None
+    return {
+        "step": "router",
+        "step_count": next_step_count(state),
+        "next_node": forced.next_node,
+        "task_split": False,
+        "plan_tasks": [],
+        "parallel_nodes": [],
+        "thinking_steps": append_thinking_step(state, f"规划下一步：{forced.next_node}"),
+        **record_saved_calls(state, "router"),
+    }
+
+
+def _build_planner_prompt(state: AgentState) -> str:
+    current_intent = (state.get("current_intent") or "").strip()
+    turns = max(0, state.get("turns_with_same_intent") or 0)
+    flow_stage = (state.get("flow_stage") or "").strip()
+    requirements_ready = "是" if state.get("requirements_ready") else "否"
+    return render_prompt(
+        "router_planner",
+        current_intent=current_intent or "（未知）",
+        turns_with_same_intent=turns,
+        user_message=_last_user_message(state) or "（无）",
+        recent_messages=_recent_messages_summary(state),
+        rag_context=_rag_context_summary(state),
+        last_step=state.get("step") or "（未知）",
+        flow_stage=flow_stage or "（无）",
+        requirements_ready=requirements_ready,
+    )
+
+
+def _planner_result(state: AgentState, response_text: str) -> dict[str, Any]:
+    parsed = _parse_planner_response(response_text)
+    next_node = parsed["next_node"]
+    if not next_node:
+        next_node = _fallback_next_node(state)
+        parsed["next_node"] = next_node
+
+    parallel_nodes = _parallel_nodes(state, parsed["plan_tasks"])
+    # 不覆盖 state.step，以便下一节点仍能读到上一业务节点（check 会覆盖 step 吗？check 不返回 step，所以 state.step 仍是上一节点）
+    return {
+        "step": "router",
+        "step_count": next_step_count(state),
+        "next_node": next_node,
+        "task_split": parsed["task_split"],
+        "plan_tasks": parsed["plan_tasks"],
+        "parallel_nodes": parallel_nodes,
+        "thinking_steps": _plan_steps(state, next_node, parallel_nodes),
+    }
+
+
 def router_planner(
     state: AgentState,
     *,
@@ -122,51 +237,13 @@ def router_planner(
     使用 GPT-4o 根据当前意图和用户信息决定是否拆分任务，并将结果分配给相应节点。
     返回 { step, next_node, task_split?, plan_tasks? }，供图上的 conditional_edges 使用。
     """
-    current_intent = (state.get("current_intent") or "").strip()
-    turns = max(0, state.get("turns_with_same_intent") or 0)
-    user_message = _last_user_message(state)
-    recent = _recent_messages_summary(state)
-    rag_summary = _rag_context_summary(state)
-
+    llm = _resolve_planner_llm(llm)
     if llm is None:
-        api_key = (os.environ.get("OPENAI_API_KEY") or "").strip()
-        if api_key:
-            try:
-                from langchain_openai import ChatOpenAI
-                llm = ChatOpenAI(
-                    model="gpt-4o",
-                    api_key=api_key,
-                    temperature=0,
-                )
-            except Exception:
-                llm = None
-        # 无有效 API key 时直接用 fallback，避免发请求卡住（如本地跑测）
-
-    if llm is None:
-        next_node = _fallback_next_node(state)
-        return {
-            "step": "router",
-            "next_node": next_node,
-            "task_split": False,
-            "plan_tasks": [],
-            "thinking_steps": append_thinking_step(state, f"规划下一步：{next_node}"),
-        }
-
-    last_step = state.get("step") or "（未知）"
-    flow_stage = (state.get("flow_stage") or "").strip()
-    requirements_ready = "是" if state.get("requirements_ready") else "否"
-    prompt_tpl = _load_prompt(ROUTER_PLANNER_PROMPT_PATH)
-    prompt = (
-        prompt_tpl.replace("{{current_intent}}", current_intent or "（未知）")
-        .replace("{{turns_with_same_intent}}", str(turns))
-        .replace("{{user_message}}", user_message or "（无）")
-        .replace("{{recent_messages}}", recent)
-        .replace("{{rag_context}}", rag_summary)
-        .replace("{{last_step}}", last_step)
-        .replace("{{flow_stage}}", flow_stage or "（无）")
-        .replace("{{requirements_ready}}", requirements_ready)
-    )
+        return _planner_fallback(state)
+    if (forced := _forced_plan(state)) is not None:
+        return forced
 
+    prompt = _build_planner_prompt(state)
     try:
         from langchain_core.messages import HumanMessage
         messages = [HumanMessage(content=prompt)]
@@ -177,22 +254,32 @@ def router_planner(
             response_text = str(response)
     except Exception:
         response_text = ""
+    return _planner_result(state, response_text)
 
-    parsed = _parse_planner_response(response_text)
-    next_node = parsed["next_node"]
-    if not next_node:
-        next_node = _fallback_next_node(state)
-        parsed["next_node"] = next_node
 
-    # 不覆盖 state.step，以便下一节点仍能读到上一业务节点（check 会覆盖 step 吗？check 不返回 step，所以 state.step 仍是上一节点）
-    return {
-        "step": "router",
-        "step_count": next_step_count(state),
-        "next_node": next_node,
-        "task_split": parsed["task_split"],
-        "plan_tasks": parsed["plan_tasks"],
-        "thinking_steps": append_thinking_step(state, f"规划下一步：{next_node}"),
-    }
+async def arouter_planner(
+    state: AgentState,
+    *,
+    llm: Any = None,
+) -> dict[str, Any]:
+    """router_planner 的异步版本：LLM 调用走 ainvoke，不占用线程池。"""
+    llm = _resolve_planner_llm(llm)
+    if llm is None:
+        return _planner_fallback(state)
+    if (forced := _forced_plan(state)) is not None:
+        return forced
+
+    prompt = _build_planner_prompt(state)
+    try:
+        from langchain_core.messages import HumanMessage
+        response = await ainvoke_llm(llm, [HumanMessage(content=prompt)])
+        if hasattr(response, "content"):
+            response_text = response.content or ""
+        else:
+            response_text = str(response)
+    except Exception:
+        response_text = ""
+    return _planner_result(state, response_text)
 
 
 def create_router_planner_node(llm: Any = None):
@@ -203,6 +290,15 @@ def create_router_planner_node(llm: Any = None):
     return lambda state: router_planner(state, llm=llm)
 
 
+def create_async_router_planner_node(llm: Any = None):
+    """返回异步单参节点函数 async (state) -> partial_state。"""
+
+    async def node(state: AgentState) -> dict[str, Any]:
+        return await arouter_planner(state, llm=llm)
+
+    return node
+
+
 # ----- 兼容旧用法：按 current_intent 透传，不调用 LLM -----
 
 
@@ -235,7 +331,7 @@ def router(
     if intent_classifier is not None:
         intent = intent_classifier(user_message)
     elif chat_completion is not None:
-        prompt = _load_prompt(ROUTER_PROMPT_PATH).replace("{{user_message}}", user_message)
+        prompt = render_prompt("router", user_message=user_message)
         llm_messages = [{"role": "user", "content": prompt}]
         response = chat_completion(llm_messages)
         intent = _parse_intent_from_response(response)
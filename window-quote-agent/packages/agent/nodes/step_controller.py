@@ -0,0 +1,182 @@
+"""Step controller 节点：合并 check 与 router planner，一次 GPT-4o 调用同时给出 should_end 与 next_node。"""
+import json
+import os
+import re
+from typing import Any
+
+from packages.agent.nodes.check_node import _check_without_llm, _state_summary
+from packages.agent.nodes.router import (
+    VALID_NEXT_NODES,
+    _fallback_next_node,
+    _last_user_message,
+    _rag_context_summary,
+    _recent_messages_summary,
+)
+from packages.agent.policies.transitions import match_transition, record_saved_calls
+from packages.agent.prompts import render_prompt
+from packages.agent.state import AgentState, append_thinking_step, next_step_count
+from packages.llm.cache import CachedChatModel
+from packages.llm.chat_completion import ainvoke_llm
+from packages.llm.client import get_langchain_chat_model
+from packages.llm.model_config import is_llm_cache_enabled
+
+
+def _parse_step_response(response: str) -> dict[str, Any] | None:
+    """解析 {should_end, next_node, task_split, plan_tasks}；无法解析时返回 None。"""
+    text = response.strip()
+    if "```json" in text:
+        text = re.sub(r"^.*?```json\s*", "", text)
+    if "```" in text:
+        text = re.sub(r"\s*```.*$", "", text)
+    try:
+        data = json.loads(text)
+        if not isinstance(data, dict):
+            return None
+        next_node = (data.get("next_node") or "").strip()
+        plan_tasks = data.get("plan_tasks")
+        return {
+            "should_end": bool(data.get("should_end", False)),
+            "next_node": next_node if next_node in VALID_NEXT_NODES else "",
+            "task_split": bool(data.get("task_split", False)),
+            "plan_tasks": plan_tasks if isinstance(plan_tasks, list) else [],
+        }
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+
+def _resolve_llm(llm: Any) -> Any:
+    """未传入 llm 时用 OPENAI_API_KEY 创建 gpt-4o；无有效 key 时返回 None 走 fallback。"""
+    if llm is not None:
+        return llm
+    api_key = (os.environ.get("OPENAI_API_KEY") or "").strip()
+    if not api_key:
+        return None
+    try:
+        llm = get_langchain_chat_model(model="gpt-4o", api_key=api_key, temperature=0, model_key="planner")
+        if is_llm_cache_enabled("step_controller"):
+            llm = CachedChatModel(llm, namespace="step_controller", model="gpt-4o", temperature=0)
+        return llm
+    except Exception:
+        return None
+
+
+def _build_step_prompt(state: AgentState) -> str:
+    return render_prompt(
+        "step_controller",
+        last_step=state.get("step") or "（未知）",
+        flow_stage=(state.get("flow_stage") or "").strip() or "（无）",
+        requirements_ready="是" if state.get("requirements_ready") else "否",
+        current_intent=(state.get("current_intent") or "").strip() or "（未知）",
+        turns_with_same_intent=max(0, state.get("turns_with_same_intent") or 0),
+        user_message=_last_user_message(state) or "（无）",
+        recent_messages=_recent_messages_summary(state),
+        rag_context=_rag_context_summary(state),
+        has_quote="是" if (state.get("quote_md") or "").strip() else "否",
+        state_summary=_state_summary(state),
+    )
+
+
+def _continue(state: AgentState, next_node: str, task_split: bool = False, plan_tasks: list | None = None) -> dict[str, Any]:
+    return {
+        "step": "step_controller",
+        "step_count": next_step_count(state),
+        "should_end": False,
+        "next_node": next_node,
+        "task_split": task_split,
+        "plan_tasks": plan_tasks or [],
+        "thinking_steps": append_thinking_step(state, f"继续对话，规划下一步：{next_node}"),
+    }
+
+
+def _step_without_llm(state: AgentState, llm: Any) -> dict[str, Any] | None:
+    """无 LLM 时沿用 check / router 的 fallback；否则查转移表，结论确定时不调用 LLM。"""
+    if llm is None:
+        early = _check_without_llm(state, llm)
+        if early.get("should_end"):
+            return early
+        return _continue(state, _fallback_next_node(state))
+
+    forced = match_transition(state)
+    if forced is None or forced.should_end is None:
+        return None
+    if forced.should_end:
+        return {
+            "step_count": next_step_count(state),
+            "should_end": True,
+            "thinking_steps": append_thinking_step(state, forced.reason),
+            **record_saved_calls(state, "step_controller"),
+        }
+    if forced.next_node:
+        return {**_continue(state, forced.next_node), **record_saved_calls(state, "step_controller")}
+    return None
+
+
+def _step_result(state: AgentState, response_text: str) -> dict[str, Any]:
+    parsed = _parse_step_response(response_text)
+    if parsed is None:
+        # 解析失败：与 check 一致按不结束处理，下一节点走 fallback
+        return _continue(state, _fallback_next_node(state))
+    if parsed["should_end"]:
+        # 不覆盖 state.step，与 check 结束时一致
+        return {
+            "step_count": next_step_count(state),
+            "should_end": True,
+            "thinking_steps": append_thinking_step(state, "判断结束本轮"),
+        }
+    return _continue(
+        state,
+        parsed["next_node"] or _fallback_next_node(state),
+        parsed["task_split"],
+        parsed["plan_tasks"],
+    )
+
+
+def step_controller(state: AgentState, *, llm: Any = None) -> dict[str, Any]:
+    """
+    业务节点之后的单次规划：返回 { should_end, next_node, task_split, plan_tasks }。
+    相当于 check + router planner，但只调用一次 LLM。
+    """
+    llm = _resolve_llm(llm)
+    early = _step_without_llm(state, llm)
+    if early is not None:
+        return early
+
+    prompt = _build_step_prompt(state)
+    try:
+        from langchain_core.messages import HumanMessage
+        response = llm.invoke([HumanMessage(content=prompt)])
+        response_text = getattr(response, "content", None) or str(response)
+    except Exception:
+        response_text = ""
+    return _step_result(state, response_text)
+
+
+async def astep_controller(state: AgentState, *, llm: Any = None) -> dict[str, Any]:
+    """step_controller 的异步版本：LLM 调用走 ainvoke，不占用线程池。"""
+    llm = _resolve_llm(llm)
+    early = _step_without_llm(state, llm)
+    if early is not None:
+        return early
+
+    prompt = _build_step_prompt(state)
+    try:
+        from langchain_core.messages import HumanMessage
+        response = await ainvoke_llm(llm, [HumanMessage(content=prompt)])
+        response_text = getattr(response, "content", None) or str(response)
+    except Exception:
+        response_text = ""
+    return _step_result(state, response_text)
+
+
+def create_step_controller_node(llm: Any = None):
+    """返回供 LangGraph 使用的单参节点函数 (state) -> partial_state。"""
+    return lambda state: step_controller(state, llm=llm)
+
+
+def create_async_step_controller_node(llm: Any = None):
+    """返回异步单参节点函数 async (state) -> partial_state。"""
+
+    async def node(state: AgentState) -> dict[str, Any]:
+        return await astep_controller(state, llm=llm)
+
+    return node
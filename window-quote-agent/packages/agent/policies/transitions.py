@@ -0,0 +1,61 @@
+"""
+确定性状态转移表：上一业务节点 + state 已能唯一确定「是否结束 / 下一节点」时，check、router、step_controller
+直接采用表中结论，不再调用 planner LLM。
+
+表按顺序匹配，第一条 when(state) 为真的规则生效：
+- should_end 为 True / False：check 的结论已确定；
+- next_node 非空：router 的结论已确定（should_end 为 False 时才有意义）。
+跳过的 LLM 调用计入 state.llm_calls_saved（每轮重置）与 metrics 的 planner_llm_calls_saved_total{node}。
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from packages.agent.state import AgentState
+from packages.observability.metrics import metrics
+
+
+@dataclass(frozen=True)
+class Transition:
+    step: str  # 上一业务节点（state.step）
+    should_end: bool | None  # None 表示是否结束仍需 LLM 判断
+    next_node: str = ""  # 空表示下一节点仍需 LLM 规划
+    reason: str = ""  # 写入 thinking_steps
+    when: Callable[[AgentState], bool] = lambda state: True
+
+
+TRANSITIONS: tuple[Transition, ...] = (
+    # 刚向用户索要参数/需求：必须结束本轮等待回复
+    Transition(
+        "collect_recommend_params",
+        should_end=True,
+        reason="已向用户索要推荐参数，结束本轮等待回复",
+        when=lambda s: not s.get("recommend_params_ready"),
+    ),
+    Transition(
+        "collect_requirements",
+        should_end=True,
+        reason="已向用户索要报价需求，结束本轮等待回复",
+        when=lambda s: not s.get("requirements_ready"),
+    ),
+    # 算完价一定生成报价单
+    Transition("price_quote", should_end=False, next_node="generate_quote", reason="已算价，生成报价单"),
+    # 报价单已生成，本轮结束
+    Transition("generate_quote", should_end=True, reason="报价单已生成，结束本轮"),
+)
+
+
+def match_transition(state: AgentState, table: tuple[Transition, ...] = TRANSITIONS) -> Transition | None:
+    """返回 state.step 命中的第一条规则，未命中返回 None。"""
+    step = state.get("step") or ""
+    for t in table:
+        if t.step == step and t.when(state):
+            return t
+    return None
+
+
+def record_saved_calls(state: AgentState, node: str, count: int = 1) -> dict[str, Any]:
+    """记录跳过的 LLM 调用次数，返回需合并进节点输出的 partial_state。"""
+    metrics.incr("planner_llm_calls_saved_total", count, node=node)
+    return {"llm_calls_saved": (state.get("llm_calls_saved") or 0) + count}
@@ -0,0 +1,139 @@
+"""
+节点 prompt 模板（*.md）注册表：启动时 preload_prompts() 一次性加载并编译，运行时不再读盘。
+
+- 编译：模板按 {{name}} 切分为片段，render_prompt() 一次拼接完成替换，不再链式 str.replace；
+- 校验：占位符须为 {{标识符}}，render 时参数与模板占位符必须一一对应，缺少或多余都抛 ValueError；
+- 版本：prompt_hash() 返回模板内容的 sha256 前 12 位，供日志、trace、缓存按 prompt 版本区分；
+- 热更新：PROMPTS_HOT_RELOAD=1（开发环境）时按 mtime 检查文件变化（间隔 PROMPTS_RELOAD_INTERVAL 秒），修改后自动重新编译。
+"""
+import hashlib
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+PROMPTS_DIR = Path(__file__).resolve().parent
+
+_PLACEHOLDER = re.compile(r"\{\{(\w+)\}\}")
+# 形似占位符但不合法（如 {{ user_message }}、{{user-message}}），多半是笔误
+_MALFORMED = re.compile(r"\{\{(?!\w+\}\})[^{}]*\}\}")
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    name: str
+    text: str
+    parts: tuple[str, ...]  # 偶数位为字面量，奇数位为占位符名
+    placeholders: frozenset[str]
+    sha: str
+    mtime: float
+
+    def render(self, **values: Any) -> str:
+        missing = self.placeholders - values.keys()
+        extra = values.keys() - self.placeholders
+        if missing or extra:
+            raise ValueError(
+                f"prompt {self.name} 参数与占位符不一致：缺少 {sorted(missing)}，多余 {sorted(extra)}"
+            )
+        parts = list(self.parts)
+        parts[1::2] = [str(values[p]) for p in self.parts[1::2]]
+        return "".join(parts)
+
+
+def compile_prompt(name: str, text: str, mtime: float = 0.0) -> PromptTemplate:
+    """把模板文本编译为 PromptTemplate；含不合法占位符时抛 ValueError。"""
+    bad = _MALFORMED.findall(text)
+    if bad:
+        raise ValueError(f"prompt {name} 含不合法占位符：{bad}")
+    parts = tuple(_PLACEHOLDER.split(text))
+    return PromptTemplate(
+        name=name,
+        text=text,
+        parts=parts,
+        placeholders=frozenset(parts[1::2]),
+        sha=hashlib.sha256(text.encode("utf-8")).hexdigest()[:12],
+        mtime=mtime,
+    )
+
+
+_templates: dict[str, PromptTemplate] = {}
+_checked_at: dict[str, float] = {}
+_lock = threading.Lock()
+
+
+def _hot_reload() -> bool:
+    return (os.environ.get("PROMPTS_HOT_RELOAD") or "").strip().lower() in ("1", "true", "yes")
+
+
+def _reload_interval() -> float:
+    return float(os.environ.get("PROMPTS_RELOAD_INTERVAL", "1"))
+
+
+def _load(name: str) -> PromptTemplate:
+    path = PROMPTS_DIR / f"{name}.md"
+    tpl = compile_prompt(name, path.read_text(encoding="utf-8"), path.stat().st_mtime)
+    with _lock:
+        _templates[name] = tpl
+        _checked_at[name] = time.monotonic()
+    return tpl
+
+
+def get_prompt(name: str) -> PromptTemplate:
+    """按名称（不含 .md，如 "router_planner"）返回编译后的模板；开启热更新时文件变化后自动重新加载。"""
+    tpl = _templates.get(name)
+    if tpl is None:
+        return _load(name)
+    if _hot_reload():
+        now = time.monotonic()
+        if now - _checked_at.get(name, 0.0) >= _reload_interval():
+            _checked_at[name] = now
+            try:
+                changed = (PROMPTS_DIR / f"{name}.md").stat().st_mtime != tpl.mtime
+            except OSError:
+                changed = False
+            if changed:
+                return _load(name)
+    return tpl
+
+
+def load_prompt(name: str) -> str:
+    """返回模板原文。"""
+    return get_prompt(name).text
+
+
+def render_prompt(name: str, **values: Any) -> str:
+    """用 values 填充模板占位符，参数须与占位符一一对应。"""
+    return get_prompt(name).render(**values)
+
+
+def prompt_hash(name: str) -> str:
+    """模板内容的版本哈希（sha256 前 12 位）。"""
+    return get_prompt(name).sha
+
+
+def prompt_versions() -> dict[str, str]:
+    """已加载模板的 名称 → 版本哈希。"""
+    return {name: tpl.sha for name, tpl in sorted(_templates.items())}
+
+
+def preload_prompts() -> list[str]:
+    """预加载并编译目录下全部模板，返回已加载的名称；任一模板占位符不合法时启动即失败。"""
+    for path in sorted(PROMPTS_DIR.glob("*.md")):
+        _load(path.stem)
+    return sorted(_templates)
+
+
+__all__ = [
+    "PROMPTS_DIR",
+    "PromptTemplate",
+    "compile_prompt",
+    "get_prompt",
+    "load_prompt",
+    "preload_prompts",
+    "prompt_hash",
+    "prompt_versions",
+    "render_prompt",
+]
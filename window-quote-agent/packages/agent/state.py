@@ -1,9 +1,44 @@
 """Agent 状态定义：LangGraph 工作流共享状态。"""
-from typing import Any, TypedDict
+from typing import Annotated, Any, TypedDict
 
 # 单意图集合（与 intent.schemas.INTENTS 一致，暂不考虑多意图）
 CURRENT_INTENTS = ("产品咨询", "产品推荐", "价格咨询", "公司介绍", "其他")
 
+# 图内保留的最大消息条数（与 session 持久化上限一致），超出时丢弃最早的消息
+MAX_STATE_MESSAGES = 100
+
+
+class ReplaceList(list):
+    """作为更新值时整表替换而非追加，用于每轮开始时重置（如 checkpointer 恢复的上一轮 thinking_steps）。"""
+
+
+def _append(left: list | None, right: list | None) -> list:
+    """
+    返回新列表，不修改 left：LangGraph 计算条件边时会把同一份写入再应用到通道副本上，
+    副本与原通道共享列表对象，原地追加会让写入重复出现（checkpoint 也会被污染）。
+    """
+    if isinstance(right, ReplaceList):
+        return list(right)
+    return [*(left or []), *(right or [])]
+
+
+def append_messages(left: list[dict[str, Any]] | None, right: list[dict[str, Any]] | None) -> list[dict[str, Any]]:
+    """messages 的 reducer：节点只返回本步新增的消息，追加到末尾并保留最近 MAX_STATE_MESSAGES 条。"""
+    merged = _append(left, right)
+    if len(merged) > MAX_STATE_MESSAGES:
+        merged = merged[len(merged) - MAX_STATE_MESSAGES:]
+    return merged
+
+
+def append_steps(left: list[str] | None, right: list[str] | None) -> list[str]:
+    """thinking_steps 的 reducer：节点只返回本步新增的步骤描述。"""
+    return _append(left, right)
+
+
+def append_branch_updates(left: list[dict[str, Any]] | None, right: list[dict[str, Any]] | None) -> list[dict[str, Any]]:
+    """branch_updates 的 reducer：并行分支各自追加 {node, update}，由 join 节点合并后用 ReplaceList() 清空。"""
+    return _append(left, right)
+
 
 def next_step_count(state: "AgentState") -> int:
     """在 state 上执行一步后的 step_count：当前值 + 1。各节点返回时用此函数写入 step_count。"""
@@ -11,17 +46,15 @@ def next_step_count(state: "AgentState") -> int:
 
 
 def append_thinking_step(state: "AgentState", step: str) -> list[str]:
-    """在现有 thinking_steps 后追加一条思考步骤，返回新列表（用于节点 return）。"""
-    current = state.get("thinking_steps") or []
-    if not step.strip():
-        return current
-    return [*current, step.strip()]
+    """返回本步新增的思考步骤（增量，由 append_steps reducer 追加到 state.thinking_steps），用于节点 return。"""
+    step = step.strip()
+    return [step] if step else []
 
 
 class AgentState(TypedDict, total=False):
     """LangGraph 图内共享状态。"""
 
-    messages: list[dict[str, Any]]
+    messages: Annotated[list[dict[str, Any]], append_messages]  # 节点只返回新增消息
     requirements: dict[str, Any]
     requirements_ready: bool  # 是否已收集到至少一项需求，用于路由到 recommend
     selection: dict[str, Any]
@@ -29,6 +62,7 @@ class AgentState(TypedDict, total=False):
     price_result: dict[str, Any]
     quote_md: str  # 生成的报价单 Markdown，由 generate_quote 写入
     rag_context: list[str]  # 推荐依据片段，由 recommend 写入
+    rag_prefetch: dict[str, list[str]]  # 本轮预取的检索结果（归一化 query -> chunks），由 rag_prefetch 与 intent 并行写入
     step: str
     step_count: int  # 已执行步数，每执行一个节点加一
     max_step: int  # 可选；当 step_count >= max_step 时自动 END
@@ -45,9 +79,14 @@ class AgentState(TypedDict, total=False):
     next_node: str  # 下一节点：chat | collect_recommend_params | collect_requirements | recommend | price_quote | generate_quote
     task_split: bool  # 是否对任务进行了拆分
     plan_tasks: list[dict[str, Any]]  # 拆分后的子任务列表，供下游节点参考
+    intent_tasks: list[dict[str, Any]]  # 意图流水线拆出的子任务 [{intent, description}]，planner 无 LLM 时用于并行拆分
+    parallel_nodes: list[str]  # router 决定并行执行的节点（>= 2 个时经 Send 扇出到 branch，再由 join 合并）
+    branch_updates: Annotated[list[dict[str, Any]], append_branch_updates]  # 并行分支的输出 [{node, update}]
     # Check 节点输出：是否结束本轮（由 check 用 GPT-4o 决定，不结束则交给 router）
     should_end: bool
+    # 本轮因确定性转移表（policies/transitions.py）跳过的规划 LLM 调用次数，每轮重置
+    llm_calls_saved: int
     # 显式流程阶段：报价流程中锁定意图与路由，避免补充参数被误判为「其他」
     flow_stage: str  # "" | "collect_requirements" | "price_quote"；在对应节点写入，generate_quote 结束时清空
     # 思考过程：每轮对话各节点追加简短描述，供前端展示（类似 Cursor 的思考过程）
-    thinking_steps: list[str]
\ No newline at end of file
+    thinking_steps: Annotated[list[str], append_steps]  # 节点只返回新增步骤
\ No newline at end of file
@@ -0,0 +1,23 @@
+"""流式输出：通过 LangGraph config 向节点传入 token 回调，供 /chat/stream 推送回复增量。"""
+from typing import Any, Callable
+
+# graph.astream(..., config={"configurable": {TOKEN_CALLBACK_KEY: on_token}})
+TOKEN_CALLBACK_KEY = "on_token"
+# 每条回复开始流式输出前回调一次（无参数）：一轮中 chat 可能执行多次，客户端据此丢弃上一条回复的增量
+REPLY_START_CALLBACK_KEY = "on_reply_start"
+
+
+def get_token_callback(config: Any) -> Callable[[str], Any] | None:
+    """从节点收到的 RunnableConfig 中取 token 回调；未设置时返回 None（不流式）。"""
+    return _callback(config, TOKEN_CALLBACK_KEY)
+
+
+def get_reply_start_callback(config: Any) -> Callable[[], Any] | None:
+    """从 RunnableConfig 中取回复开始回调；未设置时返回 None。"""
+    return _callback(config, REPLY_START_CALLBACK_KEY)
+
+
+def _callback(config: Any, key: str) -> Callable[..., Any] | None:
+    configurable = (config or {}).get("configurable") or {}
+    callback = configurable.get(key)
+    return callback if callable(callback) else None
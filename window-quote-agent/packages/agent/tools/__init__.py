@@ -1,4 +1,4 @@
 """Agent 可调用的工具：RAG 等。"""
-from packages.agent.tools.rag_tool import bm25_retrieve, create_rag_tool
+from packages.agent.tools.rag_tool import bm25_retrieve, create_rag_tool, get_bm25_retriever
 
-__all__ = ["create_rag_tool", "bm25_retrieve"]
+__all__ = ["create_rag_tool", "bm25_retrieve", "get_bm25_retriever"]
@@ -1,59 +1,37 @@
-"""RAG 检索工具：供 chat 等节点通过 tool call 调用，而非写死为独立节点。"""
-import json
-from pathlib import Path
+"""
+RAG 检索工具：供 chat 等节点通过 tool call 调用，而非写死为独立节点。
+
+检索实现见 packages/rag/retriever.py（BM25 倒排，中文 bigram 分词，优先 mmap 加载预构建索引）；
+import 本模块不加载索引。
+"""
 from typing import Any, Callable, List
 
-from langchain_core.documents import Document
 from langchain_core.tools import tool
-from langchain_community.retrievers import BM25Retriever
-
-# 1) Load docs from JSON（相对包路径，便于移植）
-_json_path = Path(__file__).resolve().parent.parent.parent / "rag" / "brochure" / "product_cards_merged.json"
-if _json_path.exists():
-    with open(_json_path, "r", encoding="utf-8") as f:
-        _items = json.load(f)
-else:
-    _items = []
-
-_items = _items if isinstance(_items, list) else []
-
-docs = [
-    Document(
-        page_content=item.get("text", ""),
-        metadata={
-            "model": item.get("model", ""),
-            "pages": item.get("pages", []),
-            "source": "brochure",
-        },
-    )
-    for item in _items
-]
 
-# 2) Build a BM25 retriever（无文档时仅返回空列表）
-bm25: Any = None
-if docs:
-    bm25 = BM25Retriever.from_documents(docs)
-    bm25.k = 3  # top-k, 可调
+from packages.rag.indexing.bm25_index import BM25Index
+from packages.rag.retriever import get_default_retriever, retrieve
 
 
-def bm25_retrieve(query: str) -> List[str]:
-    """Return top-k chunks as strings (with metadata header).供 graph 在未传入 retrieve 时使用。"""
-    if not bm25:
-        return []
+def get_bm25_retriever() -> BM25Index | None:
+    """默认检索器的 BM25 索引（首次调用时加载，供启动预热）；无文档时返回 None。"""
+    return get_default_retriever().index
 
-    q = (query or "").strip() or "窗户 型材 产品"
 
-    # ✅ BM25Retriever 是 Runnable，用 invoke
-    results = bm25.invoke(q)
+def reset_bm25_retriever() -> None:
+    """丢弃已加载的索引，下次使用时重新加载（重建产物后或测试用）。"""
+    get_default_retriever().reset()
+
+
+def bm25_retrieve(query: str) -> List[str]:
+    """Return top-k chunks as strings (with metadata header).供 graph 在未传入 retrieve 时使用。"""
+    return retrieve(query)
 
-    out: List[str] = []
-    for d in results[: getattr(bm25, "k", 3)]:
-        model = d.metadata.get("model", "")
-        pages = d.metadata.get("pages", [])
-        header = f"[model={model} | pages={pages}]"
-        out.append(header + "\n" + d.page_content)
 
-    return out
+def format_knowledge(chunks: List[str]) -> str:
+    """检索结果拼接为工具返回文本（预取命中时 chat 节点也用它，保证与工具调用结果一致）。"""
+    if not chunks:
+        return "（无相关检索结果）"
+    return "\n\n".join(chunks)
 
 
 def create_rag_tool(retrieve: Callable[[str], List[str]]) -> Any:
@@ -67,10 +45,7 @@ def create_rag_tool(retrieve: Callable[[str], List[str]]) -> Any:
     @tool
     def product_knowledge_search(query: str) -> str:
         """在门窗产品资料库中检索与问题相关的参考资料。当用户询问产品规格、型号、材质、区别、推荐等问题时调用此工具。"""
-        chunks = retrieve_fn((query or "").strip())
-        if not chunks:
-            return "（无相关检索结果）"
-        return "\n\n".join(chunks)
+        return format_knowledge(retrieve_fn((query or "").strip()))
 
     product_knowledge_search.name = "product_knowledge_search"
     product_knowledge_search.description = (
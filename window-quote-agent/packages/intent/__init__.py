@@ -7,25 +7,49 @@ from packages.intent.schemas import (
     INTENTS,
     INTENT_PRIORITY,
 )
-from packages.intent.preprocess import preprocess
+from packages.intent.keyword_engine import KeywordEngine, get_keyword_engine, scan_keywords
+from packages.intent.preprocess import preprocess, preprocess_many
 from packages.intent.rule_intents import rule_based_intent_tagging
 from packages.intent.uncertainty_classifier import (
     UncertaintyClassifier,
     GptMiniUncertaintyClassifier,
     StubUncertaintyClassifier,
+    TieredUncertaintyClassifier,
     UncertaintyClassifierResult,
+    create_uncertainty_classifier,
+    get_uncertainty_classifier,
 )
-from packages.intent.pipeline import run_intent_pipeline
+from packages.intent.local_classifier import LocalUncertaintyClassifier
+from packages.intent.pipeline import (
+    run_intent_pipeline,
+    run_intent_pipeline_batch,
+    intent_cache_stats,
+    clear_intent_cache,
+)
+from packages.intent.evaluation import IntentEvalReport, evaluate_intent_pipeline
 from packages.intent.intent_check import intent_check, keyword_switch
 
 __all__ = [
     "preprocess",
+    "preprocess_many",
+    "KeywordEngine",
+    "get_keyword_engine",
+    "scan_keywords",
     "rule_based_intent_tagging",
     "UncertaintyClassifier",
     "GptMiniUncertaintyClassifier",
     "StubUncertaintyClassifier",
+    "TieredUncertaintyClassifier",
+    "LocalUncertaintyClassifier",
+    "create_uncertainty_classifier",
+    "get_uncertainty_classifier",
     "UncertaintyClassifierResult",
     "run_intent_pipeline",
+    "run_intent_pipeline_batch",
+    "evaluate_intent_pipeline",
+    "IntentEvalReport",
+    "intent_cache_stats",
+    "clear_intent_cache",
     "PreprocessOutput",
     "RuleIntentsOutput",
     "IntentPipelineOutput",
@@ -0,0 +1,99 @@
+"""
+意图流水线离线评测：批量跑 run_intent_pipeline_batch，统计吞吐、来源分布与（有标注时）准确率和混淆矩阵。
+规则改动后对日志 prompt 全量回归，见 scripts/eval_intent_pipeline.py。
+"""
+from __future__ import annotations
+
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Sequence
+
+from packages.intent.pipeline import run_intent_pipeline_batch
+from packages.intent.schemas import INTENTS, IntentPipelineOutput
+
+
+def _cell(text: str, width: int, *, left: bool = False) -> str:
+    """按终端显示宽度（中文占 2 列）对齐。"""
+    pad = " " * max(0, width - sum(2 if ord(c) > 0x2E80 else 1 for c in text))
+    return text + pad if left else pad + text
+
+
+@dataclass
+class IntentEvalReport:
+    n: int
+    seconds: float
+    sources: dict[str, int]  # rule / model 条数
+    model_calls: int  # 去重后实际交给分类器的文本数
+    accuracy: float | None = None  # 主意图与标注一致的比例；无标注时为 None
+    confusion: dict[str, dict[str, int]] = field(default_factory=dict)  # gold -> pred -> 条数
+    outputs: list[IntentPipelineOutput] = field(default_factory=list, repr=False)
+
+    @property
+    def throughput(self) -> float:
+        return self.n / self.seconds if self.seconds > 0 else 0.0
+
+    def per_intent(self) -> dict[str, dict[str, float]]:
+        """各意图的 precision / recall / support。"""
+        out: dict[str, dict[str, float]] = {}
+        for label in self.confusion:
+            tp = self.confusion[label].get(label, 0)
+            support = sum(self.confusion[label].values())
+            predicted = sum(row.get(label, 0) for row in self.confusion.values())
+            out[label] = {
+                "precision": tp / predicted if predicted else 0.0,
+                "recall": tp / support if support else 0.0,
+                "support": support,
+            }
+        return out
+
+    def format(self) -> str:
+        lines = [
+            f"{self.n:,} 条，用时 {self.seconds:.2f}s，{self.throughput:,.0f} 条/s",
+            "来源：" + "，".join(f"{k} {v:,}" for k, v in sorted(self.sources.items()))
+            + f"（分类器调用 {self.model_calls:,} 次）",
+        ]
+        if self.accuracy is None:
+            return "\n".join(lines)
+        lines.append(f"主意图准确率 {self.accuracy:.3f}")
+        labels = list(self.confusion)
+        stats = self.per_intent()
+        lines.append(_cell("gold \\ pred", 14, left=True) + "".join(_cell(l, 10) for l in labels) + "    recall")
+        for gold in labels:
+            row = "".join(_cell(str(self.confusion[gold].get(pred, 0)), 10) for pred in labels)
+            lines.append(_cell(gold, 14, left=True) + row + f"{stats[gold]['recall']:10.3f}")
+        lines.append(_cell("precision", 14, left=True) + "".join(f"{stats[l]['precision']:10.3f}" for l in labels))
+        return "\n".join(lines)
+
+
+def confusion_matrix(gold: Sequence[str], pred: Sequence[str], labels: Sequence[str] = INTENTS) -> dict[str, dict[str, int]]:
+    """按 labels 顺序的混淆矩阵（不在 labels 中的标签追加在末尾）。"""
+    order = list(labels) + sorted((set(gold) | set(pred)) - set(labels))
+    counts = Counter(zip(gold, pred))
+    return {g: {p: counts.get((g, p), 0) for p in order} for g in order}
+
+
+def evaluate_intent_pipeline(
+    texts: Sequence[str],
+    labels: Sequence[str] | None = None,
+    **pipeline_kwargs: Any,
+) -> IntentEvalReport:
+    """对 texts 跑批量流水线；labels 与 texts 一一对应时计算准确率与混淆矩阵（按 primary_intent）。"""
+    if labels is not None and len(labels) != len(texts):
+        raise ValueError("labels 与 texts 条数不一致")
+    start = time.perf_counter()
+    outputs = run_intent_pipeline_batch(texts, **pipeline_kwargs)
+    seconds = time.perf_counter() - start
+
+    report = IntentEvalReport(
+        n=len(outputs),
+        seconds=seconds,
+        sources=dict(Counter(o["source"] for o in outputs)),
+        model_calls=len({o["cleaned_prompt"] for o in outputs if o["source"] == "model"}),
+        outputs=outputs,
+    )
+    if labels is not None and outputs:
+        pred = [o["primary_intent"] for o in outputs]
+        report.accuracy = sum(g == p for g, p in zip(labels, pred)) / len(pred)
+        report.confusion = confusion_matrix(labels, pred)
+    return report
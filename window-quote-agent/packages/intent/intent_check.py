@@ -6,7 +6,8 @@
 """
 from typing import Any, Callable
 
-from packages.intent.rule_intents import INTENT_RULES, RULE_ORDER
+from packages.intent.keyword_engine import get_keyword_engine
+from packages.intent.rule_intents import RULE_ORDER
 from packages.intent.schemas import INTENTS  # 产品咨询 | 产品推荐 | 价格咨询 | 公司介绍 | 其他
 
 
@@ -19,14 +20,11 @@ def keyword_switch(message: str, current_intent: str) -> str | None:
     """
     if not message or not message.strip():
         return None
-    text = message.strip()
+    hits = get_keyword_engine().scan(message.strip()).intent_hits
     current = (current_intent or "").strip()
     for intent in RULE_ORDER:
-        if intent not in INTENT_RULES or intent == current:
-            continue
-        for kw in INTENT_RULES[intent]:
-            if kw in text:
-                return intent
+        if intent != current and hits.get(intent):
+            return intent
     return None
 
 
@@ -0,0 +1,180 @@
+"""
+关键词引擎：把 INTENT_RULES（意图触发词）、SYN_MAP（口语 → 专业术语）、FILLER_WORDS（语气词）编译为一个
+Aho–Corasick 多模式自动机，对文本只扫描一遍即可得到：
+- 各意图命中的关键词及位置（span）；
+- 同义词改写与语气词删除（按 leftmost-longest 选取互不重叠的片段）。
+
+扫描耗时与文本长度 + 命中数成正比，与词表大小无关，词表扩到上千条也不会变慢。
+"""
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Mapping, NamedTuple
+
+KIND_INTENT = "intent"
+KIND_SYNONYM = "synonym"
+KIND_FILLER = "filler"
+
+
+class KeywordMatch(NamedTuple):
+    start: int
+    end: int
+    keyword: str
+    kind: str  # intent | synonym | filler
+    value: str  # intent：意图名；synonym：替换后的术语；filler：""
+    order: int  # 模式编号（按加入顺序），用于保持词表原有顺序
+
+
+class KeywordAutomaton:
+    """按字符构建的 Aho–Corasick 自动机；同一关键词可挂多个 (kind, value)。"""
+
+    def __init__(self, patterns: Iterable[tuple[str, str, str]]):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[int]] = [[]]
+        self._patterns: list[tuple[str, str, str]] = []
+        for keyword, kind, value in patterns:
+            if keyword:
+                self._add(keyword, kind, value)
+        self._build_fail()
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def _add(self, keyword: str, kind: str, value: str) -> None:
+        node = 0
+        for ch in keyword:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(len(self._patterns))
+        self._patterns.append((keyword, kind, value))
+
+    def _build_fail(self) -> None:
+        # 深度 1 的节点 fail 指向根，从它们开始按层计算
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[child] = self._goto[f].get(ch, 0)
+                # 后缀上的模式同样在此结束
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def iter_matches(self, text: str) -> Iterator[KeywordMatch]:
+        """按结束位置依次产出全部（含重叠的）命中。"""
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self._patterns
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pid in out[node]:
+                keyword, kind, value = patterns[pid]
+                yield KeywordMatch(i + 1 - len(keyword), i + 1, keyword, kind, value, pid)
+
+
+def _is_token(text: str, start: int, end: int) -> bool:
+    """语气词只在前后为空白或首尾时删除（与原先的 (?<!\\S)w(?!\\S) 一致），避免误删词中的字。"""
+    return (start == 0 or text[start - 1].isspace()) and (end == len(text) or text[end].isspace())
+
+
+@dataclass
+class KeywordScan:
+    """一次扫描的结果。"""
+
+    text: str
+    intent_hits: dict[str, list[KeywordMatch]] = field(default_factory=dict)
+    rewrites: list[KeywordMatch] = field(default_factory=list)  # 选中的同义词/语气词，按位置排序且互不重叠
+
+    def rewritten(self) -> str:
+        """应用同义词改写；语气词替换为空格（由调用方统一合并空白）。"""
+        if not self.rewrites:
+            return self.text
+        parts: list[str] = []
+        pos = 0
+        for m in self.rewrites:
+            parts.append(self.text[pos:m.start])
+            parts.append(m.value if m.kind == KIND_SYNONYM else " ")
+            pos = m.end
+        parts.append(self.text[pos:])
+        return "".join(parts)
+
+
+class KeywordEngine:
+    def __init__(
+        self,
+        intent_rules: Mapping[str, Iterable[str]] | None = None,
+        syn_map: Mapping[str, str] | None = None,
+        filler_words: Iterable[str] | None = None,
+    ):
+        patterns: list[tuple[str, str, str]] = []
+        for intent, keywords in (intent_rules or {}).items():
+            patterns.extend((kw, KIND_INTENT, intent) for kw in keywords)
+        syn_map = dict(syn_map or {})
+        patterns.extend((k, KIND_SYNONYM, v) for k, v in syn_map.items())
+        # 术语本身作为"替换为自身"的模式：文本已是术语时按 leftmost-longest 整体选中，
+        # 不会被更短的口语词再改写一次（如 "不稳定" 中的 "不稳" → "不稳定定"）
+        patterns.extend((v, KIND_SYNONYM, v) for v in dict.fromkeys(syn_map.values()) if v not in syn_map)
+        patterns.extend((w, KIND_FILLER, "") for w in sorted(filler_words or ()))
+        self.automaton = KeywordAutomaton(patterns)
+
+    def scan(self, text: str, rewrite_kinds: tuple[str, ...] = (KIND_SYNONYM, KIND_FILLER)) -> KeywordScan:
+        """一次扫描；rewrite_kinds 指定参与改写的类别（如只做同义词映射时传 (KIND_SYNONYM,)）。"""
+        intent_hits: dict[str, list[KeywordMatch]] = {}
+        candidates: list[KeywordMatch] = []
+        for m in self.automaton.iter_matches(text or ""):
+            if m.kind == KIND_INTENT:
+                intent_hits.setdefault(m.value, []).append(m)
+            elif m.kind in rewrite_kinds and (m.kind == KIND_SYNONYM or _is_token(text, m.start, m.end)):
+                candidates.append(m)
+        # leftmost-longest；同一片段上语气词优先（原流程先去语气词再做术语映射），再按词表顺序
+        candidates.sort(key=lambda m: (m.start, m.start - m.end, m.kind != KIND_FILLER, m.order))
+        rewrites: list[KeywordMatch] = []
+        last_end = 0
+        for m in candidates:
+            if m.start >= last_end:
+                rewrites.append(m)
+                last_end = m.end
+        return KeywordScan(text=text or "", intent_hits=intent_hits, rewrites=rewrites)
+
+    def intent_keywords(self, text: str) -> dict[str, list[str]]:
+        """意图 → 命中的关键词（去重，保持词表顺序）。"""
+        out: dict[str, list[str]] = {}
+        for intent, hits in self.scan(text).intent_hits.items():
+            ordered = sorted({m.order: m.keyword for m in hits}.items())
+            out[intent] = [kw for _order, kw in ordered]
+        return out
+
+
+_engine: KeywordEngine | None = None
+
+
+def get_keyword_engine() -> KeywordEngine:
+    """按 INTENT_RULES / SYN_MAP / FILLER_WORDS 构建的进程内单例；修改词表后调用 reset_keyword_engine() 重建。"""
+    global _engine
+    if _engine is None:
+        from packages.intent.preprocess import FILLER_WORDS, SYN_MAP
+        from packages.intent.rule_intents import INTENT_RULES
+
+        _engine = KeywordEngine(INTENT_RULES, SYN_MAP, FILLER_WORDS)
+    return _engine
+
+
+def reset_keyword_engine() -> None:
+    global _engine
+    _engine = None
+
+
+def scan_keywords(text: str) -> KeywordScan:
+    return get_keyword_engine().scan(text)
+
@@ -1,20 +1,30 @@
 """
 Step 4~6：意图聚合、主次意图判定、多意图拆分
 Pipeline：串联 Preprocess → Rule-based → UncertaintyClassifier → Aggregation → Output
+
+结果缓存：同一 cleaned_prompt 在同一分类器版本下结果确定，按 (cleaned_prompt, 分类器版本, 参数) 做 LRU 缓存，
+intent 节点与 intent_check 软校验对高频重复消息不再重复跑规则与分类器。
+- INTENT_CACHE_SIZE：缓存条数（默认 4096，0 关闭）；
+- INTENT_CACHE_TTL_SECONDS：过期秒数（默认 0，不过期；分类器换版本后旧条目自然不再命中）。
 """
-from typing import Any
+import os
+import threading
+from typing import Any, Iterable
 
 from packages.intent.schemas import (
     IntentPipelineOutput,
     TaskItem,
     INTENT_PRIORITY,
 )
-from packages.intent.preprocess import preprocess
+from packages.intent.preprocess import preprocess, preprocess_many
 from packages.intent.rule_intents import rule_based_intent_tagging
 from packages.intent.uncertainty_classifier import (
     UncertaintyClassifier,
-    GptMiniUncertaintyClassifier,
+    get_uncertainty_classifier,
 )
+from packages.utils.lru import TTLCache
+
+DEFAULT_CACHE_SIZE = 4096
 
 
 def _aggregate_intents(
@@ -71,34 +81,66 @@ def _task_split(final_intents: list[str], cleaned_prompt: str) -> list[TaskItem]
     return tasks
 
 
-def run_intent_pipeline(
-    raw_prompt: str,
-    *,
-    uncertainty_classifier: UncertaintyClassifier | None = None,
-    use_model_when_rules_empty: bool = True,
-    tau: float = 0.6,
-) -> IntentPipelineOutput:
-    """
-    完整流水线：Preprocess → Rule-based →（可选）UncertaintyClassifier → 聚合 → 主次意图 → Task Split。
-    返回结构化输出，供后续 agent 使用。
-    """
-    # Step 1 初步清洗加关键词query改写
-    pre = preprocess(raw_prompt)
-    raw_prompt = pre["raw_prompt"]
-    cleaned_prompt = pre["cleaned_prompt"]
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name) or default)
+    except ValueError:
+        return default
 
-    # Step 2 规则命中
-    rule_out = rule_based_intent_tagging(cleaned_prompt)
-    rule_intents = rule_out["rule_intents"]
-    
 
-    # Step 3：仅当 rule_intents 为空时调用不确定性分类器（默认 gpt-4o-mini）
-    model_result: dict[str, Any] | None = None
-    if use_model_when_rules_empty and (not rule_intents):
-        classifier = GptMiniUncertaintyClassifier()
-        model_result = classifier.predict(cleaned_prompt)
-        if model_result.get("confidence", 0) < tau:
-            model_result = {"intents": ["其他"], "confidence": model_result.get("confidence", 0)}
+_cache: TTLCache | None = None
+_cache_ready = False
+_cache_lock = threading.Lock()
+
+
+def get_intent_cache() -> TTLCache | None:
+    """进程级结果缓存（懒加载）；INTENT_CACHE_SIZE<=0 时返回 None。"""
+    global _cache, _cache_ready
+    if not _cache_ready:
+        with _cache_lock:
+            if not _cache_ready:
+                size = int(_env_number("INTENT_CACHE_SIZE", DEFAULT_CACHE_SIZE))
+                ttl = _env_number("INTENT_CACHE_TTL_SECONDS", 0)
+                _cache = TTLCache(size, ttl=ttl if ttl > 0 else None) if size > 0 else None
+                _cache_ready = True
+    return _cache
+
+
+def clear_intent_cache() -> None:
+    """丢弃结果缓存，下次按环境变量重建（测试、规则热更新后使用）。"""
+    global _cache, _cache_ready
+    with _cache_lock:
+        _cache, _cache_ready = None, False
+
+
+def intent_cache_stats() -> dict[str, Any]:
+    cache = get_intent_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, "maxsize": cache.maxsize, **cache.stats()}
+
+
+def _copy_output(out: IntentPipelineOutput, raw_prompt: str) -> IntentPipelineOutput:
+    """缓存条目与调用方互不影响：可变字段逐个复制，raw_prompt 用本次原文。"""
+    return IntentPipelineOutput(
+        out,
+        raw_prompt=raw_prompt,
+        intents=list(out["intents"]),
+        secondary_intents=list(out["secondary_intents"]),
+        tasks=[TaskItem(t) for t in out["tasks"]],
+    )
+
+
+def _build_output(
+    raw_prompt: str,
+    cleaned_prompt: str,
+    rule_intents: list[str],
+    model_result: dict[str, Any] | None,
+    tau: float,
+) -> IntentPipelineOutput:
+    """Step 4~6：由规则结果与（可选）模型结果组装最终输出。"""
+    if model_result is not None and model_result.get("confidence", 0) < tau:
+        model_result = {"intents": ["其他"], "confidence": model_result.get("confidence", 0)}
 
     # Step 4
     final_intents, confidence, source = _aggregate_intents(
@@ -116,8 +158,105 @@ def run_intent_pipeline(
         cleaned_prompt=cleaned_prompt,
         intents=final_intents,
         primary_intent=primary_intent,
-        secondary_intents=secondary_intents, 
+        secondary_intents=secondary_intents,
         tasks=tasks,
         confidence=confidence,
         source=source,
     )
+
+
+def _classify(
+    raw_prompt: str,
+    cleaned_prompt: str,
+    classifier: UncertaintyClassifier | None,
+    use_model_when_rules_empty: bool,
+    tau: float,
+) -> IntentPipelineOutput:
+    # Step 2 规则命中
+    rule_intents = rule_based_intent_tagging(cleaned_prompt)["rule_intents"]
+
+    # Step 3：仅当 rule_intents 为空时调用不确定性分类器
+    model_result: dict[str, Any] | None = None
+    if use_model_when_rules_empty and (not rule_intents):
+        model_result = (classifier or get_uncertainty_classifier()).predict(cleaned_prompt)
+
+    return _build_output(raw_prompt, cleaned_prompt, rule_intents, model_result, tau)
+
+
+def run_intent_pipeline(
+    raw_prompt: str,
+    *,
+    uncertainty_classifier: UncertaintyClassifier | None = None,
+    use_model_when_rules_empty: bool = True,
+    tau: float = 0.6,
+) -> IntentPipelineOutput:
+    """
+    完整流水线：Preprocess → Rule-based →（可选）UncertaintyClassifier → 聚合 → 主次意图 → Task Split。
+    返回结构化输出，供后续 agent 使用。
+    未传入分类器时使用进程级默认分类器（get_uncertainty_classifier，按 INTENT_CLASSIFIER 创建一次）。
+    """
+    # Step 1 初步清洗加关键词query改写
+    pre = preprocess(raw_prompt)
+    raw_prompt = pre["raw_prompt"]
+    cleaned_prompt = pre["cleaned_prompt"]
+
+    cache = get_intent_cache()
+    classifier = uncertainty_classifier or (get_uncertainty_classifier() if cache is not None else None)
+    if cache is None:
+        return _classify(raw_prompt, cleaned_prompt, classifier, use_model_when_rules_empty, tau)
+    # 只读一次：命中路径上除此之外不再访问分类器
+    version = classifier.version
+    # 未声明 version 的自定义分类器无法区分结果来源，不走缓存
+    if version == UncertaintyClassifier.version:
+        return _classify(raw_prompt, cleaned_prompt, classifier, use_model_when_rules_empty, tau)
+
+    from packages.observability.metrics import metrics
+
+    key = (cleaned_prompt, version, use_model_when_rules_empty, tau)
+    out = cache.get(key)
+    if out is not None:
+        metrics.incr("intent_pipeline_cache_total", result="hit")
+        return _copy_output(out, raw_prompt)
+    metrics.incr("intent_pipeline_cache_total", result="miss")
+    out = _classify(raw_prompt, cleaned_prompt, classifier, use_model_when_rules_empty, tau)
+    cache.set(key, _copy_output(out, ""))
+    return out
+
+
+def run_intent_pipeline_batch(
+    raw_prompts: Iterable[str],
+    *,
+    uncertainty_classifier: UncertaintyClassifier | None = None,
+    use_model_when_rules_empty: bool = True,
+    tau: float = 0.6,
+    concurrency: int = 8,
+) -> list[IntentPipelineOutput]:
+    """
+    批量流水线（离线评测 / 回放日志用），结果与逐条 run_intent_pipeline 一致（本地模型置信度仅有浮点舍入差异），顺序与输入一致：
+    - 批量清洗，相同 cleaned_prompt 只做一次规则匹配与分类；
+    - 仅规则未命中的去重文本交给分类器 predict_batch：本地模型整批向量化，LLM 按 concurrency 并发；
+    - 自行去重，不读写单条调用的结果缓存（避免评测数据挤掉线上热点条目）。
+    """
+    pre = preprocess_many(raw_prompts)
+    rule_intents: dict[str, list[str]] = {}
+    for p in pre:
+        cleaned = p["cleaned_prompt"]
+        if cleaned not in rule_intents:
+            rule_intents[cleaned] = rule_based_intent_tagging(cleaned)["rule_intents"]
+
+    model_results: dict[str, dict[str, Any]] = {}
+    misses = [c for c, intents in rule_intents.items() if not intents]
+    if use_model_when_rules_empty and misses:
+        classifier = uncertainty_classifier or get_uncertainty_classifier()
+        model_results = dict(zip(misses, classifier.predict_batch(misses, concurrency=concurrency)))
+
+    return [
+        _build_output(
+            p["raw_prompt"],
+            p["cleaned_prompt"],
+            list(rule_intents[p["cleaned_prompt"]]),
+            model_results.get(p["cleaned_prompt"]),
+            tau,
+        )
+        for p in pre
+    ]
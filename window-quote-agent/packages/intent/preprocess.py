@@ -8,7 +8,9 @@ Step 1：Preprocess（文本清洗）
 """
 import re
 import unicodedata
+from typing import Iterable
 
+from packages.intent.keyword_engine import KIND_FILLER, KIND_SYNONYM, get_keyword_engine
 from packages.intent.schemas import PreprocessOutput
 
 
@@ -19,36 +21,46 @@ FILLER_WORDS = frozenset({
 })
 
 
+# 全角 → 半角：全角空格与 U+FF01~U+FF5E，预先编译为 str.translate 表
+_WIDTH_TABLE = {0x3000: 0x20, **{c: c - 0xFEE0 for c in range(0xFF01, 0xFF5F)}}
+# 一次替换：连续相同标点保留一个，连续空白合并为一个空格
+_PUNCT_SPACE_RE = re.compile(r"([^\w\s])\1+|\s+")
+
+
 def _full_to_half(text: str) -> str:
     """全角转半角。"""
-    result = []
-    for c in text:
-        if ord(c) == 0x3000:  # 全角空格
-            result.append(" ")
-        elif 0xFF01 <= ord(c) <= 0xFF5E:
-            result.append(chr(ord(c) - 0xFEE0))
-        else:
-            result.append(c)
-    return "".join(result)
+    return text.translate(_WIDTH_TABLE)
 
 
 def _normalize_unicode(text: str) -> str:
-    """NFKC 规范化，统一全角数字/字母等。"""
-    return unicodedata.normalize("NFKC", text)
+    """NFKC 规范化，统一全角数字/字母等；已是 NFKC 形式（绝大多数输入）时不做拷贝。"""
+    return text if unicodedata.is_normalized("NFKC", text) else unicodedata.normalize("NFKC", text)
+
+
+def _squeeze(m: re.Match) -> str:
+    return m.group(1) or " "
 
 
 def _merge_repeated_punctuation(text: str) -> str:
-    """合并重复标点（连续相同标点保留一个）。"""
-    return re.sub(r"([^\w\s])\1+", r"\1", text)
+    """合并重复标点（连续相同标点保留一个），同时合并连续空白。"""
+    return _PUNCT_SPACE_RE.sub(_squeeze, text)
+
+
+def _normalize(text: str) -> str:
+    """宽度折叠 + NFKC + 标点/空白合并；纯 ASCII 文本跳过前两步。"""
+    if not text.isascii():
+        text = _normalize_unicode(_full_to_half(text))
+    return _PUNCT_SPACE_RE.sub(_squeeze, text)
+
+
+def _apply_keywords(text: str, kinds: tuple[str, ...] = (KIND_FILLER, KIND_SYNONYM)) -> str:
+    """关键词自动机一次扫描：语气词（前后为空白或首尾时）替换为空格，口语映射为专业术语。"""
+    return get_keyword_engine().scan(text, rewrite_kinds=kinds).rewritten()
 
 
 def _remove_filler_words(text: str) -> str:
     """去除口语/语气词（词边界匹配，保留其它内容）。"""
-    t = text
-    for w in sorted(FILLER_WORDS, key=len, reverse=True):
-        # 词边界：前后为空白或标点或首尾
-        t = re.sub(rf"(?<!\S){re.escape(w)}(?!\S)", " ", t)
-    return re.sub(r"\s+", " ", t).strip()
+    return re.sub(r"\s+", " ", _apply_keywords(text, (KIND_FILLER,))).strip()
 
 
 SYN_MAP = {
@@ -79,25 +91,39 @@ SYN_MAP = {
 
 
 def map(text: str) -> str:
-    """将口语化表述转化为专业术语"""
-    for k, v in SYN_MAP.items():
-        text.replace(k, v)
-    return text 
+    """将口语化表述转化为专业术语（一次扫描，最长匹配优先，替换结果不会被再次替换）。"""
+    return _apply_keywords(text, (KIND_SYNONYM,)) if text else text
+
+
 
+def _clean(text: str) -> str:
+    t = _apply_keywords(_normalize(text.strip()))  # 去语气词 + 术语映射，一次扫描完成
+    # 删除语气词会留下多余空格，仅此时再合并一次
+    if "  " in t:
+        t = re.sub(r"\s+", " ", t)
+    return t.strip()
 
 
 def preprocess(raw_prompt: str) -> PreprocessOutput:
     """
     文本清洗：全角→半角、合并重复标点、去除语气词, 映射专业术语。
+    规范化由 translate 表 + 一条合并正则完成，去语气词与术语映射由关键词自动机一次扫描完成。
     不做语义判断，输出保留 raw_prompt 与 cleaned_prompt。
     """
     if not raw_prompt or not isinstance(raw_prompt, str):
         raw_prompt = str(raw_prompt or "")
-    t = raw_prompt.strip()
-    t = _normalize_unicode(t)
-    t = _full_to_half(t)
-    t = _merge_repeated_punctuation(t)
-    t = _remove_filler_words(t)
-    t = map(t)
-    cleaned_prompt = t.strip()
-    return {"raw_prompt": raw_prompt, "cleaned_prompt": cleaned_prompt}
+    return {"raw_prompt": raw_prompt, "cleaned_prompt": _clean(raw_prompt)}
+
+
+def preprocess_many(raw_prompts: Iterable[str]) -> list[PreprocessOutput]:
+    """批量清洗（离线评测用）：结果与逐条 preprocess 一致，重复的 prompt 只清洗一次。"""
+    seen: dict[str, str] = {}
+    out: list[PreprocessOutput] = []
+    for raw in raw_prompts:
+        if not raw or not isinstance(raw, str):
+            raw = str(raw or "")
+        cleaned = seen.get(raw)
+        if cleaned is None:
+            cleaned = seen[raw] = _clean(raw)
+        out.append({"raw_prompt": raw, "cleaned_prompt": cleaned})
+    return out
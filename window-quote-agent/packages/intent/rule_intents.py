@@ -3,9 +3,9 @@ Step 2：Rule-based 多意图标注
 职责：高精度规则为 prompt 打上 0~N 个 intent 标签。
 原则：命中即加 intent，不 return；允许多意图并存；规则有优先级但不互斥。
 """
-import re
 from typing import Any
 
+from packages.intent.keyword_engine import get_keyword_engine
 from packages.intent.schemas import RuleIntentsOutput, INTENTS
 
 # 意图 → 触发词/模式（非穷举，可配置扩展）
@@ -23,36 +23,24 @@ RULE_ORDER = ["价格咨询", "产品推荐", "产品咨询", "公司介绍"]
 def rule_based_intent_tagging(cleaned_prompt: str) -> RuleIntentsOutput:
     """
     对清洗后的 prompt 做规则匹配，命中即加入 rule_intents，允许多意图。
-    返回 rule_intents（去重、保持顺序）和 rule_hits（各意图命中的片段）。
+    返回 rule_intents（去重、保持顺序）、rule_hits（各意图命中的片段）和 rule_spans（各片段在文本中的位置）。
+    关键词由 keyword_engine 的自动机一次扫描得到。
     """
     rule_intents: list[str] = []
     rule_hits: dict[str, Any] = {}
+    rule_spans: dict[str, list[tuple[int, int]]] = {}
 
     if not cleaned_prompt or not cleaned_prompt.strip():
-        return {"rule_intents": [], "rule_hits": {}}
-
-    text = cleaned_prompt.strip()
-    seen: set[str] = set()
+        return {"rule_intents": [], "rule_hits": {}, "rule_spans": {}}
 
+    scan = get_keyword_engine().scan(cleaned_prompt.strip())
     for intent in RULE_ORDER:
-        if intent not in INTENT_RULES:
+        matches = scan.intent_hits.get(intent)
+        if not matches:
             continue
-        patterns = INTENT_RULES[intent]
-        hits: list[str] = []
-        for p in patterns:
-            if p in text:
-                hits.append(p)
-            else:
-                # 支持简单正则（仅 \w 等）
-                try:
-                    if re.search(re.escape(p), text):
-                        hits.append(p)
-                except re.error:
-                    pass
-        if hits:
-            rule_hits[intent] = hits
-            if intent not in seen:
-                seen.add(intent)
-                rule_intents.append(intent)
-
-    return {"rule_intents": rule_intents, "rule_hits": rule_hits}
+        # 同一关键词多次出现只记一次，顺序与 INTENT_RULES 一致
+        rule_hits[intent] = [kw for _order, kw in sorted({m.order: m.keyword for m in matches}.items())]
+        rule_spans[intent] = sorted((m.start, m.end) for m in matches)
+        rule_intents.append(intent)
+
+    return {"rule_intents": rule_intents, "rule_hits": rule_hits, "rule_spans": rule_spans}
@@ -18,6 +18,7 @@ class RuleIntentsOutput(TypedDict):
     """Step 2 输出。"""
     rule_intents: list[str]
     rule_hits: dict[str, Any]
+    rule_spans: dict[str, list[tuple[int, int]]]  # 各意图命中片段的 (start, end)
 
 
 class TaskItem(TypedDict):
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import TypedDict
+from pathlib import Path
+from typing import Sequence, TypedDict
 
 # GPT 使用英文标签，输出时映射回中文（与 test_qwen 一致）
 INTENT_LABELS_EN = [
@@ -49,32 +53,69 @@ class UncertaintyClassifierResult(TypedDict, total=False):
 class UncertaintyClassifier(ABC):
     """不确定性分类器抽象接口：仅用于规则未覆盖或不确定样本。"""
 
+    # 分类器版本：模型或 prompt 变化时改变，供缓存与日志区分
+    version: str = "unknown"
+
     @abstractmethod
     def predict(self, text: str) -> UncertaintyClassifierResult:
         ...
 
+    def predict_batch(self, texts: Sequence[str], *, concurrency: int = 1) -> list[UncertaintyClassifierResult]:
+        """批量预测，结果与 texts 一一对应。默认逐条调用 predict，concurrency>1 时用线程池并发（适合 LLM 等 I/O 型后端）。"""
+        if concurrency <= 1 or len(texts) <= 1:
+            return [self.predict(t) for t in texts]
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(texts))) as pool:
+            return list(pool.map(self.predict, texts))
+
 
 class GptMiniUncertaintyClassifier(UncertaintyClassifier):
     """基于 OpenAI gpt-4o-mini 的意图分类器（与 test_qwen 调用方式一致）。"""
 
     def __init__(self, model: str = "gpt-4o-mini"):
-        from openai import OpenAI
-        self._client = OpenAI()
+        from packages.llm.client import get_timeout
+        from packages.llm.model_config import is_llm_cache_enabled
+
+        self._client = None
+        self._timeout = get_timeout("intent")
         self._model = model
+        self.version = f"llm:{model}"
+        self._use_cache = is_llm_cache_enabled("intent")
         self._system_prompt = INTENT_SYSTEM_PROMPT.format(
             labels="\n".join(f"- {l}" for l in INTENT_LABELS_EN)
         )
 
-    def predict(self, text: str) -> UncertaintyClassifierResult:
-        response = self._client.chat.completions.create(
+    @property
+    def client(self):
+        """首次预测时再取共享客户端（连接池复用）；规则命中的请求不要求配置 OPENAI_API_KEY。"""
+        if self._client is None:
+            from packages.llm.client import get_openai_client
+
+            self._client = get_openai_client()
+        return self._client
+
+    def _complete(self, messages: list[dict[str, str]]) -> str:
+        response = self.client.chat.completions.create(
             model=self._model,
-            messages=[
-                {"role": "system", "content": self._system_prompt},
-                {"role": "user", "content": text},
-            ],
+            messages=messages,
             temperature=0,
+            timeout=self._timeout,
         )
-        content = (response.choices[0].message.content or "").strip()
+        return (response.choices[0].message.content or "").strip()
+
+    def predict(self, text: str) -> UncertaintyClassifierResult:
+        messages = [
+            {"role": "system", "content": self._system_prompt},
+            {"role": "user", "content": text},
+        ]
+        if self._use_cache:
+            from packages.llm.cache import cached_chat_completion
+
+            complete = cached_chat_completion(self._complete, namespace="intent", model=self._model, temperature=0)
+            content = complete(messages)
+        else:
+            content = self._complete(messages)
         try:
             data = json.loads(content)
             intent_en = data.get("intent", "Others")
@@ -88,5 +129,111 @@ class GptMiniUncertaintyClassifier(UncertaintyClassifier):
 class StubUncertaintyClassifier(UncertaintyClassifier):
     """占位分类器：规则未命中时返回「其他」，不加载模型。"""
 
+    version = "stub"
+
     def predict(self, text: str) -> UncertaintyClassifierResult:
         return {"intents": ["其他"], "confidence": 0.0}
+
+
+class TieredUncertaintyClassifier(UncertaintyClassifier):
+    """
+    分级分类：先用本地模型（无网络、亚毫秒），置信度低于 escalate_below 时再升级到 LLM。
+    escalate 为 None 时只用本地模型。
+    """
+
+    def __init__(
+        self,
+        primary: UncertaintyClassifier,
+        escalate: UncertaintyClassifier | None = None,
+        *,
+        escalate_below: float = 0.6,
+    ):
+        self.primary = primary
+        self.escalate = escalate
+        self.escalate_below = escalate_below
+        self.version = primary.version if escalate is None else f"{primary.version}+{escalate.version}@{escalate_below}"
+
+    def predict(self, text: str) -> UncertaintyClassifierResult:
+        from packages.observability.metrics import metrics
+
+        start = time.perf_counter()
+        result = self.primary.predict(text)
+        metrics.observe("intent_classifier_latency_seconds", time.perf_counter() - start, tier="local")
+        if self.escalate is None or float(result.get("confidence", 0.0)) >= self.escalate_below:
+            metrics.incr("intent_classifier_predictions_total", tier="local")
+            return result
+        start = time.perf_counter()
+        result = self.escalate.predict(text)
+        metrics.observe("intent_classifier_latency_seconds", time.perf_counter() - start, tier="llm")
+        metrics.incr("intent_classifier_predictions_total", tier="llm")
+        return result
+
+    def predict_batch(self, texts: Sequence[str], *, concurrency: int = 1) -> list[UncertaintyClassifierResult]:
+        """本地模型整批预测，仅低置信度的子集再并发升级到 LLM。"""
+        from packages.observability.metrics import metrics
+
+        start = time.perf_counter()
+        results = self.primary.predict_batch(texts, concurrency=concurrency)
+        metrics.observe("intent_classifier_latency_seconds", time.perf_counter() - start, tier="local_batch")
+        low = [] if self.escalate is None else [
+            i for i, r in enumerate(results) if float(r.get("confidence", 0.0)) < self.escalate_below
+        ]
+        metrics.incr("intent_classifier_predictions_total", len(results) - len(low), tier="local")
+        if low:
+            start = time.perf_counter()
+            escalated = self.escalate.predict_batch([texts[i] for i in low], concurrency=concurrency)
+            metrics.observe("intent_classifier_latency_seconds", time.perf_counter() - start, tier="llm_batch")
+            metrics.incr("intent_classifier_predictions_total", len(low), tier="llm")
+            for i, r in zip(low, escalated):
+                results[i] = r
+        return results
+
+
+INTENT_CLASSIFIERS = ("auto", "local", "llm", "stub")
+
+
+def create_uncertainty_classifier(kind: str | None = None) -> UncertaintyClassifier:
+    """
+    按环境变量创建规则未命中时使用的分类器：
+    - INTENT_CLASSIFIER=auto（默认）：存在本地模型（INTENT_CLASSIFIER_PATH）时用本地模型，否则用 gpt-4o-mini；
+    - local：只用本地模型；llm：只用 gpt-4o-mini；stub：恒返回「其他」；
+    - INTENT_LLM_ESCALATE=1：本地模型置信度低于 INTENT_ESCALATE_BELOW（默认 0.6）时升级到 gpt-4o-mini。
+    """
+    from packages.intent.local_classifier import DEFAULT_MODEL_PATH, LocalUncertaintyClassifier
+
+    kind = (kind or os.environ.get("INTENT_CLASSIFIER") or "auto").strip().lower()
+    if kind not in INTENT_CLASSIFIERS:
+        raise ValueError(f"未知 INTENT_CLASSIFIER: {kind}，可选 {INTENT_CLASSIFIERS}")
+    if kind == "stub":
+        return StubUncertaintyClassifier()
+    path = Path(os.environ.get("INTENT_CLASSIFIER_PATH") or DEFAULT_MODEL_PATH)
+    if kind == "llm" or (kind == "auto" and not path.exists()):
+        return GptMiniUncertaintyClassifier()
+    local = LocalUncertaintyClassifier(path=path)
+    escalate_on = (os.environ.get("INTENT_LLM_ESCALATE") or "").strip().lower() in ("1", "true", "yes")
+    return TieredUncertaintyClassifier(
+        local,
+        GptMiniUncertaintyClassifier() if escalate_on else None,
+        escalate_below=float(os.environ.get("INTENT_ESCALATE_BELOW", "0.6")),
+    )
+
+
+_default_classifier: UncertaintyClassifier | None = None
+_default_lock = threading.Lock()
+
+
+def get_uncertainty_classifier() -> UncertaintyClassifier:
+    """进程级默认分类器（懒加载，按 create_uncertainty_classifier 的环境变量创建一次后复用）。"""
+    global _default_classifier
+    if _default_classifier is None:
+        with _default_lock:
+            if _default_classifier is None:
+                _default_classifier = create_uncertainty_classifier()
+    return _default_classifier
+
+
+def reset_uncertainty_classifier() -> None:
+    """丢弃默认分类器（修改环境变量或重新训练本地模型后调用；测试用）。"""
+    global _default_classifier
+    with _default_lock:
+        _default_classifier = None
@@ -1,18 +1,33 @@
 """LLM 调用：chat_completion 等，可接微调模型；按节点用不同模型见 model_config。"""
+from packages.llm.cache import CachedChatModel, LLMCache, create_llm_cache, get_llm_cache
 from packages.llm.chat_completion import (
+    ainvoke_llm,
+    create_async_chat_completion,
     create_chat_completion,
     create_chat_completion_from_config,
     get_chat_completion,
+    to_async_chat_completion,
     MODEL_BASE_URL,
     MODEL_NAME,
     API_KEY,
 )
+from packages.llm.client import (
+    aclose_clients,
+    get_async_openai_client,
+    get_http_client,
+    get_langchain_chat_model,
+    get_openai_client,
+    get_timeout,
+)
 from packages.llm.model_config import (
     NODE_TO_MODEL_KEY,
     NODES_USING_LLM,
+    get_all_node_async_chat_completions,
     get_all_node_chat_completions,
+    get_async_chat_completion_for_node,
     get_chat_completion_for_node,
     get_model_config,
+    is_llm_cache_enabled,
 )
 
 try:
@@ -21,17 +36,33 @@ except ImportError:
     create_hf_chat_completion = get_hf_chat_completion = None  # 未安装 transformers/torch 时
 
 __all__ = [
+    "CachedChatModel",
+    "LLMCache",
+    "create_llm_cache",
+    "get_llm_cache",
+    "ainvoke_llm",
+    "create_async_chat_completion",
     "create_chat_completion",
     "create_chat_completion_from_config",
     "get_chat_completion",
+    "to_async_chat_completion",
     "MODEL_BASE_URL",
     "MODEL_NAME",
     "API_KEY",
+    "aclose_clients",
+    "get_async_openai_client",
+    "get_http_client",
+    "get_langchain_chat_model",
+    "get_openai_client",
+    "get_timeout",
     "NODE_TO_MODEL_KEY",
     "NODES_USING_LLM",
+    "get_all_node_async_chat_completions",
     "get_all_node_chat_completions",
+    "get_async_chat_completion_for_node",
     "get_chat_completion_for_node",
     "get_model_config",
+    "is_llm_cache_enabled",
     "create_hf_chat_completion",
     "get_hf_chat_completion",
 ]
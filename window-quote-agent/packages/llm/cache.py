@@ -0,0 +1,300 @@
+"""
+LLM 响应缓存：确定性调用（temperature=0 的 router planner、check、意图分类等）在不同会话间经常收到完全相同的 prompt，
+命中缓存即可省去一次 LLM 往返。
+
+- 键：sha256(命名空间/模型 + 渲染后的 messages + 参数)；
+- 两级：进程内 LRU（TTL + 条数上限）在前，SQLite 磁盘层在后（可选，多 worker 共享、重启不丢）；
+- 淘汰：两级都按 TTL 过期；磁盘层超过条数上限时按写入时间删除最旧的；
+- 统计：memory_hits / disk_hits / misses，同时打点到 observability.metrics（llm_cache_*_total{namespace}）。
+
+配置（环境变量）：
+- LLM_CACHE_URL：memory://（默认，仅内存）或 sqlite:///data/llm_cache.db（内存 + 磁盘）
+- LLM_CACHE_TTL_SECONDS（默认 86400）、LLM_CACHE_MAX_ENTRIES（内存，默认 2048）、LLM_CACHE_MAX_DISK_ENTRIES（默认 100000）
+哪些节点启用缓存见 packages/llm/model_config.py 的 NODE_LLM_CACHE / LLM_CACHE_NODES。
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from packages.observability.metrics import metrics
+from packages.utils.lru import TTLCache
+
+DEFAULT_TTL_SECONDS = 24 * 3600
+DEFAULT_MAX_ENTRIES = 2048
+DEFAULT_MAX_DISK_ENTRIES = 100_000
+
+
+def _message_repr(m: Any) -> Any:
+    """dict 消息原样保留；LangChain 消息取 (type, content)。"""
+    if isinstance(m, dict):
+        return m
+    return [getattr(m, "type", type(m).__name__), getattr(m, "content", str(m))]
+
+
+def make_cache_key(namespace: str, messages: list[Any], **params: Any) -> str:
+    payload = json.dumps(
+        {"ns": namespace, "messages": [_message_repr(m) for m in messages], "params": params},
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _SqliteTier:
+    """磁盘层：key -> value，带过期时间；每 256 次写入清理一次过期与超量条目。"""
+
+    _PURGE_EVERY = 256
+
+    def __init__(self, path: str, *, max_entries: int):
+        self.path = path
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " expires_at REAL"
+            ")"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_created ON llm_cache (created_at)")
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        return row[0]
+
+    def set(self, key: str, value: str, ttl: float | None) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now + ttl if ttl is not None else None),
+            )
+            self._writes += 1
+            if self._writes % self._PURGE_EVERY == 0:
+                self._purge(now)
+
+    def _purge(self, now: float) -> None:
+        self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY created_at LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class LLMCache:
+    """两级 LLM 响应缓存（值为模型返回的文本）。"""
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float | None = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        sqlite_path: str | None = None,
+        max_disk_entries: int = DEFAULT_MAX_DISK_ENTRIES,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self._memory: TTLCache[str, str] = TTLCache(max_entries, ttl=ttl_seconds)
+        self._disk = _SqliteTier(sqlite_path, max_entries=max_disk_entries) if sqlite_path else None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: str, *, namespace: str = "") -> str | None:
+        value = self._memory.get(key)
+        if value is not None:
+            self.memory_hits += 1
+            metrics.incr("llm_cache_hits_total", namespace=namespace, tier="memory")
+            return value
+        if self._disk is not None:
+            value = self._disk.get(key)
+            if value is not None:
+                self.disk_hits += 1
+                metrics.incr("llm_cache_hits_total", namespace=namespace, tier="disk")
+                self._memory.set(key, value)
+                return value
+        self.misses += 1
+        metrics.incr("llm_cache_misses_total", namespace=namespace)
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        self._memory.set(key, value)
+        if self._disk is not None:
+            self._disk.set(key, value, self.ttl_seconds)
+
+    def stats(self) -> dict[str, Any]:
+        total = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / total, 4) if total else 0.0,
+            "memory": self._memory.stats(),
+        }
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+def create_llm_cache(url: str | None = None) -> LLMCache:
+    """按 LLM_CACHE_URL 创建缓存：memory://（默认）或 sqlite:///path（绝对路径用 sqlite:////）。"""
+    url = (url or os.environ.get("LLM_CACHE_URL") or "memory://").strip()
+    ttl = _env_number("LLM_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)
+    kwargs: dict[str, Any] = {
+        "ttl_seconds": ttl if ttl > 0 else None,
+        "max_entries": int(_env_number("LLM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+        "max_disk_entries": int(_env_number("LLM_CACHE_MAX_DISK_ENTRIES", DEFAULT_MAX_DISK_ENTRIES)),
+    }
+    if url.startswith("sqlite:///"):
+        kwargs["sqlite_path"] = url[len("sqlite:///"):] or ":memory:"
+    elif not url.startswith("memory://"):
+        raise ValueError(f"不支持的 LLM_CACHE_URL: {url}（可选 memory:// / sqlite:///）")
+    return LLMCache(**kwargs)
+
+
+_default_cache: LLMCache | None = None
+_default_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """进程级默认缓存（懒加载）。"""
+    global _default_cache
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                _default_cache = create_llm_cache()
+    return _default_cache
+
+
+def cached_chat_completion(
+    chat_completion: Callable[..., str],
+    *,
+    namespace: str,
+    cache: LLMCache | None = None,
+    **params: Any,
+) -> Callable[..., str]:
+    """包装 chat_completion(messages) -> str：相同 namespace + messages + params 直接返回缓存文本。空回复不缓存。"""
+
+    def wrapped(messages: list[dict[str, Any]], **kwargs: Any) -> str:
+        c = cache or get_llm_cache()
+        key = make_cache_key(namespace, messages, **params)
+        if (hit := c.get(key, namespace=namespace)) is not None:
+            return hit
+        text = chat_completion(messages, **kwargs)
+        if text:
+            c.set(key, text)
+        return text
+
+    return wrapped
+
+
+def cached_async_chat_completion(
+    chat_completion: Callable[..., Awaitable[str]],
+    *,
+    namespace: str,
+    cache: LLMCache | None = None,
+    **params: Any,
+) -> Callable[..., Awaitable[str]]:
+    """异步版 cached_chat_completion；命中时若传了 on_token，将整段文本回调一次。"""
+
+    async def wrapped(messages: list[dict[str, Any]], **kwargs: Any) -> str:
+        c = cache or get_llm_cache()
+        key = make_cache_key(namespace, messages, **params)
+        if (hit := c.get(key, namespace=namespace)) is not None:
+            if (on_token := kwargs.get("on_token")) is not None:
+                on_token(hit)
+            return hit
+        text = await chat_completion(messages, **kwargs)
+        if text:
+            c.set(key, text)
+        return text
+
+    return wrapped
+
+
+@dataclass
+class CachedMessage:
+    """缓存命中时返回的消息，节点只读取 .content。"""
+
+    content: str
+
+
+class CachedChatModel:
+    """
+    包装 LangChain chat model（invoke / ainvoke），按 namespace + messages + params 缓存回复文本。
+    命中时返回 CachedMessage（有 .content），未命中时原样返回底层模型的结果。
+    """
+
+    def __init__(self, llm: Any, *, namespace: str, cache: LLMCache | None = None, **params: Any):
+        self.llm = llm
+        self.namespace = namespace
+        self._cache = cache
+        self._params = params
+
+    @property
+    def cache(self) -> LLMCache:
+        return self._cache or get_llm_cache()
+
+    def _key(self, messages: list[Any]) -> str:
+        return make_cache_key(self.namespace, messages, **self._params)
+
+    def _store(self, key: str, response: Any) -> None:
+        text = getattr(response, "content", None)
+        if isinstance(text, str) and text:
+            self.cache.set(key, text)
+
+    def invoke(self, messages: list[Any], *args: Any, **kwargs: Any) -> Any:
+        key = self._key(messages)
+        if (hit := self.cache.get(key, namespace=self.namespace)) is not None:
+            return CachedMessage(hit)
+        response = self.llm.invoke(messages, *args, **kwargs)
+        self._store(key, response)
+        return response
+
+    async def ainvoke(self, messages: list[Any], *args: Any, **kwargs: Any) -> Any:
+        key = self._key(messages)
+        if (hit := self.cache.get(key, namespace=self.namespace)) is not None:
+            return CachedMessage(hit)
+        if hasattr(self.llm, "ainvoke"):
+            response = await self.llm.ainvoke(messages, *args, **kwargs)
+        else:
+            response = await asyncio.to_thread(self.llm.invoke, messages, *args, **kwargs)
+        self._store(key, response)
+        return response
+
+    def __getattr__(self, name: str) -> Any:
+        # 其余属性（bind_tools 等）透传给底层模型
+        return getattr(self.llm, name)
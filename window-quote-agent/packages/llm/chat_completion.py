@@ -5,11 +5,16 @@ Chat completion：调用 OpenAI 兼容接口，供 agent 各节点使用。
 1) 环境变量：在 .env 中设置 MODEL_BASE_URL / MODEL_NAME / API_KEY，然后调用 get_chat_completion()。
 2) 代码传入：create_chat_completion(base_url=..., model=..., api_key=...) 或 create_chat_completion_from_config(settings)。
 3) API 层：用 apps.api.config.get_settings() 得到 Settings，再 create_chat_completion_from_config(s) 传入。
+
+客户端来自 packages.llm.client 注册表，同一 (base_url, api_key) 的所有调用共享连接池。
 """
 from __future__ import annotations
 
+import asyncio
 import os
-from typing import Any, Callable
+from typing import Any, Awaitable, Callable
+
+from packages.llm.client import get_async_openai_client, get_openai_client, get_timeout
 
 # 从环境变量读取默认值（未设置时使用）
 MODEL_BASE_URL = os.environ.get("MODEL_BASE_URL", "http://localhost:8000/v1")
@@ -17,36 +22,121 @@ MODEL_NAME = os.environ.get("MODEL_NAME", "deepseek-r1-lora")
 API_KEY = os.environ.get("API_KEY", "dummy")
 
 
-def _call_api(messages: list[dict[str, Any]], *, base_url: str, model: str, api_key: str) -> str:
-    from openai import OpenAI
-
-    client = OpenAI(base_url=base_url, api_key=api_key)
-    resp = client.chat.completions.create(model=model, messages=messages)
+def _call_api(
+    messages: list[dict[str, Any]],
+    *,
+    base_url: str,
+    model: str,
+    api_key: str,
+    timeout: float | None = None,
+) -> str:
+    client = get_openai_client(base_url, api_key)
+    resp = client.chat.completions.create(model=model, messages=messages, timeout=timeout or get_timeout())
     if not resp.choices:
         return ""
     return (resp.choices[0].message.content or "").strip()
 
 
+async def _acall_api(
+    messages: list[dict[str, Any]],
+    *,
+    base_url: str,
+    model: str,
+    api_key: str,
+    timeout: float | None = None,
+    on_token: Callable[[str], Any] | None = None,
+) -> str:
+    client = get_async_openai_client(base_url, api_key)
+    timeout = timeout or get_timeout()
+    if on_token is None:
+        resp = await client.chat.completions.create(model=model, messages=messages, timeout=timeout)
+        if not resp.choices:
+            return ""
+        return (resp.choices[0].message.content or "").strip()
+
+    # 流式：每收到一段增量即回调 on_token，最终仍返回完整文本
+    parts: list[str] = []
+    stream = await client.chat.completions.create(model=model, messages=messages, stream=True, timeout=timeout)
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content or ""
+        if delta:
+            parts.append(delta)
+            on_token(delta)
+    return "".join(parts).strip()
+
+
 def create_chat_completion(
     *,
     base_url: str | None = None,
     model: str | None = None,
     api_key: str | None = None,
+    timeout: float | None = None,
 ) -> Callable[..., str]:
     """
     返回符合 agent 约定的 chat_completion(messages) -> str。
-    未传参数时使用环境变量 MODEL_BASE_URL / MODEL_NAME / API_KEY。
+    未传参数时使用环境变量 MODEL_BASE_URL / MODEL_NAME / API_KEY；timeout 未传时读 LLM_TIMEOUT。
     """
     url = base_url if base_url is not None else MODEL_BASE_URL
     name = model if model is not None else MODEL_NAME
     key = api_key if api_key is not None else API_KEY
 
     def chat_completion(messages: list[dict[str, Any]], **kwargs: Any) -> str:
-        return _call_api(messages, base_url=url, model=name, api_key=key)
+        return _call_api(messages, base_url=url, model=name, api_key=key, timeout=timeout)
 
     return chat_completion
 
 
+def create_async_chat_completion(
+    *,
+    base_url: str | None = None,
+    model: str | None = None,
+    api_key: str | None = None,
+    timeout: float | None = None,
+) -> Callable[..., Awaitable[str]]:
+    """
+    异步版 create_chat_completion：返回 async chat_completion(messages, on_token=None) -> str，
+    使用 AsyncOpenAI，不占用线程池，供 graph.ainvoke 路径使用。
+    传入 on_token 时以流式方式请求，每个增量文本片段回调一次。
+    """
+    url = base_url if base_url is not None else MODEL_BASE_URL
+    name = model if model is not None else MODEL_NAME
+    key = api_key if api_key is not None else API_KEY
+
+    async def chat_completion(messages: list[dict[str, Any]], **kwargs: Any) -> str:
+        return await _acall_api(
+            messages, base_url=url, model=name, api_key=key, timeout=timeout, on_token=kwargs.get("on_token")
+        )
+
+    return chat_completion
+
+
+def to_async_chat_completion(chat_completion: Callable[..., Any]) -> Callable[..., Awaitable[str]]:
+    """
+    将同步 chat_completion 包装为异步版本（在线程中执行），用于只提供同步实现的模型（如本地 HF、测试 mock）。
+    已是协程函数时原样返回。同步实现无法流式，传入 on_token 时在完成后将整段回复回调一次。
+    """
+    if asyncio.iscoroutinefunction(chat_completion):
+        return chat_completion
+
+    async def achat_completion(messages: list[dict[str, Any]], **kwargs: Any) -> str:
+        on_token = kwargs.pop("on_token", None)
+        text = await asyncio.to_thread(chat_completion, messages, **kwargs)
+        if on_token is not None and text:
+            on_token(text)
+        return text
+
+    return achat_completion
+
+
+async def ainvoke_llm(llm: Any, messages: list[Any]) -> Any:
+    """异步调用 LangChain chat model：优先 llm.ainvoke，否则在线程中执行 llm.invoke。"""
+    if hasattr(llm, "ainvoke"):
+        return await llm.ainvoke(messages)
+    return await asyncio.to_thread(llm.invoke, messages)
+
+
 def create_chat_completion_from_config(config: Any) -> Callable[..., str]:
     """
     从配置对象创建 chat_completion。支持具有 MODEL_BASE_URL / MODEL_NAME / API_KEY 属性的对象
@@ -0,0 +1,167 @@
+"""
+OpenAI 兼容客户端注册表：按 (base_url, api_key) 复用 OpenAI / AsyncOpenAI 实例，所有节点、意图分类器共享
+同一组 httpx 连接池（keep-alive），避免每次调用新建客户端、重新建连与 TLS 握手。
+
+- 连接池：LLM_HTTP_MAX_CONNECTIONS（默认 100）、LLM_HTTP_MAX_KEEPALIVE（默认 20）、LLM_HTTP_KEEPALIVE_EXPIRY（秒，默认 60）；
+- 超时：按模型档位读 MODEL_<KEY>_TIMEOUT，其次 LLM_TIMEOUT，默认 60 秒；建连超时 LLM_CONNECT_TIMEOUT，默认 5 秒；
+- 异步客户端按事件循环区分（httpx 异步连接池不能跨事件循环复用）。
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import weakref
+from typing import Any
+
+DEFAULT_TIMEOUT_SECONDS = 60.0
+DEFAULT_CONNECT_TIMEOUT_SECONDS = 5.0
+OPENAI_BASE_URL = "https://api.openai.com/v1"
+
+_lock = threading.Lock()
+# 进程内共享的同步 httpx 连接池（httpx 按 host 分池，不同 base_url 可共用一个 Client）
+_http_client: Any = None
+_sync_clients: dict[tuple[str, str], Any] = {}
+# 事件循环 -> (共享 httpx.AsyncClient, {(base_url, api_key): AsyncOpenAI})；循环被回收时一并释放
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple[Any, dict[tuple[str, str], Any]]]" = (
+    weakref.WeakKeyDictionary()
+)
+_chat_models: dict[tuple[Any, ...], Any] = {}
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        value = float(os.environ.get(name) or default)
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+def get_timeout(model_key: str | None = None) -> float:
+    """某模型档位的请求超时（秒）：MODEL_<KEY>_TIMEOUT → LLM_TIMEOUT → 60。"""
+    default = _env_float("LLM_TIMEOUT", DEFAULT_TIMEOUT_SECONDS)
+    if not model_key:
+        return default
+    return _env_float(f"MODEL_{model_key.upper()}_TIMEOUT", default)
+
+
+def _httpx_settings() -> dict[str, Any]:
+    import httpx
+
+    return {
+        "limits": httpx.Limits(
+            max_connections=int(_env_float("LLM_HTTP_MAX_CONNECTIONS", 100)),
+            max_keepalive_connections=int(_env_float("LLM_HTTP_MAX_KEEPALIVE", 20)),
+            keepalive_expiry=_env_float("LLM_HTTP_KEEPALIVE_EXPIRY", 60.0),
+        ),
+        "timeout": httpx.Timeout(
+            get_timeout(),
+            connect=_env_float("LLM_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT_SECONDS),
+        ),
+    }
+
+
+def _normalize(base_url: str | None, api_key: str | None) -> tuple[str, str]:
+    base_url = (base_url or os.environ.get("OPENAI_BASE_URL") or OPENAI_BASE_URL).rstrip("/")
+    # 未配置 key 时保持空串，由 OpenAI 构造函数照常报错（不静默发出无效请求）
+    api_key = api_key or os.environ.get("OPENAI_API_KEY") or ""
+    return base_url, api_key
+
+
+def get_http_client() -> Any:
+    """进程内共享的同步 httpx 客户端（带连接数上限与 keep-alive）。"""
+    global _http_client
+    if _http_client is None:
+        from openai import DefaultHttpxClient
+
+        with _lock:
+            if _http_client is None:
+                _http_client = DefaultHttpxClient(**_httpx_settings())
+    return _http_client
+
+
+def get_openai_client(base_url: str | None = None, api_key: str | None = None) -> Any:
+    """返回 (base_url, api_key) 对应的共享 OpenAI 客户端；未传时读 OPENAI_BASE_URL / OPENAI_API_KEY。"""
+    key = _normalize(base_url, api_key)
+    client = _sync_clients.get(key)
+    if client is not None:
+        return client
+    from openai import OpenAI
+
+    http_client = get_http_client()
+    with _lock:
+        client = _sync_clients.get(key)
+        if client is None:
+            client = OpenAI(base_url=key[0], api_key=key[1] or None, http_client=http_client)
+            _sync_clients[key] = client
+    return client
+
+
+def get_async_openai_client(base_url: str | None = None, api_key: str | None = None) -> Any:
+    """返回当前事件循环内 (base_url, api_key) 对应的共享 AsyncOpenAI 客户端。需在协程中调用。"""
+    key = _normalize(base_url, api_key)
+    loop = asyncio.get_running_loop()
+    entry = _async_clients.get(loop)
+    if entry is None:
+        from openai import DefaultAsyncHttpxClient
+
+        entry = _async_clients.setdefault(loop, (DefaultAsyncHttpxClient(**_httpx_settings()), {}))
+    http_client, clients = entry
+    client = clients.get(key)
+    if client is None:
+        from openai import AsyncOpenAI
+
+        client = AsyncOpenAI(base_url=key[0], api_key=key[1] or None, http_client=http_client)
+        clients[key] = client
+    return client
+
+
+def get_langchain_chat_model(
+    *,
+    model: str = "gpt-4o",
+    api_key: str,
+    temperature: float = 0,
+    base_url: str | None = None,
+    model_key: str | None = None,
+) -> Any:
+    """
+    共享的 LangChain ChatOpenAI（router planner、check 等节点用）：按参数缓存实例，
+    同步请求复用注册表中的 httpx 连接池，异步连接池由该实例持有并复用。
+    """
+    cache_key = (model, api_key, temperature, base_url, model_key)
+    llm = _chat_models.get(cache_key)
+    if llm is not None:
+        return llm
+    from langchain_openai import ChatOpenAI
+
+    http_client = get_http_client()
+    with _lock:
+        llm = _chat_models.get(cache_key)
+        if llm is None:
+            kwargs: dict[str, Any] = {
+                "model": model,
+                "api_key": api_key,
+                "temperature": temperature,
+                "timeout": get_timeout(model_key),
+            }
+            if base_url:
+                kwargs["base_url"] = base_url
+            # 与 get_openai_client 共用同一个 httpx 连接池
+            kwargs["http_client"] = http_client
+            llm = ChatOpenAI(**kwargs)
+            _chat_models[cache_key] = llm
+    return llm
+
+
+async def aclose_clients() -> None:
+    """关闭连接池并清空注册表（应用退出时在事件循环内调用）。"""
+    global _http_client
+    entry = _async_clients.pop(asyncio.get_running_loop(), None)
+    if entry is not None:
+        await entry[0].aclose()
+    with _lock:
+        if _http_client is not None:
+            _http_client.close()
+        _http_client = None
+        _sync_clients.clear()
+        _chat_models.clear()
@@ -3,17 +3,25 @@
 
 使用方式：
 1) 环境变量：为每个「模型档位」设置 MODEL_<KEY>_BASE_URL / MODEL_<KEY>_NAME / MODEL_<KEY>_API_KEY，
-   未设置时回退到 MODEL_BASE_URL / MODEL_NAME / API_KEY。
+   未设置时回退到 MODEL_BASE_URL / MODEL_NAME / API_KEY；请求超时 MODEL_<KEY>_TIMEOUT，未设置时回退到 LLM_TIMEOUT。
 2) 非 GPT 的 LLM 节点（chat / collect_recommend_params / collect_requirements / recommend）：
    默认使用 OpenAI gpt-4o（需 OPENAI_API_KEY）；设置 LLM_BACKEND=huggingface 可改用本地 HF 模型（MODEL_ID）。
-3) 构建图时：传入 chat_completions=get_all_node_chat_completions() 即可按节点用不同模型。
+3) 构建图时：传入 chat_completions=get_all_node_chat_completions() 即可按节点用不同模型；
+   异步路径（graph.ainvoke）另传 achat_completions=get_all_node_async_chat_completions()。
+4) LLM 响应缓存按节点开启（NODE_LLM_CACHE），环境变量 LLM_CACHE_NODES 可覆盖（逗号分隔节点名，none 表示全部关闭）。
 """
 from __future__ import annotations
 
 import os
-from typing import Any, Callable
+from typing import Any, Awaitable, Callable
 
-from packages.llm.chat_completion import create_chat_completion
+from packages.llm.cache import cached_async_chat_completion, cached_chat_completion
+from packages.llm.chat_completion import (
+    create_async_chat_completion,
+    create_chat_completion,
+    to_async_chat_completion,
+)
+from packages.llm.client import get_timeout
 
 # 使用 LLM 的节点（与 graph.py 中 add_node 名称一致）
 # 产品咨询由 chat 节点通过 RAG tool 处理，不再单独 rag_query 节点
@@ -32,6 +40,29 @@ NODE_TO_MODEL_KEY: dict[str, str] = {
     "recommend": "qa",                   # 推荐话术
 }
 
+# 节点 → 是否缓存 LLM 回复。仅对 temperature=0、同一 prompt 应得到同一结果的节点开启；
+# 面向用户的生成类节点（温度 > 0、带对话历史）默认关闭
+NODE_LLM_CACHE: dict[str, bool] = {
+    "router": True,     # router planner（temperature 0）
+    "check": True,      # 结束判断（temperature 0.1，输出为 JSON 判定）
+    "step_controller": True,  # check + router 合并的单次规划（temperature 0）
+    "intent": True,     # 意图流水线中的不确定性分类器（temperature 0）
+    "chat": False,
+    "collect_recommend_params": False,
+    "collect_requirements": False,
+    "recommend": False,
+}
+
+
+def is_llm_cache_enabled(node_name: str) -> bool:
+    """该节点是否启用 LLM 响应缓存：LLM_CACHE_NODES 已设置时以其为准，否则查 NODE_LLM_CACHE。"""
+    override = os.environ.get("LLM_CACHE_NODES")
+    if override is not None and override.strip():
+        names = {n.strip() for n in override.split(",") if n.strip()}
+        return node_name in names and "none" not in names
+    return NODE_LLM_CACHE.get(node_name, False)
+
+
 # 非 GPT 的 LLM 节点（chat/collect/recommend）默认用 OpenAI 跑通全流程；设为 "huggingface" 则用本地 HF 模型
 LLM_BACKEND = os.environ.get("LLM_BACKEND") or os.environ.get("CHAT_BACKEND", "openai")
 
@@ -55,7 +86,7 @@ MODEL_KEY_DEFAULTS: dict[str, dict[str, str]] = {
 }
 
 
-def get_model_config(model_key: str) -> dict[str, str]:
+def get_model_config(model_key: str) -> dict[str, Any]:
     """
     读取某模型档位的配置。优先环境变量 MODEL_<KEY>_BASE_URL / MODEL_<KEY>_NAME / MODEL_<KEY>_API_KEY，
     其次全局 MODEL_BASE_URL / MODEL_NAME / API_KEY，最后 MODEL_KEY_DEFAULTS[model_key]。
@@ -77,7 +108,7 @@ def get_model_config(model_key: str) -> dict[str, str]:
         or os.environ.get("OPENAI_API_KEY")
         or MODEL_KEY_DEFAULTS.get(model_key, {}).get("api_key", "dummy")
     )
-    return {"base_url": base_url, "model": model, "api_key": api_key}
+    return {"base_url": base_url, "model": model, "api_key": api_key, "timeout": get_timeout(model_key)}
 
 
 def get_chat_completion_for_node(node_name: str) -> Callable[..., str]:
@@ -97,13 +128,40 @@ def get_chat_completion_for_node(node_name: str) -> Callable[..., str]:
         model_id = os.getenv("MODEL_ID") or MODEL_KEY_DEFAULTS["chat"]["model"]
         return create_hf_chat_completion(model_id=model_id)
     cfg = get_model_config(key)
-    return create_chat_completion(
+    fn = create_chat_completion(
         base_url=cfg["base_url"],
         model=cfg["model"],
         api_key=cfg["api_key"],
+        timeout=cfg["timeout"],
     )
+    if is_llm_cache_enabled(node_name):
+        fn = cached_chat_completion(fn, namespace=node_name, base_url=cfg["base_url"], model=cfg["model"])
+    return fn
 
 
 def get_all_node_chat_completions() -> dict[str, Callable[..., str]]:
     """返回 节点名 -> chat_completion 的字典，供 build_quote_graph(chat_completions=...) 使用。"""
     return {node: get_chat_completion_for_node(node) for node in NODES_USING_LLM}
+
+
+def get_async_chat_completion_for_node(node_name: str) -> Callable[..., Awaitable[str]]:
+    """按节点名返回异步 chat_completion；OpenAI 兼容接口用 AsyncOpenAI，HF 本地模型在线程中执行。"""
+    if node_name not in NODE_TO_MODEL_KEY:
+        raise KeyError(f"未知节点 {node_name}，需在 NODE_TO_MODEL_KEY 中定义；使用 LLM 的节点: {NODES_USING_LLM}")
+    if LLM_BACKEND.lower() == "huggingface":
+        return to_async_chat_completion(get_chat_completion_for_node(node_name))
+    cfg = get_model_config(NODE_TO_MODEL_KEY[node_name])
+    fn = create_async_chat_completion(
+        base_url=cfg["base_url"],
+        model=cfg["model"],
+        api_key=cfg["api_key"],
+        timeout=cfg["timeout"],
+    )
+    if is_llm_cache_enabled(node_name):
+        fn = cached_async_chat_completion(fn, namespace=node_name, base_url=cfg["base_url"], model=cfg["model"])
+    return fn
+
+
+def get_all_node_async_chat_completions() -> dict[str, Callable[..., Awaitable[str]]]:
+    """返回 节点名 -> 异步 chat_completion 的字典，供 build_quote_graph(achat_completions=...) 使用。"""
+    return {node: get_async_chat_completion_for_node(node) for node in NODES_USING_LLM}
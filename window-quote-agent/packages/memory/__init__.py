@@ -0,0 +1,37 @@
+"""记忆：会话状态存储（短期记忆）、LangGraph checkpointer 与会话级并发控制。"""
+from packages.memory.checkpoint import (
+    CheckpointRetention,
+    close_checkpointer,
+    create_checkpoint_retention,
+    list_checkpoints,
+    open_checkpointer,
+    replay_from,
+    resume_session,
+    thread_config,
+)
+from packages.memory.session_lock import RequestCoalescer, SessionLocks
+from packages.memory.session_store import (
+    InMemorySessionStore,
+    RedisSessionStore,
+    SessionStore,
+    SqliteSessionStore,
+    create_session_store,
+)
+
+__all__ = [
+    "SessionStore",
+    "InMemorySessionStore",
+    "SqliteSessionStore",
+    "RedisSessionStore",
+    "create_session_store",
+    "SessionLocks",
+    "RequestCoalescer",
+    "open_checkpointer",
+    "close_checkpointer",
+    "CheckpointRetention",
+    "create_checkpoint_retention",
+    "thread_config",
+    "list_checkpoints",
+    "replay_from",
+    "resume_session",
+]
@@ -0,0 +1,218 @@
+"""
+LangGraph checkpointer：以 session_id 作为 thread_id，图每执行一步就增量持久化一次状态。
+
+- 轮次之间：下一轮只需传入新的用户消息，其余状态由 checkpointer 按 thread_id 恢复；
+- 崩溃恢复：某轮执行到一半进程退出时，resume_session() 从最后一个 checkpoint 继续执行剩余节点；
+- 回放调试：list_checkpoints() 列出会话的每一步，replay_from() 从任一步重新执行后续节点，之前的步骤（及其 LLM 调用）不会重跑。
+
+后端由环境变量 CHECKPOINTER_URL 决定：
+- none（默认）：不启用 checkpointer，用 SESSION_STORE_URL 的整轮快照（TTL / LRU 预算、可跨 worker 共享）；
+- memory://：进程内 MemorySaver，适合开发与单 worker；
+- sqlite:///data/checkpoints.db：本地 SQLite（WAL 模式），重启不丢，需安装 langgraph-checkpoint-sqlite。
+
+checkpointer 每步都写一份 checkpoint，CheckpointRetention 在每轮结束后清理：每个会话只保留最近
+CHECKPOINT_KEEP_PER_THREAD 个，本进程服务过的会话超出 CHECKPOINT_MAX_THREADS 或闲置超过 CHECKPOINT_TTL_SECONDS 时整段删除。
+"""
+from __future__ import annotations
+
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable
+
+from packages.memory.session_store import DEFAULT_MAX_SESSIONS, DEFAULT_TTL_SECONDS, _env_number
+
+DEFAULT_CHECKPOINTER_URL = "none"
+# 每个会话保留的 checkpoint 数：够回放最近一两轮，又不随轮数无限增长
+DEFAULT_KEEP_PER_THREAD = 50
+
+
+async def open_checkpointer(url: str | None = None) -> Any | None:
+    """按 URL 创建 checkpointer；sqlite 后端需在事件循环内打开，故为协程。none 时返回 None。"""
+    url = (url or os.environ.get("CHECKPOINTER_URL") or DEFAULT_CHECKPOINTER_URL).strip()
+    if url.lower() == "none":
+        return None
+    if url.startswith("memory://"):
+        from langgraph.checkpoint.memory import MemorySaver
+
+        return MemorySaver()
+    if url.startswith("sqlite:///"):
+        try:
+            import aiosqlite
+            from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+        except ImportError as e:
+            raise ImportError(
+                "CHECKPOINTER_URL=sqlite:/// 需安装: pip install -e \".[checkpoint-sqlite]\""
+            ) from e
+        path = url[len("sqlite:///"):] or ":memory:"
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = await aiosqlite.connect(path)
+        # WAL：读写互不阻塞，多 worker 共享同一文件时写入更稳
+        await conn.execute("PRAGMA journal_mode=WAL")
+        await conn.execute("PRAGMA synchronous=NORMAL")
+        saver = AsyncSqliteSaver(conn)
+        await saver.setup()
+        return saver
+    raise ValueError(f"不支持的 CHECKPOINTER_URL: {url}（可选 memory:// / sqlite:/// / none）")
+
+
+async def close_checkpointer(saver: Any | None) -> None:
+    """关闭 checkpointer 持有的连接（MemorySaver 无需关闭）。"""
+    conn = getattr(saver, "conn", None)
+    if conn is not None and hasattr(conn, "close"):
+        await conn.close()
+
+
+def thread_config(session_id: str, checkpoint_id: str | None = None, **configurable: Any) -> dict[str, Any]:
+    """图调用的 config：thread_id = session_id；指定 checkpoint_id 时从该步开始。"""
+    cfg: dict[str, Any] = {"thread_id": session_id, **configurable}
+    if checkpoint_id:
+        cfg["checkpoint_id"] = checkpoint_id
+    return {"configurable": cfg}
+
+
+async def list_checkpoints(graph: Any, session_id: str, *, limit: int | None = None) -> AsyncIterator[dict[str, Any]]:
+    """按时间倒序列出会话的 checkpoint：checkpoint_id、步数、执行来源、待执行节点、当时的 step。"""
+    async for snapshot in graph.aget_state_history(thread_config(session_id), limit=limit):
+        metadata = snapshot.metadata or {}
+        values = snapshot.values or {}
+        yield {
+            "checkpoint_id": snapshot.config["configurable"].get("checkpoint_id"),
+            "step": metadata.get("step"),
+            "source": metadata.get("source"),
+            "next": list(snapshot.next),
+            "node": values.get("step"),
+            "created_at": snapshot.created_at,
+        }
+
+
+async def replay_from(graph: Any, session_id: str, checkpoint_id: str, config: dict[str, Any] | None = None) -> dict[str, Any]:
+    """从指定 checkpoint 重新执行其后的节点（在该 thread 上分叉出新的历史），之前的步骤不重跑。"""
+    configurable = (config or {}).get("configurable", {})
+    return await graph.ainvoke(None, thread_config(session_id, checkpoint_id, **configurable))
+
+
+async def resume_session(graph: Any, session_id: str, config: dict[str, Any] | None = None) -> dict[str, Any]:
+    """从会话最后一个 checkpoint 继续执行未完成的节点（进程在一轮中途退出后恢复用）。"""
+    configurable = (config or {}).get("configurable", {})
+    return await graph.ainvoke(None, thread_config(session_id, **configurable))
+
+
+def _prune_memory_saver(saver: Any, thread_id: str, keep: int) -> int:
+    """MemorySaver：删除较早的 checkpoint 及其 writes，再回收不再被引用的 channel blob。"""
+    removed = 0
+    for ns, checkpoints in list(saver.storage.get(thread_id, {}).items()):
+        stale = sorted(checkpoints)[:-keep] if len(checkpoints) > keep else []
+        if not stale:
+            continue
+        for checkpoint_id in stale:
+            del checkpoints[checkpoint_id]
+            saver.writes.pop((thread_id, ns, checkpoint_id), None)
+        live = {
+            (thread_id, ns, channel, version)
+            for saved, _metadata, _parent in checkpoints.values()
+            for channel, version in saver.serde.loads_typed(saved)["channel_versions"].items()
+        }
+        for key in [k for k in saver.blobs if k[0] == thread_id and k[1] == ns and k not in live]:
+            del saver.blobs[key]
+        removed += len(stale)
+    return removed
+
+
+async def _prune_sqlite_saver(saver: Any, thread_id: str, keep: int) -> int:
+    """AsyncSqliteSaver：checkpoint_id 按时间单调递增，保留最大的 keep 个，孤立的 writes 一并删除。"""
+    async with saver.lock:
+        cursor = await saver.conn.execute(
+            "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_id NOT IN "
+            "(SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? ORDER BY checkpoint_id DESC LIMIT ?)",
+            (thread_id, thread_id, keep),
+        )
+        await saver.conn.execute(
+            "DELETE FROM writes WHERE thread_id = ? AND checkpoint_id NOT IN "
+            "(SELECT checkpoint_id FROM checkpoints WHERE thread_id = ?)",
+            (thread_id, thread_id),
+        )
+        await saver.conn.commit()
+        return max(cursor.rowcount, 0)
+
+
+async def prune_thread_checkpoints(saver: Any, thread_id: str, keep: int) -> int:
+    """只保留会话最近 keep 个 checkpoint（更早的步骤不能再 list / replay），返回删除数；不支持的后端返回 0。"""
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    if isinstance(saver, InMemorySaver):
+        return _prune_memory_saver(saver, thread_id, keep)
+    try:
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    except ImportError:
+        return 0
+    if isinstance(saver, AsyncSqliteSaver):
+        return await _prune_sqlite_saver(saver, thread_id, keep)
+    return 0
+
+
+class CheckpointRetention:
+    """
+    checkpointer 的保留策略，对应 session store 的 TTL / LRU 预算：
+    - 每轮结束后只保留该会话最近 keep_per_thread 个 checkpoint；
+    - 按最近一轮的时间维护本进程服务过的会话，超出 max_threads 或闲置超过 ttl_seconds 的整段删除（adelete_thread）。
+    多 worker 共享 sqlite 时各 worker 只清理自己服务过的会话，与 SessionLocks 一样需要按 session_id 粘性路由。
+    """
+
+    def __init__(
+        self,
+        saver: Any,
+        *,
+        keep_per_thread: int | None = DEFAULT_KEEP_PER_THREAD,
+        max_threads: int | None = DEFAULT_MAX_SESSIONS,
+        ttl_seconds: float | None = DEFAULT_TTL_SECONDS,
+    ):
+        self.saver = saver
+        self.keep_per_thread = keep_per_thread
+        self.max_threads = max_threads
+        self.ttl_seconds = ttl_seconds
+        self._last_seen: OrderedDict[str, float] = OrderedDict()
+
+    async def after_turn(self, thread_id: str, *, is_active: Callable[[str], bool] | None = None) -> int:
+        """
+        一轮结束后调用（持有该会话的锁时）。is_active(thread_id) 为真的会话正在执行，本次不删除。
+        返回删除的 checkpoint 数（整段删除的会话不计）。
+        """
+        now = time.monotonic()
+        self._last_seen[thread_id] = now
+        self._last_seen.move_to_end(thread_id)
+        removed = 0
+        if self.keep_per_thread:
+            removed = await prune_thread_checkpoints(self.saver, thread_id, self.keep_per_thread)
+
+        expired: list[str] = []
+        for tid, seen in list(self._last_seen.items()):
+            over_budget = self.max_threads is not None and len(self._last_seen) - len(expired) > self.max_threads
+            idle = self.ttl_seconds is not None and now - seen > self.ttl_seconds
+            if not (over_budget or idle):
+                break
+            if tid != thread_id and not (is_active and is_active(tid)):
+                expired.append(tid)
+        for tid in expired:
+            del self._last_seen[tid]
+            await self.saver.adelete_thread(tid)
+        return removed
+
+    def __len__(self) -> int:
+        return len(self._last_seen)
+
+
+def create_checkpoint_retention(saver: Any | None) -> CheckpointRetention | None:
+    """按环境变量创建保留策略；未启用 checkpointer 时返回 None。各项 <=0 表示不限制。"""
+    if saver is None:
+        return None
+    keep = _env_number("CHECKPOINT_KEEP_PER_THREAD", DEFAULT_KEEP_PER_THREAD)
+    max_threads = _env_number("CHECKPOINT_MAX_THREADS", DEFAULT_MAX_SESSIONS)
+    return CheckpointRetention(
+        saver,
+        keep_per_thread=int(keep) if keep is not None else None,
+        max_threads=int(max_threads) if max_threads is not None else None,
+        ttl_seconds=_env_number("CHECKPOINT_TTL_SECONDS", DEFAULT_TTL_SECONDS),
+    )
@@ -0,0 +1,87 @@
+"""
+会话并发控制：
+- SessionLocks：按 session_id 的 asyncio 锁，同一会话的多轮请求串行执行（读状态 → 跑图 → 写状态），避免后写覆盖丢轮次；
+- RequestCoalescer：按幂等键合并重复请求，重试请求挂到进行中的结果上，不重复跑图；完成的结果短期保留供迟到的重试复用。
+
+二者均为进程内（单事件循环）结构；多 worker 部署时需按 session_id 做粘性路由才能保证跨进程串行。
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable
+from contextlib import asynccontextmanager
+from typing import Any
+
+from packages.utils.lru import TTLCache
+
+DEFAULT_RESULT_TTL_SECONDS = 300.0
+
+
+class SessionLocks:
+    """按 session_id 分配的锁；无人持有或等待时自动回收，不会随会话数增长。"""
+
+    def __init__(self) -> None:
+        # session_id -> (锁, 持有+等待者计数)
+        self._locks: dict[str, tuple[asyncio.Lock, int]] = {}
+
+    @asynccontextmanager
+    async def hold(self, session_id: str) -> AsyncIterator[None]:
+        lock, waiters = self._locks.get(session_id) or (asyncio.Lock(), 0)
+        self._locks[session_id] = (lock, waiters + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, waiters = self._locks[session_id]
+            if waiters <= 1:
+                del self._locks[session_id]
+            else:
+                self._locks[session_id] = (lock, waiters - 1)
+
+    def locked(self, session_id: str) -> bool:
+        entry = self._locks.get(session_id)
+        return entry is not None and entry[0].locked()
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+
+class RequestCoalescer:
+    """
+    幂等请求合并：同一 key 的请求只执行一次 factory。
+    - 进行中：后来者等待同一个 Future；
+    - 已成功：结果在 result_ttl 秒内直接返回；
+    - 失败：不缓存，重试会重新执行。
+    共享任务与单个调用方的取消解耦（asyncio.shield），某个客户端断开不会中断其他等待者。
+    """
+
+    def __init__(self, *, result_ttl: float = DEFAULT_RESULT_TTL_SECONDS, max_results: int = 4096):
+        self._inflight: dict[Hashable, asyncio.Future[Any]] = {}
+        self._results: TTLCache[Hashable, Any] = TTLCache(max_results, ttl=result_ttl)
+
+    def submit(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> tuple[asyncio.Future[Any], bool]:
+        """返回 (future, 是否由本次调用启动)；命中进行中或已完成的结果时不会调用 factory。"""
+        if key in self._results:
+            fut: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+            fut.set_result(self._results.get(key))
+            return fut, False
+        if (fut := self._inflight.get(key)) is not None:
+            return fut, False
+
+        fut = asyncio.ensure_future(factory())
+        self._inflight[key] = fut
+
+        def _done(f: asyncio.Future[Any]) -> None:
+            self._inflight.pop(key, None)
+            if not f.cancelled() and f.exception() is None:
+                self._results.set(key, f.result())
+
+        fut.add_done_callback(_done)
+        return fut, True
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        fut, _ = self.submit(key, factory)
+        return await asyncio.shield(fut)
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._inflight
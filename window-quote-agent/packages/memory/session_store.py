@@ -0,0 +1,222 @@
+"""
+会话状态存储：/chat 每轮结束后保存图状态，下一轮恢复（flow_stage、current_intent、requirements 等）。
+
+后端（由 create_session_store / 环境变量 SESSION_STORE_URL 选择）：
+- memory://                 进程内 LRU + TTL，按字节预算淘汰（默认；多 worker 间不共享）
+- sqlite:///data/sessions.db 本地磁盘 SQLite（WAL），同机多 worker 共享（绝对路径用 sqlite:////）
+- redis://host:6379/0       Redis 协议（Redis / KeyDB / fakeredis），多机多 worker 共享，无需粘性会话
+
+状态以 JSON 序列化存储，取出的是独立副本，调用方修改不会影响已存内容。
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any
+
+from packages.utils.lru import TTLCache
+
+DEFAULT_TTL_SECONDS = 24 * 3600
+DEFAULT_MAX_SESSIONS = 10_000
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def _encode(state: dict[str, Any]) -> bytes:
+    return json.dumps(state, ensure_ascii=False, default=str).encode("utf-8")
+
+
+def _decode(data: bytes | str) -> dict[str, Any]:
+    return json.loads(data)
+
+
+class SessionStore(ABC):
+    """会话状态存储接口：session_id -> 图状态 dict。"""
+
+    @abstractmethod
+    def get(self, session_id: str) -> dict[str, Any] | None:
+        """返回会话状态；不存在或已过期时返回 None。"""
+
+    @abstractmethod
+    def set(self, session_id: str, state: dict[str, Any]) -> None:
+        """保存会话状态并刷新过期时间。"""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        ...
+
+    def close(self) -> None:
+        """释放连接等资源。"""
+
+
+class InMemorySessionStore(SessionStore):
+    """进程内存储：LRU + TTL，超出会话数或字节预算时淘汰最久未访问的会话。"""
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float | None = DEFAULT_TTL_SECONDS,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        max_bytes: int | None = DEFAULT_MAX_BYTES,
+    ):
+        self._cache: TTLCache[str, bytes] = TTLCache(
+            max_sessions,
+            ttl=ttl_seconds,
+            max_bytes=max_bytes,
+            sizeof=len,
+        )
+
+    def get(self, session_id: str) -> dict[str, Any] | None:
+        data = self._cache.get(session_id)
+        return _decode(data) if data is not None else None
+
+    def set(self, session_id: str, state: dict[str, Any]) -> None:
+        self._cache.set(session_id, _encode(state))
+
+    def delete(self, session_id: str) -> None:
+        self._cache.pop(session_id)
+
+    def stats(self) -> dict[str, Any]:
+        return self._cache.stats()
+
+
+class SqliteSessionStore(SessionStore):
+    """本地 SQLite 存储（WAL 模式），同一台机器上的多个 worker 进程可共享。过期会话惰性清理。"""
+
+    # 每写入多少次顺带清理一次过期会话
+    _PURGE_EVERY = 256
+
+    def __init__(self, path: str | Path, *, ttl_seconds: float | None = DEFAULT_TTL_SECONDS):
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " session_id TEXT PRIMARY KEY,"
+            " data BLOB NOT NULL,"
+            " expires_at REAL"
+            ")"
+        )
+
+    def get(self, session_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, expires_at FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            data, expires_at = row
+            if expires_at is not None and expires_at <= time.time():
+                self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+                return None
+        return _decode(data)
+
+    def set(self, session_id: str, state: dict[str, Any]) -> None:
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds is not None else None
+        data = _encode(state)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sessions (session_id, data, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET data = excluded.data, expires_at = excluded.expires_at",
+                (session_id, data, expires_at),
+            )
+            self._writes += 1
+            if self._writes % self._PURGE_EVERY == 0:
+                self._conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),))
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Redis 协议存储：client 为 redis.Redis 兼容对象（redis-py、fakeredis 等），过期由 Redis 的 EX 负责。
+    生产环境用 RedisSessionStore.from_url("redis://...")，测试可传入 fakeredis.FakeRedis()。
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        *,
+        ttl_seconds: float | None = DEFAULT_TTL_SECONDS,
+        prefix: str = "wqa:session:",
+    ):
+        self._client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> "RedisSessionStore":
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("Redis 会话存储需安装: pip install -e \".[redis]\"") from e
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.prefix}{session_id}"
+
+    def get(self, session_id: str) -> dict[str, Any] | None:
+        data = self._client.get(self._key(session_id))
+        return _decode(data) if data is not None else None
+
+    def set(self, session_id: str, state: dict[str, Any]) -> None:
+        ex = int(self.ttl_seconds) if self.ttl_seconds is not None else None
+        self._client.set(self._key(session_id), _encode(state), ex=ex)
+
+    def delete(self, session_id: str) -> None:
+        self._client.delete(self._key(session_id))
+
+    def close(self) -> None:
+        close = getattr(self._client, "close", None)
+        if callable(close):
+            close()
+
+
+def _env_number(name: str, default: float | None) -> float | None:
+    raw = os.environ.get(name, "").strip()
+    if not raw:
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        return default
+    return value if value > 0 else None
+
+
+def create_session_store(url: str | None = None) -> SessionStore:
+    """
+    按 URL 创建会话存储；未传时读 SESSION_STORE_URL，默认 memory://。
+    TTL 读 SESSION_TTL_SECONDS（<=0 表示不过期）；内存后端另读 SESSION_MAX_ENTRIES / SESSION_MAX_BYTES。
+    """
+    url = (url or os.environ.get("SESSION_STORE_URL") or "memory://").strip()
+    ttl = _env_number("SESSION_TTL_SECONDS", DEFAULT_TTL_SECONDS)
+    if url.startswith("memory://"):
+        max_bytes = _env_number("SESSION_MAX_BYTES", DEFAULT_MAX_BYTES)
+        return InMemorySessionStore(
+            ttl_seconds=ttl,
+            max_sessions=int(_env_number("SESSION_MAX_ENTRIES", DEFAULT_MAX_SESSIONS) or DEFAULT_MAX_SESSIONS),
+            max_bytes=int(max_bytes) if max_bytes is not None else None,
+        )
+    if url.startswith("sqlite://"):
+        # 与 SQLAlchemy 一致：sqlite:///relative/path.db、sqlite:////abs/path.db
+        path = url[len("sqlite:///"):] if url.startswith("sqlite:///") else url[len("sqlite://"):]
+        return SqliteSessionStore(path or ":memory:", ttl_seconds=ttl)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisSessionStore.from_url(url, ttl_seconds=ttl)
+    raise ValueError(f"不支持的 SESSION_STORE_URL: {url}（可选 memory:// / sqlite:/// / redis://）")
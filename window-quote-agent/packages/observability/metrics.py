@@ -0,0 +1,64 @@
+"""
+进程内指标：计数器（counter）与耗时/数值汇总（summary：count、sum、max），带可选标签。
+由各模块直接打点，snapshot() 导出为 dict，后续可接 Prometheus。
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _label_key(labels: dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format(name: str, labels: LabelKey) -> str:
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{k}={v}" for k, v in labels) + "}"
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[tuple[str, LabelKey], float] = {}
+        self._summaries: dict[tuple[str, LabelKey], list[float]] = {}  # [count, sum, max]
+
+    def incr(self, name: str, value: float = 1, **labels: Any) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            s = self._summaries.get(key)
+            if s is None:
+                self._summaries[key] = [1, value, value]
+            else:
+                s[0] += 1
+                s[1] += value
+                s[2] = max(s[2], value)
+
+    def counter(self, name: str, **labels: Any) -> float:
+        return self._counters.get((name, _label_key(labels)), 0)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            counters = {_format(n, lk): v for (n, lk), v in self._counters.items()}
+            summaries = {
+                _format(n, lk): {"count": int(c), "sum": round(s, 6), "avg": round(s / c, 6), "max": round(m, 6)}
+                for (n, lk), (c, s, m) in self._summaries.items()
+            }
+        return {"counters": counters, "summaries": summaries}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+
+
+# 进程级单例
+metrics = Metrics()
@@ -0,0 +1,12 @@
+"""产品资料检索：中文分词、BM25 倒排索引与默认 retrieve。"""
+from packages.rag.tokenizer import Tokenizer, tokenize
+from packages.rag.retriever import BM25ChunkRetriever, format_chunk, get_default_retriever, retrieve
+
+__all__ = [
+    "Tokenizer",
+    "tokenize",
+    "BM25ChunkRetriever",
+    "format_chunk",
+    "get_default_retriever",
+    "retrieve",
+]
@@ -0,0 +1,22 @@
+"""检索索引：BM25 倒排的离线构建与 mmap 加载（构建任务见 apps/worker/jobs/build_index.py）。"""
+from packages.rag.indexing.bm25_index import (
+    BM25Index,
+    BM25Params,
+    TOKENIZERS,
+    build_bm25_index,
+    load_bm25_index,
+    load_documents,
+    prune_index_versions,
+    resolve_index_dir,
+)
+
+__all__ = [
+    "BM25Index",
+    "BM25Params",
+    "TOKENIZERS",
+    "build_bm25_index",
+    "load_bm25_index",
+    "load_documents",
+    "prune_index_versions",
+    "resolve_index_dir",
+]
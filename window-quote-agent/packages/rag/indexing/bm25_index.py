@@ -0,0 +1,290 @@
+"""
+BM25 倒排索引：离线构建为版本化的磁盘产物，运行时按需 mmap 加载，import 与启动不建索引。
+
+产物目录（RAG_INDEX_PATH，默认 data/rag_index）：
+  CURRENT                 当前版本号（原子替换，读方只看到完整版本）
+  <version>/manifest.json 格式版本、分词器、BM25 参数、文档数、词表大小
+  <version>/terms.npy     排序后的词表（定长 unicode，searchsorted 查词，无需在内存里建 dict）
+  <version>/indptr.npy    CSR 行指针：词 i 的倒排为 [indptr[i], indptr[i+1])
+  <version>/doc_ids.npy   倒排中的文档下标（int32）
+  <version>/weights.npy   预计算的 BM25 词-文档得分（float32），查询时只需按文档累加
+  <version>/docs.bin      每篇文档一段 JSON（utf-8），doc_offsets.npy 为各段起止，只解码 top-k
+version 为内容哈希：文档、分词器与参数不变时重复构建得到同一版本。.npy 以 mmap 方式打开，
+多个 worker 进程共享同一份页缓存。
+
+打分与 rank_bm25.BM25Okapi（langchain BM25Retriever 的实现）一致：k1=1.5，b=0.75，
+idf 为负的词取 epsilon * 平均 idf。分词默认用 packages/rag/tokenizer（中文 bigram + ASCII 词 / 型号），
+旧的 whitespace 产物仍按其 manifest 中的分词器查询。
+构建与查询均为 numpy 向量运算：(词, 文档) 对一次 np.unique 计数得到 CSR，查询 bincount 累加后
+argpartition 取 top-k，10 万级文档单次查询为毫秒级。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Sequence
+
+import numpy as np
+
+from packages.rag.tokenizer import Tokenizer
+
+FORMAT_VERSION = 1
+DEFAULT_INDEX_PATH = "data/rag_index"
+DEFAULT_SOURCE = Path(__file__).resolve().parent.parent / "brochure" / "product_cards_merged.json"
+CURRENT_FILE = "CURRENT"
+_ARRAYS = ("terms", "indptr", "doc_ids", "weights", "doc_offsets")
+
+
+def whitespace_tokenize(text: str) -> list[str]:
+    """按空白切分（与 BM25Retriever 默认预处理一致）。"""
+    return text.split()
+
+
+# 分词器按名称登记，名称写入 manifest，加载时据此还原查询分词
+TOKENIZERS: dict[str, Callable[[str], list[str]]] = {
+    "whitespace": whitespace_tokenize,
+    **{t.name: t for t in (Tokenizer(), Tokenizer(cjk_unigrams=True))},
+}
+DEFAULT_TOKENIZER = "zh"
+
+
+@dataclass(frozen=True)
+class BM25Params:
+    k1: float = 1.5
+    b: float = 0.75
+    epsilon: float = 0.25
+
+
+def load_documents(path: str | Path = DEFAULT_SOURCE) -> list[dict[str, Any]]:
+    """读取产品卡片 JSON：[{"text", "model", "pages"}, ...] → [{"text", "metadata"}, ...]。"""
+    path = Path(path)
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        items = json.load(f)
+    items = items if isinstance(items, list) else []
+    return [
+        {
+            "text": item.get("text", ""),
+            "metadata": {
+                "model": item.get("model", ""),
+                "pages": item.get("pages", []),
+                "source": "brochure",
+            },
+        }
+        for item in items
+    ]
+
+
+@dataclass
+class BM25Index:
+    """CSR 倒排 + 文档存储；数组可以是内存数组，也可以是 mmap（只读）。"""
+
+    manifest: dict[str, Any]
+    terms: np.ndarray
+    indptr: np.ndarray
+    doc_ids: np.ndarray
+    weights: np.ndarray
+    doc_offsets: np.ndarray
+    doc_blob: Any  # bytes 或 np.memmap(uint8)
+    path: Path | None = field(default=None, compare=False)
+
+    @property
+    def version(self) -> str:
+        return self.manifest["version"]
+
+    @property
+    def n_docs(self) -> int:
+        return int(self.manifest["n_docs"])
+
+    def __len__(self) -> int:
+        return self.n_docs
+
+    @property
+    def tokenize(self) -> Callable[[str], list[str]]:
+        return TOKENIZERS[self.manifest["tokenizer"]]
+
+    def term_ids(self, tokens: Sequence[str]) -> np.ndarray:
+        """查询词 → 词表下标（不在词表中的丢弃，重复词保留，与 BM25Okapi 逐词累加一致）。"""
+        width = self.terms.dtype.itemsize // 4
+        tokens = [t for t in tokens if len(t) <= width]
+        if not tokens or not len(self.terms):
+            return np.zeros(0, dtype=np.int64)
+        q = np.asarray(tokens, dtype=self.terms.dtype)
+        pos = np.searchsorted(self.terms, q)
+        pos[pos >= len(self.terms)] = 0
+        return pos[self.terms[pos] == q]
+
+    def scores(self, query: str) -> np.ndarray:
+        """各文档 BM25 得分：拼接查询词的倒排区间后一次 bincount 累加。"""
+        ids = self.term_ids(self.tokenize(query))
+        if not len(ids):
+            return np.zeros(self.n_docs, dtype=np.float64)
+        starts, ends = self.indptr[ids], self.indptr[ids + 1]
+        take = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)])
+        return np.bincount(self.doc_ids[take], weights=self.weights[take], minlength=self.n_docs)
+
+    def search(self, query: str, k: int = 3) -> list[tuple[int, float]]:
+        """
+        返回得分 > 0 的前 k 篇 [(文档下标, 得分)]，按得分降序、同分按文档顺序。
+        argpartition 以 O(n) 找到第 k 名的得分，只对不低于它的候选排序（保留同分文档，顺序确定）。
+        """
+        s = self.scores(query)
+        hits = np.flatnonzero(s > 0)
+        if len(hits) > k:
+            hit_scores = s[hits]
+            kth = hit_scores[np.argpartition(-hit_scores, k - 1)[k - 1]]
+            hits = hits[hit_scores >= kth]
+        hits = hits[np.lexsort((hits, -s[hits]))][:k]
+        return [(int(i), float(s[i])) for i in hits]
+
+    def document(self, i: int) -> dict[str, Any]:
+        start, end = int(self.doc_offsets[i]), int(self.doc_offsets[i + 1])
+        return json.loads(bytes(self.doc_blob[start:end]).decode("utf-8"))
+
+    def save(self, root: str | Path = DEFAULT_INDEX_PATH) -> Path:
+        """写入 root/<version>/ 并原子更新 root/CURRENT；同一版本已存在时只更新指针。"""
+        root = Path(root)
+        target = root / self.version
+        if not (target / "manifest.json").exists():
+            tmp = root / f".{self.version}.tmp{os.getpid()}"
+            tmp.mkdir(parents=True, exist_ok=True)
+            for name in _ARRAYS:
+                np.save(tmp / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+            (tmp / "docs.bin").write_bytes(bytes(self.doc_blob))
+            # manifest 最后写入：目录中有 manifest 即表示产物完整
+            (tmp / "manifest.json").write_text(json.dumps(self.manifest, ensure_ascii=False, indent=2), "utf-8")
+            os.replace(tmp, target)
+        pointer = root / f".{CURRENT_FILE}.tmp{os.getpid()}"
+        pointer.write_text(self.version, "utf-8")
+        os.replace(pointer, root / CURRENT_FILE)
+        return target
+
+
+def _content_version(docs: Sequence[dict[str, Any]], tokenizer: str, params: BM25Params) -> str:
+    h = hashlib.sha256()
+    h.update(json.dumps([FORMAT_VERSION, tokenizer, asdict(params)], sort_keys=True).encode("utf-8"))
+    for d in docs:
+        h.update(json.dumps(d, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()[:12]
+
+
+def _okapi_idf(df: np.ndarray, n_docs: int, epsilon: float) -> np.ndarray:
+    idf = np.log(n_docs - df + 0.5) - np.log(df + 0.5)
+    floor = epsilon * float(idf.mean()) if len(idf) else 0.0
+    return np.where(idf < 0, floor, idf)
+
+
+def build_bm25_index(
+    docs: Sequence[dict[str, Any]],
+    *,
+    tokenizer: str = DEFAULT_TOKENIZER,
+    params: BM25Params = BM25Params(),
+) -> BM25Index:
+    """由 [{"text", "metadata"}] 构建内存索引；save() 后即为磁盘产物。"""
+    if tokenizer not in TOKENIZERS:
+        raise ValueError(f"未知分词器: {tokenizer}，可选 {tuple(TOKENIZERS)}")
+    tokenize = TOKENIZERS[tokenizer]
+    n_docs = len(docs)
+    term_index: dict[str, int] = {}
+    token_ids: list[np.ndarray] = []
+    for d in docs:
+        toks = tokenize(d.get("text") or "")
+        token_ids.append(np.fromiter((term_index.setdefault(t, len(term_index)) for t in toks), np.int64, len(toks)))
+    doc_len = np.asarray([len(t) for t in token_ids], dtype=np.float64)
+    avgdl = float(doc_len.mean()) if n_docs and doc_len.sum() else 1.0
+
+    # 词表按字典序重排（供 searchsorted），再把 (词, 文档) 编码为一个 int64 做 np.unique：
+    # 结果按词、再按文档有序，计数即 tf，正好是 CSR 顺序
+    vocab = sorted(term_index)
+    remap = np.empty(len(vocab), dtype=np.int64)
+    remap[np.fromiter((term_index[t] for t in vocab), np.int64, len(vocab))] = np.arange(len(vocab))
+    all_ids = remap[np.concatenate(token_ids)] if len(vocab) else np.zeros(0, np.int64)
+    all_docs = np.repeat(np.arange(n_docs, dtype=np.int64), doc_len.astype(np.int64))
+    keys, tf = np.unique(all_ids * max(n_docs, 1) + all_docs, return_counts=True)
+    rows, cols = np.divmod(keys, max(n_docs, 1))
+    tf = tf.astype(np.float64)
+
+    df = np.bincount(rows, minlength=len(vocab))
+    idf = _okapi_idf(df.astype(np.float64), n_docs, params.epsilon)
+    norm = params.k1 * (1 - params.b + params.b * doc_len[cols] / avgdl)
+    weights = idf[rows] * tf * (params.k1 + 1) / (tf + norm)
+
+    blobs = [json.dumps(d, ensure_ascii=False).encode("utf-8") for d in docs]
+    manifest = {
+        "format": FORMAT_VERSION,
+        "version": _content_version(docs, tokenizer, params),
+        "tokenizer": tokenizer,
+        "params": asdict(params),
+        "n_docs": n_docs,
+        "n_terms": len(vocab),
+        "n_postings": int(len(rows)),
+    }
+    return BM25Index(
+        manifest=manifest,
+        terms=np.asarray(vocab, dtype=f"<U{max(map(len, vocab), default=1)}"),
+        indptr=np.concatenate([[0], np.cumsum(df)]).astype(np.int64),
+        doc_ids=cols.astype(np.int32),
+        weights=weights.astype(np.float32),
+        doc_offsets=np.concatenate([[0], np.cumsum([len(b) for b in blobs])]).astype(np.int64),
+        doc_blob=b"".join(blobs),
+    )
+
+
+def resolve_index_dir(root: str | Path = DEFAULT_INDEX_PATH) -> Path | None:
+    """root 下 CURRENT 指向的版本目录；也可直接传入某个版本目录。不存在时返回 None。"""
+    root = Path(root)
+    if (root / "manifest.json").exists():
+        return root
+    pointer = root / CURRENT_FILE
+    if not pointer.exists():
+        return None
+    target = root / pointer.read_text("utf-8").strip()
+    return target if (target / "manifest.json").exists() else None
+
+
+def load_bm25_index(path: str | Path = DEFAULT_INDEX_PATH, *, mmap: bool = True) -> BM25Index:
+    """加载磁盘产物；mmap=True 时数组按需分页读入，进程间共享页缓存。"""
+    target = resolve_index_dir(path)
+    if target is None:
+        raise FileNotFoundError(f"未找到 BM25 索引: {path}（先运行 python -m apps.worker.jobs.build_index）")
+    manifest = json.loads((target / "manifest.json").read_text("utf-8"))
+    if manifest.get("format") != FORMAT_VERSION:
+        raise ValueError(f"索引格式版本 {manifest.get('format')} 与当前 {FORMAT_VERSION} 不一致，请重新构建")
+    if manifest.get("tokenizer") not in TOKENIZERS:
+        raise ValueError(f"索引使用了未知分词器: {manifest.get('tokenizer')}")
+    mode = "r" if mmap else None
+    arrays = {name: np.load(target / f"{name}.npy", mmap_mode=mode) for name in _ARRAYS}
+    blob_path = target / "docs.bin"
+    if not mmap:
+        blob: Any = blob_path.read_bytes()
+    elif blob_path.stat().st_size:
+        blob = np.memmap(blob_path, dtype=np.uint8, mode="r")
+    else:
+        blob = b""
+    return BM25Index(manifest=manifest, doc_blob=blob, path=target, **arrays)
+
+
+def prune_index_versions(root: str | Path = DEFAULT_INDEX_PATH, *, keep: int = 3) -> list[Path]:
+    """删除旧版本目录，保留 CURRENT 与最近 keep 个；返回被删除的目录。"""
+    import shutil
+
+    root = Path(root)
+    current = resolve_index_dir(root)
+    versions = sorted(
+        (p for p in root.iterdir() if p.is_dir() and (p / "manifest.json").exists()),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True,
+    ) if root.exists() else []
+    removed = []
+    for p in versions[keep:]:
+        if current is not None and p.resolve() == current.resolve():
+            continue
+        shutil.rmtree(p)
+        removed.append(p)
+    return removed
+
@@ -0,0 +1,108 @@
+"""
+产品资料检索：build_quote_graph(retrieve=...) 可直接使用的 retrieve(query) -> list[str]，不依赖 langchain。
+
+- 索引优先 mmap 加载 RAG_INDEX_PATH（默认 data/rag_index）下预构建的产物（python -m apps.worker.jobs.build_index）；
+- 产物不存在时首次检索才从产品卡片 JSON 现建，分词器取 RAG_TOKENIZER（默认 zh：中文 bigram + ASCII 词 / 型号）；
+- 每条结果带 [model=... | pages=...] 头，便于回答时引用来源。
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+from packages.rag.indexing.bm25_index import (
+    DEFAULT_INDEX_PATH,
+    DEFAULT_SOURCE,
+    DEFAULT_TOKENIZER,
+    BM25Index,
+    build_bm25_index,
+    load_bm25_index,
+    load_documents,
+    resolve_index_dir,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_K = 3
+DEFAULT_QUERY = "窗户 型材 产品"
+
+
+def format_chunk(doc: dict[str, Any]) -> str:
+    meta = doc.get("metadata") or {}
+    return f"[model={meta.get('model', '')} | pages={meta.get('pages', [])}]\n{doc.get('text', '')}"
+
+
+class BM25ChunkRetriever:
+    """懒加载 BM25 索引的可调用检索器：retriever(query) -> top-k 文本块；线程安全，只加载一次。"""
+
+    def __init__(
+        self,
+        index: BM25Index | None = None,
+        *,
+        index_path: str | Path | None = None,
+        source: str | Path = DEFAULT_SOURCE,
+        k: int = DEFAULT_TOP_K,
+    ):
+        self._index = index
+        self._loaded = index is not None
+        self._lock = threading.Lock()
+        self.index_path = index_path
+        self.source = source
+        self.k = k
+
+    def _load(self) -> BM25Index | None:
+        path = self.index_path or os.environ.get("RAG_INDEX_PATH") or DEFAULT_INDEX_PATH
+        if resolve_index_dir(path) is not None:
+            return load_bm25_index(path)
+        docs = load_documents(self.source)
+        if not docs:
+            return None
+        logger.warning("未找到预构建的 BM25 索引 %s，进程内现建（建议部署前运行 python -m apps.worker.jobs.build_index）", path)
+        return build_bm25_index(docs, tokenizer=os.environ.get("RAG_TOKENIZER") or DEFAULT_TOKENIZER)
+
+    @property
+    def index(self) -> BM25Index | None:
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._index = self._load()
+                    self._loaded = True
+        return self._index
+
+    def reset(self) -> None:
+        """丢弃已加载的索引，下次检索时重新加载（发布新版本后或测试用）。"""
+        with self._lock:
+            self._index, self._loaded = None, False
+
+    def search(self, query: str, k: int | None = None) -> list[tuple[dict[str, Any], float]]:
+        """[(文档, 得分)]，得分为 0 的文档不返回。"""
+        index = self.index
+        if not index:
+            return []
+        q = (query or "").strip() or DEFAULT_QUERY
+        return [(index.document(i), score) for i, score in index.search(q, k or self.k)]
+
+    def __call__(self, query: str) -> list[str]:
+        return [format_chunk(doc) for doc, _score in self.search(query)]
+
+
+_default: BM25ChunkRetriever | None = None
+_default_lock = threading.Lock()
+
+
+def get_default_retriever() -> BM25ChunkRetriever:
+    """进程级默认检索器（只创建对象，索引在首次检索时加载）。"""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = BM25ChunkRetriever()
+    return _default
+
+
+def retrieve(query: str) -> list[str]:
+    """默认检索函数：build_quote_graph(retrieve=retrieve) 或 RAG 工具直接使用。"""
+    return get_default_retriever()(query)
@@ -0,0 +1,50 @@
+"""
+检索分词：中文按字 bigram（可选附带单字），ASCII 按词 / 型号切分并转小写。
+
+- "隔音好的推拉窗" → 隔音 音好 好的 的推 推拉 拉窗；
+- "ROW100P 断桥铝 LOW-E 1.8mm" → row100p 断桥 桥铝 low-e 1.8mm（型号、带连字符或小数点的规格整体保留）；
+- 全角字符先经 NFKC 转半角，"ＬＯＷ－Ｅ" 与 "low-e" 命中同一词。
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from dataclasses import dataclass
+
+# ASCII 词 / 型号：字母数字串，中间可带 - _ . / 连接（ROW100P、LOW-E、1.8mm、w/m2）
+_ASCII_RE = re.compile(r"[a-z0-9]+(?:[-_./][a-z0-9]+)*")
+# 中日韩统一表意文字（含扩展 A）
+_CJK_RE = re.compile(r"[㐀-䶿一-鿿]+")
+_TOKEN_RE = re.compile(f"{_ASCII_RE.pattern}|{_CJK_RE.pattern}")
+
+
+@dataclass(frozen=True)
+class Tokenizer:
+    """可配置分词器；name 写入索引 manifest，查询时按同一配置分词。"""
+
+    cjk_unigrams: bool = False  # 中文额外输出单字（召回更高、区分度更低）
+
+    @property
+    def name(self) -> str:
+        return "zh+uni" if self.cjk_unigrams else "zh"
+
+    def __call__(self, text: str) -> list[str]:
+        if not text:
+            return []
+        if not text.isascii():
+            text = unicodedata.normalize("NFKC", text)
+        text = text.lower()
+        tokens: list[str] = []
+        for m in _TOKEN_RE.finditer(text):
+            run = m.group()
+            if run[0].isascii():
+                tokens.append(run)
+                continue
+            if len(run) == 1 or self.cjk_unigrams:
+                tokens.extend(run)
+            if len(run) > 1:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        return tokens
+
+
+tokenize = Tokenizer()
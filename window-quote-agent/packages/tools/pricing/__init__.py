@@ -1,4 +1,5 @@
-"""定价工具：基于 price.json 的 calculate_price。"""
-from packages.tools.pricing.calculate_price import calculate_price
+"""定价工具：基于 price.json 的 calculate_price；price.json 编译为 PricingTable 并按文件变化热更新。"""
+from packages.tools.pricing.calculate_price import calculate_price, get_pricing_table, load_pricing_data
+from packages.tools.pricing.table import PricingTable
 
-__all__ = ["calculate_price"]
+__all__ = ["calculate_price", "get_pricing_table", "load_pricing_data", "PricingTable"]
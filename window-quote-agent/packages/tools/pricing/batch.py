@@ -0,0 +1,212 @@
+"""
+批量定价：与 calculate_price 同一套公式
+  BasePrice(model) × AreaFactor(width×height) × PanelFactor(panel_count) × TypeFactor(type)
+但按 NumPy 数组一次算完所有行：price.json 中每个型号预编译为数组（档位宽高范围、倍率、开扇系数），
+同型号的行一起做档位匹配，结果与逐行调用 calculate_price 完全一致。
+
+行格式（JSON 或 CSV 表头）：w、h（米）、opening_count（或 panel_count）、model 或 series_id，可选 location。
+"""
+from __future__ import annotations
+
+import csv
+import io
+from dataclasses import dataclass
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+
+from packages.tools.pricing.calculate_price import METER_TO_INCH, get_pricing_table
+from packages.tools.pricing.table import CompiledModel, PricingTable
+
+CSV_FIELDS = ("w", "h", "opening_count", "model", "series_id", "location")
+
+
+@dataclass(frozen=True)
+class _ModelArrays:
+    """单个型号的 NumPy 定价数组（由 PricingTable 的 CompiledModel 转换）。"""
+
+    panel_factors: np.ndarray  # 下标为开扇数，越界按 1.0
+    tier_bounds: np.ndarray  # (T, 4)：w_lo, w_hi, h_lo, h_hi（英寸），与 CompiledModel.tiers 同序
+    tier_mult: np.ndarray  # (T,)
+
+
+def _to_arrays(cm: CompiledModel) -> _ModelArrays:
+    max_panels = max(cm.panel_factors, default=0)
+    return _ModelArrays(
+        panel_factors=np.array([cm.panel_factor(n) for n in range(max_panels + 1)], dtype=np.float64),
+        tier_bounds=np.array([(t.w_lo, t.w_hi, t.h_lo, t.h_hi) for t in cm.tiers], dtype=np.float64).reshape(-1, 4),
+        tier_mult=np.array([t.multiplier for t in cm.tiers], dtype=np.float64),
+    )
+
+
+# (定价表版本, 型号 -> 数组)；price.json 热更新后版本变化，自动重建
+_arrays_cache: tuple[str, dict[str, _ModelArrays]] | None = None
+
+
+def _model_arrays(table: PricingTable) -> dict[str, _ModelArrays]:
+    global _arrays_cache
+    cached = _arrays_cache
+    if cached is None or cached[0] != table.version:
+        cached = (table.version, {mid: _to_arrays(cm) for mid, cm in table.models.items()})
+        _arrays_cache = cached
+    return cached[1]
+
+
+def resolve_model_id(raw_id: str) -> str | None:
+    """与 calculate_price 相同的解析规则：先按型号查，查不到再按系列映射；仍找不到返回 None。"""
+    cm = get_pricing_table().resolve(raw_id)
+    return cm.model if cm else None
+
+
+def price_arrays(
+    model_ids: Sequence[str | None],
+    w: np.ndarray,
+    h: np.ndarray,
+    panel_count: np.ndarray,
+    table: PricingTable | None = None,
+) -> dict[str, np.ndarray]:
+    """
+    向量化核心：model_ids 为已解析的型号（None 表示未找到），w/h 为米，panel_count 为整数开扇数。
+    返回 total、base_price、area_factor、panel_factor、type_factor 与 found（bool）数组；未找到的行各项为 0。
+    """
+    n = len(model_ids)
+    w = np.asarray(w, dtype=np.float64)
+    h = np.asarray(h, dtype=np.float64)
+    panels = np.maximum(np.asarray(panel_count, dtype=np.int64), 1)
+    out = {k: np.zeros(n, dtype=np.float64) for k in ("total", "base_price", "area_factor", "panel_factor", "type_factor")}
+    found = np.zeros(n, dtype=bool)
+
+    table = table or get_pricing_table()
+    arrays = _model_arrays(table)
+    codes = {mid: i for i, mid in enumerate(dict.fromkeys(m for m in model_ids if m))}
+    model_idx = np.fromiter((codes.get(m, -1) if m else -1 for m in model_ids), dtype=np.int64, count=n)
+
+    w_in = w * METER_TO_INCH
+    h_in = h * METER_TO_INCH
+    has_size = (w > 0) & (h > 0)
+    for mid, code in codes.items():
+        cm, arr = table.models[mid], arrays[mid]
+        rows = np.flatnonzero(model_idx == code)
+        if arr.tier_mult.size:
+            wi, hi = w_in[rows, None], h_in[rows, None]
+            b = arr.tier_bounds
+            hit = (b[:, 0] <= wi) & (wi <= b[:, 1]) & (b[:, 2] <= hi) & (hi <= b[:, 3])
+            # 与逐行实现一致：取第一个命中的档位，未命中按最小倍率
+            area = np.where(hit.any(axis=1), arr.tier_mult[hit.argmax(axis=1)], cm.min_multiplier)
+            area = np.where(has_size[rows], area, cm.min_multiplier)
+        else:
+            area = np.full(rows.size, cm.min_multiplier)
+        p = panels[rows]
+        in_table = p < arr.panel_factors.size
+        panel = np.where(in_table, arr.panel_factors[np.where(in_table, p, 0)], 1.0)
+
+        out["total"][rows] = cm.base_price * area * panel * cm.type_factor
+        out["base_price"][rows] = cm.base_price
+        out["area_factor"][rows] = area
+        out["panel_factor"][rows] = panel
+        out["type_factor"][rows] = cm.type_factor
+        found[rows] = True
+    out["found"] = found
+    return out
+
+
+def _to_float(v: Any) -> float | None:
+    try:
+        return float(v or 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_panels(v: Any) -> int | None:
+    try:
+        return int(float(v or 1))
+    except (TypeError, ValueError):
+        return None
+
+
+def calculate_price_batch(items: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    """
+    批量报价：items 为行 dict（w、h、opening_count/panel_count、model/series_id）。
+    返回 {"lines": [price_result, ...], "total": 项目总价, "count": 行数, "failed": 失败行数, "pricing_version"}，
+    lines 中每项与 calculate_price 返回结构一致（失败行带 error）。
+    """
+    items = list(items)
+    n = len(items)
+    raw_ids = [str(it.get("model") or it.get("series_id") or "").strip() for it in items]
+    w_list = [_to_float(it.get("w")) for it in items]
+    h_list = [_to_float(it.get("h")) for it in items]
+    p_list = [_to_panels(it.get("opening_count") or it.get("panel_count")) for it in items]
+    valid = [w is not None and h is not None and p is not None for w, h, p in zip(w_list, h_list, p_list)]
+
+    # 同一批次只取一次定价表，避免中途热更新导致前后版本不一致
+    table = get_pricing_table()
+    resolved = {rid: (cm.model if (cm := table.resolve(rid)) else None) for rid in set(raw_ids)}
+    model_ids = [resolved[rid] if ok else None for rid, ok in zip(raw_ids, valid)]
+    w = np.array([v or 0.0 for v in w_list], dtype=np.float64)
+    h = np.array([v or 0.0 for v in h_list], dtype=np.float64)
+    panels = np.array([v or 1 for v in p_list], dtype=np.int64)
+    arr = price_arrays(model_ids, w, h, panels, table)
+
+    totals = arr["total"].tolist()
+    areas = (w * h).tolist()
+    # 各因子取值只有少数几种（按型号/档位/开扇数），round 结果按值复用；逐行只对 total、面积、单价取整
+    factor_cache: dict[tuple[float, int], float] = {}
+
+    def _r(v: float, nd: int) -> float:
+        key = (v, nd)
+        if (out := factor_cache.get(key)) is None:
+            out = factor_cache[key] = round(v, nd)
+        return out
+
+    factors = [arr[k].tolist() for k in ("base_price", "area_factor", "panel_factor", "type_factor")]
+    lines: list[dict[str, Any]] = []
+    project_total = 0.0
+    failed = 0
+    for i in range(n):
+        if not valid[i]:
+            failed += 1
+            lines.append({"total": 0.0, "breakdown": [], "series_id": raw_ids[i], "error": "尺寸或开扇数无效", "pricing_version": table.version})
+            continue
+        if model_ids[i] is None:
+            failed += 1
+            lines.append({"total": 0.0, "breakdown": [], "series_id": raw_ids[i], "error": "未找到定价型号", "pricing_version": table.version})
+            continue
+        total, area = totals[i], areas[i]
+        total_r = round(total, 2)
+        project_total += total_r
+        lines.append({
+            "total": total_r,
+            "breakdown": [
+                {
+                    "item": "窗面积(㎡)",
+                    "qty": round(area, 4),
+                    "unit_price": round(total / area, 2) if area > 0 else 0,
+                    "amount": total_r,
+                },
+            ],
+            "series_id": raw_ids[i],
+            "model": model_ids[i],
+            "base_price": _r(factors[0][i], 2),
+            "area_factor": _r(factors[1][i], 4),
+            "panel_factor": _r(factors[2][i], 4),
+            "type_factor": _r(factors[3][i], 4),
+            "pricing_version": table.version,
+        })
+    return {
+        "lines": lines,
+        "total": round(project_total, 2),
+        "count": n,
+        "failed": failed,
+        "pricing_version": table.version,
+    }
+
+
+def parse_quote_csv(text: str) -> list[dict[str, Any]]:
+    """解析 CSV（首行为表头，列名见 CSV_FIELDS，忽略大小写与首尾空白），返回行 dict 列表。"""
+    reader = csv.DictReader(io.StringIO(text.lstrip("\ufeff")))
+    rows = []
+    for row in reader:
+        item = {(k or "").strip().lower(): (v or "").strip() for k, v in row.items() if k}
+        if any(item.values()):
+            rows.append(item)
+    return rows
@@ -0,0 +1,202 @@
+"""
+编译后的定价表：price.json 解析一次后建索引，供 calculate_price / 批量定价使用。
+
+- 型号索引：model -> CompiledModel，SERIES_ID_TO_MODEL 的系列别名一并解析为同一对象；
+- 预计算：基准价中位数、各开扇数的 PanelFactor、TypeFactor、最小面积倍率；
+- 尺寸档位：按宽度下界排序的区间数组，查找时先二分截断候选；
+- 热更新：get_pricing_table() 每次调用比对文件 mtime，变化时再比对内容哈希，仅内容变化才重新编译；
+- version：内容哈希前 12 位，写入报价结果（pricing_version），便于追溯报价所用的价目表。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+
+@dataclass(frozen=True)
+class SizeTier:
+    w_lo: float
+    w_hi: float
+    h_lo: float
+    h_hi: float
+    multiplier: float
+
+
+@dataclass(frozen=True)
+class CompiledModel:
+    """单个型号的预计算定价参数。"""
+
+    model: str
+    category: str
+    base_price: float
+    type_factor: float
+    panel_factors: dict[int, float]  # 开扇数 -> 系数，未列出的按 1.0
+    tiers: tuple[SizeTier, ...]  # 按 w_lo 排序（稳定排序，保持原始先后）
+    tier_w_lo: tuple[float, ...]  # tiers 的 w_lo，供二分
+    min_multiplier: float
+    raw: dict[str, Any] = field(repr=False, compare=False)
+
+    def panel_factor(self, panel_count: int) -> float:
+        return self.panel_factors.get(panel_count, 1.0)
+
+    def area_factor(self, w_inch: float, h_inch: float) -> float:
+        """AreaFactor：第一个同时包含宽高（英寸）的档位的倍率；未命中取最小倍率。"""
+        for t in self.tiers[: bisect_right(self.tier_w_lo, w_inch)]:
+            if w_inch <= t.w_hi and t.h_lo <= h_inch <= t.h_hi:
+                return t.multiplier
+        return self.min_multiplier
+
+
+def _midpoint(r: Any) -> float | None:
+    if isinstance(r, (list, tuple)) and len(r) >= 2:
+        return (float(r[0]) + float(r[1])) / 2.0
+    return None
+
+
+def _first_midpoint(base_range: dict[str, Any]) -> float | None:
+    for v in base_range.values():
+        if (m := _midpoint(v)) is not None:
+            return m
+    return None
+
+
+def _base_price(base_range: dict[str, Any]) -> float:
+    """BasePrice：取 1_panel 或 single_door 的中位价，否则取首个可用区间。"""
+    for key in ("1_panel", "single_door"):
+        if key in base_range and (m := _midpoint(base_range[key])) is not None:
+            return m
+    return _first_midpoint(base_range) or 0.0
+
+
+def _panel_factors(base_range: dict[str, Any]) -> dict[int, float]:
+    """PanelFactor：n_panel 中位价 / 基准中位价；2 扇缺失时用 double_door；缺失按 1.0（不写入）。"""
+    base_mid = None
+    for key in ("1_panel", "single_door"):
+        if key in base_range:
+            base_mid = _midpoint(base_range[key])
+            break
+    if base_mid is None:
+        base_mid = _first_midpoint(base_range)
+    if base_mid is None or base_mid <= 0:
+        return {}
+    factors: dict[int, float] = {}
+    for key, r in base_range.items():
+        if (m := re.match(r"^([1-9]\d*)_panel$", key)) and (mid := _midpoint(r)) is not None:
+            factors[int(m.group(1))] = mid / base_mid
+    if 2 not in factors and (mid := _midpoint(base_range.get("double_door"))) is not None:
+        factors[2] = mid / base_mid
+    return factors
+
+
+def compile_model(model: dict[str, Any], type_factors: dict[str, float], category_to_type: dict[str, str]) -> CompiledModel:
+    base_range = model.get("base_price_range") or {}
+    raw_tiers = model.get("size_tiers") or []
+    tiers = []
+    for t in raw_tiers:
+        wr = t.get("width_range") or []
+        hr = t.get("height_range") or []
+        if len(wr) >= 2 and len(hr) >= 2:
+            tiers.append(SizeTier(float(wr[0]), float(wr[1]), float(hr[0]), float(hr[1]), float(t.get("multiplier", 1.0))))
+    tiers.sort(key=lambda t: t.w_lo)
+
+    category = (model.get("category") or "").strip()
+    type_key = category_to_type.get(category)
+    type_factor = type_factors[type_key] if type_key in type_factors else min(type_factors.values())
+
+    return CompiledModel(
+        model=(model.get("model") or "").strip(),
+        category=category,
+        base_price=_base_price(base_range),
+        type_factor=type_factor,
+        panel_factors=_panel_factors(base_range),
+        tiers=tuple(tiers),
+        tier_w_lo=tuple(t.w_lo for t in tiers),
+        min_multiplier=min((float(t.get("multiplier", 1.0)) for t in raw_tiers), default=1.0),
+        raw=model,
+    )
+
+
+class PricingTable:
+    """不可变的编译结果；重新加载时整体替换，读方无需加锁。"""
+
+    def __init__(
+        self,
+        data: dict[str, Any],
+        *,
+        version: str,
+        aliases: dict[str, str],
+        type_factors: dict[str, float],
+        category_to_type: dict[str, str],
+    ):
+        self.data = data
+        self.version = version
+        self.unit = data.get("unit", "")
+        self.models: dict[str, CompiledModel] = {}
+        for m in data.get("models") or []:
+            model_id = (m.get("model") or "").strip()
+            if model_id and model_id not in self.models:  # 与线性查找一致：重复型号取第一个
+                self.models[model_id] = compile_model(m, type_factors, category_to_type)
+        # 别名只在不与真实型号重名时生效（先按型号查，查不到再按系列映射）
+        self._index: dict[str, CompiledModel] = dict(self.models)
+        for alias, model_id in aliases.items():
+            if alias not in self._index and model_id in self.models:
+                self._index[alias] = self.models[model_id]
+
+    def resolve(self, model_or_series: str) -> CompiledModel | None:
+        """按型号或系列编号查找，O(1)。"""
+        return self._index.get((model_or_series or "").strip())
+
+    def __len__(self) -> int:
+        return len(self.models)
+
+
+def _content_version(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()[:12]
+
+
+class PricingTableLoader:
+    """按路径加载 PricingTable，文件 mtime 变化且内容哈希变化时重新编译。"""
+
+    def __init__(self, path: Path, **table_kwargs: Any):
+        self.path = Path(path)
+        self._table_kwargs = table_kwargs
+        self._lock = threading.Lock()
+        self._table: PricingTable | None = None
+        self._mtime_ns: int | None = None
+
+    def _stat_mtime(self) -> int | None:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def get(self) -> PricingTable:
+        mtime = self._stat_mtime()
+        table = self._table
+        if table is not None and mtime == self._mtime_ns:
+            return table
+        with self._lock:
+            mtime = self._stat_mtime()
+            if self._table is not None and mtime == self._mtime_ns:
+                return self._table
+            raw = self.path.read_bytes() if mtime is not None else b""
+            version = _content_version(raw)
+            if self._table is None or self._table.version != version:
+                try:
+                    data = json.loads(raw.decode("utf-8")) if raw.strip() else {"models": []}
+                except ValueError:
+                    # 文件写到一半或格式错误：已有旧表时继续使用旧表，等下次 mtime 变化再试
+                    if self._table is None:
+                        raise
+                    self._mtime_ns = mtime
+                    return self._table
+                self._table = PricingTable(data, version=version, **self._table_kwargs)
+            self._mtime_ns = mtime
+            return self._table
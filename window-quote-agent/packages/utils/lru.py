@@ -0,0 +1,118 @@
+"""线程安全的 LRU + TTL 缓存：按条数与（可选）字节预算淘汰，带命中统计。"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class TTLCache(Generic[K, V]):
+    """
+    LRU 缓存：
+    - maxsize：最多条数，超出淘汰最久未使用的；
+    - ttl：秒，写入后超过 ttl 视为过期（None 表示不过期）；
+    - max_bytes + sizeof：按 sizeof(value) 估算占用，总量超出预算时从最久未使用的开始淘汰。
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        *,
+        ttl: float | None = None,
+        max_bytes: int | None = None,
+        sizeof: Callable[[V], int] | None = None,
+    ):
+        if max_bytes is not None and sizeof is None:
+            raise ValueError("max_bytes 需配合 sizeof 使用")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._data: OrderedDict[K, tuple[V, float | None, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: K, default: Any = None) -> V | Any:
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at, _ = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: K, value: V, *, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        size = self._sizeof(value) if self._sizeof is not None else 0
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, expires_at, size)
+            self._bytes += size
+            while self._data and (
+                len(self._data) > self.maxsize
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def pop(self, key: K, default: Any = None) -> V | Any:
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+            self._remove(key)
+            return item[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _remove(self, key: K) -> None:
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            item = self._data.get(key, _MISSING)  # type: ignore[call-overload]
+            return item is not _MISSING and (item[1] is None or item[1] > time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "size": len(self._data),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hit_rate, 4),
+        }
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+BM25 检索基准：合成 N 条中英混合产品资料块，测构建、落盘、mmap 加载与查询耗时；
+已安装 rank_bm25 时同时对比其逐词打分（BM25Retriever 的实现）并校验得分一致。
+
+用法（在 window-quote-agent 目录下）：
+  python scripts/bench_bm25.py                 # 默认 100k 条
+  python scripts/bench_bm25.py -n 20000 --queries 500
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root))
+
+import numpy as np
+
+from packages.rag.indexing import build_bm25_index, load_bm25_index
+from packages.rag.tokenizer import tokenize
+
+_SUBJECTS = ["推拉窗", "平开窗", "断桥铝窗", "阳台窗", "系统窗", "折叠门", "提升推拉门", "内开内倒窗"]
+_FEATURES = ["隔音", "保温", "防水", "抗风压", "气密性", "防盗", "易清洁", "低能耗", "三玻两腔", "LOW-E 玻璃"]
+_SPECS = ["Glass Thickness up to 35mm", "U-Factor 1.4", "Air Leakage 0.20 cfm", "Wall Thickness 1.8mm"]
+_QUERIES = ["隔音好的推拉窗", "断桥铝 保温", "ROW100P 参数", "LOW-E 玻璃 厚度", "阳台窗 防水 抗风压", "折叠门多少钱"]
+
+
+def _make_docs(n: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    docs = []
+    for i in range(n):
+        model = f"{rng.choice(['ROW', 'SL', 'TT', 'FD'])}{rng.randint(50, 200)}{rng.choice(['', 'P', 'S'])}"
+        parts = [model, rng.choice(_SUBJECTS)] + rng.sample(_FEATURES, 3) + rng.sample(_SPECS, 2)
+        text = "，".join(parts) + f"。适用于{rng.choice(['卧室', '客厅', '阳台', '厨房'])}，第 {i % 97} 页。"
+        docs.append({"text": text, "metadata": {"model": model, "pages": [i % 97]}})
+    return docs
+
+
+def _timeit(label: str, fn):
+    start = time.perf_counter()
+    out = fn()
+    print(f"{label:<28}{time.perf_counter() - start:8.3f}s")
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="BM25 检索基准")
+    parser.add_argument("-n", type=int, default=100_000, help="文档条数")
+    parser.add_argument("--queries", type=int, default=1000, help="查询次数")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    docs = _make_docs(args.n, args.seed)
+    index = _timeit(f"构建（{args.n:,} 条）", lambda: build_bm25_index(docs))
+    print(f"  词表 {index.manifest['n_terms']:,}，倒排 {index.manifest['n_postings']:,}")
+    with tempfile.TemporaryDirectory() as tmp:
+        target = _timeit("落盘", lambda: index.save(tmp))
+        print(f"  产物 {sum(p.stat().st_size for p in target.iterdir()) / 2**20:.1f} MB")
+        loaded = _timeit("mmap 加载", lambda: load_bm25_index(tmp))
+
+        queries = [_QUERIES[i % len(_QUERIES)] for i in range(args.queries)]
+        start = time.perf_counter()
+        for q in queries:
+            loaded.search(q, 3)
+        per_query = (time.perf_counter() - start) / len(queries)
+        print(f"{'查询（top-3）':<26}{per_query * 1000:8.3f} ms/次")
+
+        try:
+            from rank_bm25 import BM25Okapi
+        except ImportError:
+            print("未安装 rank_bm25，跳过对比")
+            return
+        ref = _timeit("rank_bm25 构建", lambda: BM25Okapi([tokenize(d["text"]) for d in docs]))
+        sample = queries[: min(20, len(queries))]
+        start = time.perf_counter()
+        for q in sample:
+            expected = ref.get_scores(tokenize(q))
+            if not np.allclose(expected, loaded.scores(q), atol=1e-3):
+                sys.exit(f"得分不一致：{q!r}")
+        ref_per_query = (time.perf_counter() - start) / len(sample)
+        print(f"{'rank_bm25 查询':<26}{ref_per_query * 1000:8.3f} ms/次（得分一致，{ref_per_query / per_query:.0f}x）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+preprocess 微基准：对比旧版逐步清洗（NFKC → 全角转半角 → 合并标点 → 逐个语气词正则）与当前实现
+（translate 表 + 合并正则 + 关键词自动机一次扫描），并校验两者在规范化与去语气词上的结果一致。
+
+用法（在 window-quote-agent 目录下）：
+  python scripts/bench_preprocess.py             # 默认 100k 条
+  python scripts/bench_preprocess.py -n 20000 --seed 1
+"""
+import argparse
+import random
+import re
+import sys
+import time
+import unicodedata
+from pathlib import Path
+
+root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root))
+
+from packages.intent.keyword_engine import KIND_FILLER
+from packages.intent.preprocess import (
+    FILLER_WORDS,
+    SYN_MAP,
+    _apply_keywords,
+    _normalize,
+    preprocess,
+    preprocess_many,
+)
+
+_SUBJECTS = ["窗户", "推拉窗", "平开窗", "断桥铝", "阳台窗", "ＬＯＷ－Ｅ玻璃", "系统窗"]
+_ASKS = ["多少钱", "怎么选", "有啥推荐", "隔音效果", "参数", "报价", "哪个好", "厂家在哪"]
+_PUNCT = ["", "？", "？？？", "！！", "。。。", "，", "~~"]
+
+
+def _legacy_preprocess(raw: str) -> str:
+    """旧实现（SYN_MAP 映射原本未生效，此处同样不做）。"""
+    t = unicodedata.normalize("NFKC", raw.strip())
+    t = "".join(" " if ord(c) == 0x3000 else chr(ord(c) - 0xFEE0) if 0xFF01 <= ord(c) <= 0xFF5E else c for c in t)
+    t = re.sub(r"([^\w\s])\1+", r"\1", t)
+    for w in sorted(FILLER_WORDS, key=len, reverse=True):
+        t = re.sub(rf"(?<!\S){re.escape(w)}(?!\S)", " ", t)
+    return re.sub(r"\s+", " ", t).strip()
+
+
+def _current_without_synonyms(raw: str) -> str:
+    return re.sub(r"\s+", " ", _apply_keywords(_normalize(raw.strip()), (KIND_FILLER,))).strip()
+
+
+def _make_prompts(n: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    fillers = sorted(FILLER_WORDS)
+    synonyms = list(SYN_MAP)
+    prompts = []
+    for _ in range(n):
+        parts = [rng.choice(fillers)] if rng.random() < 0.4 else []
+        parts.append(rng.choice(_SUBJECTS) + (rng.choice(synonyms) if rng.random() < 0.3 else ""))
+        parts.append(rng.choice(_ASKS) + rng.choice(_PUNCT))
+        if rng.random() < 0.3:
+            parts.append(rng.choice(fillers))
+        sep = rng.choice([" ", "　", "  "])
+        prompts.append(sep.join(parts) + f" {rng.randint(1, 5000)}ｍｍ")
+    return prompts
+
+
+def _timeit(label: str, fn, prompts: list[str]) -> float:
+    start = time.perf_counter()
+    fn(prompts)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<36}{elapsed:8.3f}s  {len(prompts) / elapsed:12,.0f} 条/s")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="preprocess 微基准")
+    parser.add_argument("-n", type=int, default=100_000, help="prompt 条数")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    prompts = _make_prompts(args.n, args.seed)
+    mismatches = [p for p in prompts[:5000] if _legacy_preprocess(p) != _current_without_synonyms(p)]
+    if mismatches:
+        sys.exit(f"规范化结果不一致（{len(mismatches)} 条），例如：{mismatches[0]!r}")
+
+    print(f"{args.n:,} 条 prompt，不同文本 {len(set(prompts)):,} 条")
+    legacy = _timeit("旧版逐步清洗（不含术语映射）", lambda ps: [_legacy_preprocess(p) for p in ps], prompts)
+    current = _timeit("preprocess（含术语映射）", lambda ps: [preprocess(p) for p in ps], prompts)
+    batch = _timeit("preprocess_many", preprocess_many, prompts)
+    print(f"加速比：逐条 {legacy / current:.1f}x，批量 {legacy / batch:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+批量报价 CLI：读取门窗清单（CSV 或 JSON 数组），按 /quote/batch 同一实现计算，输出每行报价与项目总价。
+
+用法（在 window-quote-agent 目录下）：
+  python scripts/bulk_quote.py schedule.csv                 # 打印汇总，明细以 JSON 写到 stdout
+  python scripts/bulk_quote.py schedule.csv -o result.csv   # 明细写为 CSV
+  python scripts/bulk_quote.py schedule.json -o result.json
+
+CSV 表头：w,h,opening_count,model,series_id,location（w/h 单位米，model 与 series_id 二选一）。
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+
+root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root))
+
+from packages.tools.pricing.batch import calculate_price_batch, parse_quote_csv
+
+OUTPUT_FIELDS = ("line", "series_id", "model", "w", "h", "opening_count", "total", "unit_price", "error")
+
+
+def _read_items(path: Path) -> list[dict]:
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() == ".json":
+        data = json.loads(text)
+        return data.get("items", []) if isinstance(data, dict) else data
+    return parse_quote_csv(text)
+
+
+def _write_csv(path: Path, items: list[dict], lines: list[dict]) -> None:
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=OUTPUT_FIELDS)
+        writer.writeheader()
+        for i, (item, line) in enumerate(zip(items, lines), start=1):
+            breakdown = line.get("breakdown") or [{}]
+            writer.writerow({
+                "line": i,
+                "series_id": line.get("series_id", ""),
+                "model": line.get("model", ""),
+                "w": item.get("w", ""),
+                "h": item.get("h", ""),
+                "opening_count": item.get("opening_count") or item.get("panel_count") or "",
+                "total": line.get("total", 0),
+                "unit_price": breakdown[0].get("unit_price", ""),
+                "error": line.get("error", ""),
+            })
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="批量报价：CSV/JSON 门窗清单 → 每行报价 + 项目总价")
+    parser.add_argument("input", type=Path, help="输入文件（.csv 或 .json）")
+    parser.add_argument("-o", "--output", type=Path, help="输出文件（.csv 或 .json），不传则 JSON 打印到 stdout")
+    args = parser.parse_args()
+
+    items = _read_items(args.input)
+    t0 = time.perf_counter()
+    result = calculate_price_batch(items)
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+
+    if args.output is None:
+        json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    elif args.output.suffix.lower() == ".csv":
+        _write_csv(args.output, items, result["lines"])
+    else:
+        args.output.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    print(
+        f"共 {result['count']} 行，失败 {result['failed']} 行，项目总价 {result['total']:,.2f}，耗时 {elapsed_ms:.1f} ms",
+        file=sys.stderr,
+    )
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+意图流水线批量评测：规则改动后对日志 prompt 全量回归，输出吞吐、来源分布，有标注时输出准确率与混淆矩阵。
+
+数据：.jsonl 每行 {"text": "...", "intent": "价格咨询"}（intent 可省略，省略时只统计吞吐与分布）；
+      其他后缀按每行一条 prompt 读取。
+
+用法（在 window-quote-agent 目录下）：
+  python scripts/eval_intent_pipeline.py eval/datasets/intent_seed.jsonl
+  python scripts/eval_intent_pipeline.py logs/prompts.jsonl --concurrency 16   # LLM 分类器并发 16
+  python scripts/eval_intent_pipeline.py logs/prompts.jsonl --stub --errors 20  # 只看规则，打印 20 条误判
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root))
+
+from packages.intent.evaluation import evaluate_intent_pipeline
+from packages.intent.uncertainty_classifier import StubUncertaintyClassifier, create_uncertainty_classifier
+
+
+def load_prompts(paths: list[Path]) -> tuple[list[str], list[str] | None]:
+    texts: list[str] = []
+    labels: list[str | None] = []
+    for path in paths:
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                if path.suffix.lower() == ".jsonl":
+                    row = json.loads(line)
+                    texts.append(row.get("text") or "")
+                    labels.append(row.get("intent"))
+                else:
+                    texts.append(line.rstrip("\n"))
+                    labels.append(None)
+    # 只有全部带标注时才计算准确率
+    return texts, (labels if labels and all(labels) else None)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="意图流水线批量评测")
+    parser.add_argument("data", nargs="+", type=Path, help=".jsonl（text/intent）或每行一条 prompt 的文本文件")
+    parser.add_argument("--stub", action="store_true", help="规则未命中时返回「其他」，不加载模型")
+    parser.add_argument("--tau", type=float, default=0.6, help="置信度阈值（默认 0.6）")
+    parser.add_argument("--concurrency", type=int, default=8, help="LLM 分类器并发数（本地模型整批向量化，不受影响）")
+    parser.add_argument("--errors", type=int, default=0, help="打印前 N 条误判")
+    args = parser.parse_args()
+
+    texts, labels = load_prompts(args.data)
+    if not texts:
+        sys.exit("没有可评测的 prompt")
+    classifier = StubUncertaintyClassifier() if args.stub else create_uncertainty_classifier()
+    print(f"分类器 {type(classifier).__name__}（{classifier.version}），并发 {args.concurrency}\n")
+
+    report = evaluate_intent_pipeline(
+        texts, labels, uncertainty_classifier=classifier, tau=args.tau, concurrency=args.concurrency
+    )
+    print(report.format())
+
+    if labels is not None and args.errors > 0:
+        print(f"\n误判（前 {args.errors} 条）：")
+        shown = 0
+        for gold, out in zip(labels, report.outputs):
+            if out["primary_intent"] != gold:
+                print(f"  [{gold} → {out['primary_intent']} / {out['source']}] {out['raw_prompt']}")
+                shown += 1
+                if shown >= args.errors:
+                    break
+
+
+if __name__ == "__main__":
+    main()
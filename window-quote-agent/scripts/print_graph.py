@@ -36,6 +36,12 @@ def main():
     parser.add_argument("--mermaid", action="store_true", help="只输出 Mermaid 图代码")
     parser.add_argument("--png", action="store_true", help="生成 PNG 图片（可指定路径，默认 agent_graph.png）")
     parser.add_argument("-o", "--output", default=None, help="PNG 输出路径（与 --png 一起用）")
+    parser.add_argument(
+        "--planner-mode",
+        choices=("split", "step_controller"),
+        default=None,
+        help="规划模式（默认读 PLANNER_MODE，未设为 split）",
+    )
     args = parser.parse_args()
 
     from packages.agent.graph import build_quote_graph
@@ -45,6 +51,7 @@ def main():
         retrieve=_mock_retrieve,
         list_series=_mock_list_series,
         calculate_price=_mock_calculate_price,
+        planner_mode=args.planner_mode,
     )
     g = graph.get_graph()
 
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+会话回放：读取 SQLite checkpointer 中某个 session 的每一步，可从任一步重新执行后续节点（之前的步骤不重跑、不再调用 LLM）。
+
+用法（在 window-quote-agent 目录下，CHECKPOINTER_URL 与服务端一致）：
+  CHECKPOINTER_URL=sqlite:///data/checkpoints.db python scripts/replay_session.py <session_id>              # 列出各步
+  CHECKPOINTER_URL=sqlite:///data/checkpoints.db python scripts/replay_session.py <session_id> --from <checkpoint_id>
+  CHECKPOINTER_URL=sqlite:///data/checkpoints.db python scripts/replay_session.py <session_id> --resume       # 继续中断的一轮
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root))
+
+from apps.api.main import _build_graph
+from packages.memory import close_checkpointer, list_checkpoints, open_checkpointer, replay_from, resume_session
+
+
+def _summary(result: dict) -> dict:
+    messages = result.get("messages") or []
+    return {
+        "step": result.get("step"),
+        "current_intent": result.get("current_intent"),
+        "last_message": messages[-1] if messages else None,
+        "thinking_steps": result.get("thinking_steps") or [],
+    }
+
+
+async def _main(args: argparse.Namespace) -> None:
+    saver = await open_checkpointer()
+    if saver is None:
+        sys.exit("CHECKPOINTER_URL=none，无可回放的 checkpoint")
+    try:
+        graph = _build_graph(saver)
+        if args.from_checkpoint:
+            result = await replay_from(graph, args.session_id, args.from_checkpoint)
+        elif args.resume:
+            result = await resume_session(graph, args.session_id)
+        else:
+            async for cp in list_checkpoints(graph, args.session_id, limit=args.limit):
+                print(f"{cp['checkpoint_id']}  step={cp['step']:>3}  {cp['source']:<6}  node={cp['node'] or '-':<24} next={cp['next']}")
+            return
+        print(json.dumps(_summary(result), ensure_ascii=False, indent=2, default=str))
+    finally:
+        await close_checkpointer(saver)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="列出 / 回放会话的 LangGraph checkpoint")
+    parser.add_argument("session_id")
+    parser.add_argument("--from", dest="from_checkpoint", default=None, help="从该 checkpoint_id 重新执行后续节点")
+    parser.add_argument("--resume", action="store_true", help="从最后一个 checkpoint 继续执行未完成的节点")
+    parser.add_argument("--limit", type=int, default=None, help="列出时最多显示的步数")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
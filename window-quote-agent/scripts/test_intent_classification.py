@@ -8,8 +8,10 @@
   PYTHONPATH=. python scripts/test_intent_classification.py --stub   # 仅 Stub，不加载模型
 
 规则未命中时的分类方式：
-  默认：OpenAI gpt-4o-mini 意图分类（需配置 OPENAI_API_KEY）。
+  默认：按 INTENT_CLASSIFIER 创建（有 data/intent_classifier.npz 时用本地模型，否则 gpt-4o-mini，需配置 OPENAI_API_KEY）。
   --stub：不加载模型，规则未命中时返回「其他」。
+
+大批量带标注数据的准确率 / 混淆矩阵见 scripts/eval_intent_pipeline.py。
 """
 import argparse
 import sys
@@ -20,9 +22,9 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from packages.intent import (
-    run_intent_pipeline,
-    GptMiniUncertaintyClassifier,
+    run_intent_pipeline_batch,
     StubUncertaintyClassifier,
+    create_uncertainty_classifier,
 )
 
 
@@ -64,21 +66,21 @@ def main() -> None:
         classifier = StubUncertaintyClassifier()
         print("使用 StubUncertaintyClassifier（规则未命中时返回「其他」）\n")
     else:
-        classifier = GptMiniUncertaintyClassifier()
-        print("使用 GptMiniUncertaintyClassifier（gpt-4o-mini）\n")
+        classifier = create_uncertainty_classifier()
+        print(f"使用 {type(classifier).__name__}（{classifier.version}）\n")
 
     prompts = [args.prompt] if args.prompt else SAMPLE_PROMPTS
 
-    for i, raw in enumerate(prompts, 1):
+    outputs = run_intent_pipeline_batch(
+        prompts,
+        uncertainty_classifier=classifier,
+        use_model_when_rules_empty=True,
+        tau=args.tau,
+    )
+    for i, (raw, out) in enumerate(zip(prompts, outputs), 1):
         print("=" * 60)
         print(f"[{i}] 用户输入: {raw!r}")
         print("-" * 60)
-        out = run_intent_pipeline(
-            raw,
-            uncertainty_classifier=classifier,
-            use_model_when_rules_empty=True,
-            tau=args.tau,
-        )
         print(f"  原始:     {out['raw_prompt']!r}")
         print(f"  清洗后:   {out['cleaned_prompt']!r}")
         print(f"  意图:     {out['intents']}")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+训练本地意图分类器（字符 n-gram 哈希 TF-IDF + softmax），输出 .npz 供 LocalUncertaintyClassifier 加载。
+
+数据：eval/datasets/*.jsonl，每行 {"text": "...", "intent": "价格咨询"}；文本先经 preprocess 清洗，与推理时一致。
+
+用法（在 window-quote-agent 目录下）：
+  python scripts/train_intent_classifier.py                              # 输出 data/intent_classifier.npz
+  python scripts/train_intent_classifier.py --data eval/datasets/intent_seed.jsonl --out /tmp/intent.npz
+  INTENT_CLASSIFIER=local python scripts/test_intent_classification.py  # 用本地模型跑流水线
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root))
+
+import numpy as np
+
+from packages.intent.local_classifier import DEFAULT_MODEL_PATH, DEFAULT_N_FEATURES, train_local_model
+from packages.intent.preprocess import preprocess_many
+from packages.intent.schemas import INTENTS
+
+
+def load_dataset(paths: list[Path]) -> tuple[list[str], list[str]]:
+    texts, labels = [], []
+    for path in paths:
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                if row.get("intent") not in INTENTS:
+                    raise ValueError(f"{path}: 未知意图 {row.get('intent')!r}")
+                texts.append(row["text"])
+                labels.append(row["intent"])
+    return texts, labels
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="训练本地意图分类器")
+    parser.add_argument("--data", nargs="*", type=Path, help="jsonl 数据文件（默认 eval/datasets/*.jsonl）")
+    parser.add_argument("--out", type=Path, default=root / DEFAULT_MODEL_PATH)
+    parser.add_argument("--n-features", type=int, default=DEFAULT_N_FEATURES)
+    parser.add_argument("--epochs", type=int, default=300)
+    parser.add_argument("--l2", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    paths = args.data or sorted((root / "eval" / "datasets").glob("*.jsonl"))
+    if not paths:
+        sys.exit("未找到训练数据（eval/datasets/*.jsonl）")
+    raw, labels = load_dataset(paths)
+    texts = [p["cleaned_prompt"] for p in preprocess_many(raw)]
+
+    start = time.perf_counter()
+    model = train_local_model(
+        texts, labels, label_order=INTENTS, n_features=args.n_features, epochs=args.epochs, l2=args.l2
+    )
+    print(f"训练 {len(texts)} 条，用时 {time.perf_counter() - start:.1f}s，温度 {model.temperature:.2f}")
+
+    probs = np.stack([model.predict_proba(t) for t in texts])
+    pred = probs.argmax(axis=1)
+    gold = np.asarray([model.labels.index(l) for l in labels])
+    print(f"训练集准确率 {float((pred == gold).mean()):.3f}，平均置信度 {float(probs.max(axis=1).mean()):.3f}")
+
+    start = time.perf_counter()
+    for t in texts:
+        model.predict_proba(t)
+    print(f"单条预测 {(time.perf_counter() - start) / len(texts) * 1000:.3f} ms")
+
+    path = model.save(args.out)
+    print(f"已保存 {path}（{path.stat().st_size / 1024:.0f} KB，版本 {model.version}）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""chat 工具循环：同一回复内的 tool_calls 并发执行，相同 (工具名, 参数) 本轮只执行一次，并记录各工具耗时。"""
+import asyncio
+import threading
+import time
+
+from packages.agent.nodes.chat_node import _arun_tool_calls, _run_tool_calls, _tool_map
+from packages.observability.metrics import metrics
+
+
+class _SlowTool:
+    def __init__(self, name, delay=0.2):
+        self.name = name
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, args):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return f"{self.name}:{args.get('query')}"
+
+    async def ainvoke(self, args):
+        with self._lock:
+            self.calls += 1
+        await asyncio.sleep(self.delay)
+        return f"{self.name}:{args.get('query')}"
+
+
+def _tc(name, query, tid):
+    return {"name": name, "args": {"query": query}, "id": tid}
+
+
+def test_tool_calls_run_concurrently_and_dedup():
+    a, b = _SlowTool("search_a"), _SlowTool("search_b")
+    tools = _tool_map([a, b])
+    memo = {}
+    calls = [_tc("search_a", "x", "1"), _tc("search_b", "y", "2"), _tc("search_a", "x", "3")]
+    start = time.perf_counter()
+    out = _run_tool_calls({}, tools, calls, memo)
+    # 两个不同调用并发，耗时约等于单个调用
+    assert time.perf_counter() - start < 0.35
+    assert [tid for _n, _a, tid, _k in out] == ["1", "2", "3"]
+    assert a.calls == 1 and b.calls == 1
+    # 下一轮重复同一调用：直接取 memo
+    _run_tool_calls({}, tools, [_tc("search_b", "y", "4")], memo)
+    assert b.calls == 1
+    assert memo[out[2][3]] == "search_a:x"
+
+
+def test_async_tool_calls_and_latency_metric():
+    a, b = _SlowTool("search_a"), _SlowTool("search_b")
+    tools = _tool_map([a, b])
+    memo = {}
+    before = metrics.snapshot()["summaries"].get("chat_tool_latency_seconds{tool=search_b}", {}).get("count", 0)
+    start = time.perf_counter()
+    asyncio.run(_arun_tool_calls({}, tools, [_tc("search_a", "x", "1"), _tc("search_b", "y", "2")], memo))
+    assert time.perf_counter() - start < 0.35
+    assert sorted(memo.values()) == ["search_a:x", "search_b:y"]
+    after = metrics.snapshot()["summaries"]["chat_tool_latency_seconds{tool=search_b}"]["count"]
+    assert after == before + 1
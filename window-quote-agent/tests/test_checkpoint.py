@@ -0,0 +1,123 @@
+"""LangGraph checkpointer：session_id 作为 thread_id，轮次间自动恢复状态，可从任一步回放。"""
+import asyncio
+
+import pytest
+
+from packages.agent.state import ReplaceList
+from packages.memory.checkpoint import (
+    CheckpointRetention,
+    create_checkpoint_retention,
+    list_checkpoints,
+    open_checkpointer,
+    replay_from,
+    thread_config,
+)
+
+
+def test_thread_config():
+    assert thread_config("s1") == {"configurable": {"thread_id": "s1"}}
+    assert thread_config("s1", "cp", foo=1)["configurable"] == {"thread_id": "s1", "checkpoint_id": "cp", "foo": 1}
+
+
+def test_open_checkpointer_none_and_invalid(monkeypatch):
+    assert asyncio.run(open_checkpointer("none")) is None
+    # 默认不启用，沿用带 TTL / LRU 预算的 session store
+    monkeypatch.delenv("CHECKPOINTER_URL", raising=False)
+    assert asyncio.run(open_checkpointer()) is None
+    assert create_checkpoint_retention(None) is None
+    with pytest.raises(ValueError):
+        asyncio.run(open_checkpointer("postgres://x"))
+
+
+def _graph(checkpointer, calls):
+    from packages.agent.graph import build_quote_graph
+
+    def chat(messages):
+        calls.append(len(messages))
+        return "好的"
+
+    return build_quote_graph(
+        chat_completion=chat,
+        retrieve=lambda q: [],
+        list_series=lambda: [{"id": "65", "name": "65系列"}],
+        calculate_price=lambda r, s: {"total": 0, "breakdown": [], "series_id": ""},
+        run_intent_pipeline=lambda _raw: {"primary_intent": "其他", "intents": ["其他"]},
+        checkpointer=checkpointer,
+    )
+
+
+def test_turns_resume_from_checkpointer_and_replay():
+    pytest.importorskip("langgraph")
+    calls: list[int] = []
+
+    async def run():
+        saver = await open_checkpointer("memory://")
+        graph = _graph(saver, calls)
+        cfg = thread_config("s1")
+        await graph.ainvoke({"messages": [{"role": "user", "content": "你好"}], "max_step": 4}, cfg)
+        second = await graph.ainvoke(
+            {"messages": [{"role": "user", "content": "在吗"}], "thinking_steps": ReplaceList()}, cfg
+        )
+        history = [cp async for cp in list_checkpoints(graph, "s1")]
+        return graph, second, history
+
+    graph, second, history = asyncio.run(run())
+    # 第二轮只传新消息，上一轮的消息由 checkpointer 恢复
+    assert [m["content"] for m in second["messages"] if m["role"] == "user"] == ["你好", "在吗"]
+    assert second["thinking_steps"] and "识别用户意图：其他" == second["thinking_steps"][0]
+    assert len(history) > 4
+
+    # 从第二轮 chat 之前的 checkpoint 回放：只重跑其后的节点
+    before_chat = next(cp for cp in history if cp["next"] == ["chat"])
+    n_calls = len(calls)
+    replayed = asyncio.run(replay_from(graph, "s1", before_chat["checkpoint_id"]))
+    assert len(calls) >= n_calls + 1
+    assert replayed["messages"][-1]["content"] == "好的"
+
+
+def test_retention_keeps_recent_checkpoints_and_state():
+    pytest.importorskip("langgraph")
+    calls: list[int] = []
+
+    async def run():
+        saver = await open_checkpointer("memory://")
+        graph = _graph(saver, calls)
+        retention = CheckpointRetention(saver, keep_per_thread=3)
+        cfg = thread_config("s1")
+        await graph.ainvoke({"messages": [{"role": "user", "content": "你好"}], "max_step": 4}, cfg)
+        removed = await retention.after_turn("s1")
+        history = [cp async for cp in list_checkpoints(graph, "s1")]
+        write_ids = {k[2] for k in saver.writes if k[0] == "s1"}
+        second = await graph.ainvoke(
+            {"messages": [{"role": "user", "content": "在吗"}], "thinking_steps": ReplaceList()}, cfg
+        )
+        return removed, history, write_ids, second
+
+    removed, history, write_ids, second = asyncio.run(run())
+    assert removed > 0 and len(history) == 3
+    assert write_ids <= {cp["checkpoint_id"] for cp in history}
+    # 只回收已删除 checkpoint 的数据，最新状态完整，下一轮照常恢复
+    assert [m["content"] for m in second["messages"] if m["role"] == "user"] == ["你好", "在吗"]
+
+
+def test_retention_evicts_threads_over_budget_and_idle(monkeypatch):
+    pytest.importorskip("langgraph")
+
+    async def run():
+        saver = await open_checkpointer("memory://")
+        graph = _graph(saver, [])
+        retention = CheckpointRetention(saver, keep_per_thread=None, max_threads=2, ttl_seconds=None)
+        for sid in ("a", "b", "c"):
+            await graph.ainvoke({"messages": [{"role": "user", "content": "你好"}], "max_step": 4}, thread_config(sid))
+        await retention.after_turn("a")
+        await retention.after_turn("b")
+        # 超出 2 个会话：最久未活跃的 a 正在执行，先跳过，删除 b
+        await retention.after_turn("c", is_active=lambda tid: tid == "a")
+        kept = set(saver.storage)
+        retention.ttl_seconds = 0
+        await retention.after_turn("c")
+        return kept, set(saver.storage), len(retention)
+
+    kept, after_idle, remaining = asyncio.run(run())
+    assert kept == {"a", "c"}
+    assert after_idle == {"c"} and remaining == 1
@@ -1,8 +1,12 @@
 """Task 4.3：需求采集节点测试。"""
+import asyncio
+
 import pytest
 
 from packages.agent.nodes.collect_requirements import (
+    acollect_requirements,
     collect_requirements,
+    create_async_collect_requirements_node,
     create_collect_requirements_node,
 )
 from packages.agent.state import AgentState
@@ -39,3 +43,21 @@ def test_create_collect_requirements_node():
     out = node(state)
     assert out["requirements"].get("h") == 2.0
     assert out["requirements"].get("w") == 3.0
+
+
+def test_acollect_requirements_matches_sync():
+    async def mock(_messages):
+        return '{"w": 3.0, "h": 2.0}'
+
+    state: AgentState = {"messages": [{"role": "user", "content": "我家窗户高2米宽3米"}]}
+    out = asyncio.run(acollect_requirements(state, mock))
+    assert out == collect_requirements(state, _mock_chat_h2w3)
+
+
+def test_create_async_collect_requirements_node():
+    async def mock(_messages):
+        return '{"h": 1.5}'
+
+    node = create_async_collect_requirements_node(mock)
+    out = asyncio.run(node({"messages": [{"role": "user", "content": "高1.5米"}], "requirements": {"w": 2.0}}))
+    assert out["requirements"] == {"w": 2.0, "h": 1.5}
@@ -0,0 +1,96 @@
+"""多意图并行：router 给出可并行子任务，branch 执行各节点，join 按顺序合并输出。"""
+import asyncio
+import json
+
+import pytest
+
+from packages.agent.nodes.fan_out import create_async_branch_node, create_branch_node, join_branches
+from packages.agent.nodes.router import router_planner
+from packages.agent.state import ReplaceList
+
+
+class _FakeLLM:
+    def __init__(self, payload):
+        self.content = json.dumps(payload, ensure_ascii=False)
+
+    def invoke(self, _messages):
+        return self
+
+
+class _FakeNode:
+    def __init__(self, name):
+        self.name = name
+
+    def invoke(self, state, config=None):
+        return {
+            "step": self.name,
+            "step_count": (state.get("step_count") or 0) + 1,
+            "messages": [{"role": "assistant", "content": self.name}],
+            "thinking_steps": [f"{self.name} done"],
+            f"{self.name}_out": True,
+        }
+
+    async def ainvoke(self, state, config=None):
+        return self.invoke(state, config)
+
+
+def _plan(state, plan_tasks):
+    pytest.importorskip("langchain_core")
+    llm = _FakeLLM({"next_node": "chat", "task_split": True, "plan_tasks": plan_tasks})
+    return router_planner({"messages": [], **state}, llm=llm)
+
+
+def test_router_parallel_nodes_after_intent():
+    out = _plan(
+        {"step": "intent"},
+        [{"node": "chat", "description": "公司介绍"}, {"node": "collect_recommend_params", "description": "推荐"}],
+    )
+    assert out["parallel_nodes"] == ["chat", "collect_recommend_params"]
+    assert "并行执行子任务" in out["thinking_steps"][-1]
+
+
+def test_router_keeps_dependent_nodes_serial():
+    # recommend 依赖前一步输出，不并行；只剩一个可并行节点时按 next_node 单节点执行
+    assert _plan({"step": "intent"}, [{"node": "chat"}, {"node": "recommend"}])["parallel_nodes"] == []
+    # 业务节点之后的规划不再扇出
+    assert _plan({"step": "chat"}, [{"node": "chat"}, {"node": "collect_requirements"}])["parallel_nodes"] == []
+
+
+def test_router_falls_back_to_intent_tasks(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    state = {
+        "step": "intent",
+        "messages": [],
+        "current_intent": "公司介绍",
+        "intent_tasks": [{"intent": "公司介绍"}, {"intent": "价格咨询"}],
+    }
+    out = router_planner(state)
+    assert out["parallel_nodes"] == ["chat", "collect_requirements"]
+    assert out["task_split"] is True
+
+
+def test_branch_nodes_wrap_update():
+    nodes = {"chat": _FakeNode("chat")}
+    payload = {"step_count": 2, "branch_node": "chat"}
+    out = create_branch_node(nodes)(payload)
+    assert out["branch_updates"][0]["node"] == "chat"
+    assert out["branch_updates"][0]["update"]["chat_out"] is True
+    aout = asyncio.run(create_async_branch_node(nodes)(payload))
+    assert aout == out
+
+
+def test_join_merges_in_plan_order():
+    nodes = {n: _FakeNode(n) for n in ("chat", "collect_requirements")}
+    state = {"step_count": 2, "parallel_nodes": ["chat", "collect_requirements"], "thinking_steps": []}
+    # 分支完成顺序与规划顺序不同
+    updates = [
+        create_branch_node(nodes)({**state, "branch_node": n})["branch_updates"][0]
+        for n in ("collect_requirements", "chat")
+    ]
+    out = join_branches({**state, "branch_updates": updates})
+    assert out["messages"] == [{"role": "assistant", "content": "chat\n\ncollect_requirements"}]
+    assert out["step"] == "collect_requirements"
+    assert out["step_count"] == 4
+    assert out["chat_out"] and out["collect_requirements_out"]
+    assert out["thinking_steps"][:2] == ["chat done", "collect_requirements done"]
+    assert isinstance(out["branch_updates"], ReplaceList) and out["parallel_nodes"] == []
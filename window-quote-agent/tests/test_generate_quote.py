@@ -30,3 +30,11 @@ def test_generate_quote_empty_price_result():
     out = generate_quote(state)
     assert "总价" in out["quote_md"]
     assert "明细表格" in out["quote_md"]
+
+
+def test_render_quote_md_matches_node_output():
+    from packages.agent.nodes.generate_quote import render_quote_md
+
+    price_result = {"total": 1200, "breakdown": [{"item": "窗面积(㎡)", "qty": 2, "unit_price": 600, "amount": 1200}]}
+    out = generate_quote({"price_result": price_result})
+    assert render_quote_md(price_result) == out["quote_md"]
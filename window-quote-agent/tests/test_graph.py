@@ -1,4 +1,6 @@
 """Task 4.7：LangGraph 图拓扑验证。"""
+import asyncio
+
 import pytest
 
 from packages.agent.graph import build_quote_graph, get_graph_topology
@@ -20,6 +22,25 @@ def _mock_calculate_price(_req, _sel):
     return {"total": 0, "breakdown": [], "series_id": ""}
 
 
+class _StubLLM:
+    def __init__(self, content: str):
+        self.content = content
+
+    def invoke(self, _messages):
+        return type("Resp", (), {"content": self.content, "tool_calls": []})()
+
+
+class _StubPlanner(_StubLLM):
+    """router / check / step_controller 共用的规划 LLM：先走 chat，chat 之后结束本轮；chat 绑定工具后直接回复。"""
+
+    def __init__(self, reply: str = "我们是专业门窗公司"):
+        super().__init__('{"next_node": "chat", "should_end": true}')
+        self.reply = reply
+
+    def bind_tools(self, _tools):
+        return _StubLLM(self.reply)
+
+
 def test_build_quote_graph_compiles():
     graph = build_quote_graph(
         chat_completion=_mock_chat,
@@ -50,10 +71,25 @@ def test_graph_topology_contains_expected_nodes():
         "recommend",
         "price_quote",
         "generate_quote",
+        "branch",
+        "join",
     }
     assert expected.issubset(set(nodes)), f"Expected nodes {expected}, got {nodes}"
 
 
+def test_step_controller_mode_replaces_check():
+    graph = build_quote_graph(
+        chat_completion=_mock_chat,
+        retrieve=_mock_retrieve,
+        list_series=_mock_list_series,
+        calculate_price=_mock_calculate_price,
+        planner_mode="step_controller",
+    )
+    nodes = set(get_graph_topology(graph).get("nodes", []))
+    assert "step_controller" in nodes
+    assert "check" not in nodes
+
+
 def test_graph_invoke_quote_flow():
     """端到端：current_intent=价格咨询 时走完报价链路，state 含 quote_md。"""
     def mock_chat(messages):
@@ -85,3 +121,126 @@ def test_graph_invoke_quote_flow():
     assert "quote_md" in result
     assert "总价" in result["quote_md"]
     assert "明细表格" in result["quote_md"]
+
+
+def test_graph_ainvoke_quote_flow():
+    """异步端到端：graph.ainvoke 走 async 节点，结果与同步一致含 quote_md。"""
+    async def amock_chat(messages):
+        content = (messages or [{}])[0].get("content", "") if messages else ""
+        if "需求" in content or "提取" in content:
+            return '{"w": 3.0, "h": 2.0}'
+        if "推荐" in content or "系列" in content:
+            return '{"series_id": "65"}'
+        return "好的"
+
+    graph = build_quote_graph(
+        achat_completion=amock_chat,
+        chat_completion=_mock_chat,
+        retrieve=lambda q: ["断桥铝 65 系列适合家用"],
+        list_series=lambda: [{"id": "65", "name": "65系列"}],
+        calculate_price=lambda r, s: {
+            "total": r.get("w", 0) * r.get("h", 0) * 500,
+            "breakdown": [],
+            "series_id": s.get("series_id", ""),
+        },
+        run_intent_pipeline=lambda _raw: {"primary_intent": "价格咨询", "intents": ["价格咨询"]},
+    )
+    result = asyncio.run(graph.ainvoke({"messages": [{"role": "user", "content": "我想装窗户，高2米宽3米"}]}))
+    assert "总价" in result["quote_md"]
+    assert result["price_result"]["total"] == 3000.0
+
+
+def test_graph_astream_emits_thinking_steps_and_tokens():
+    """astream：每步可见 thinking_steps，chat 节点回复通过 config 中的 token 回调推送。"""
+    from packages.agent.streaming import REPLY_START_CALLBACK_KEY, TOKEN_CALLBACK_KEY
+
+    graph = build_quote_graph(
+        chat_completion=_mock_chat,
+        retrieve=_mock_retrieve,
+        list_series=_mock_list_series,
+        calculate_price=_mock_calculate_price,
+        run_intent_pipeline=lambda _raw: {"primary_intent": "其他", "intents": ["其他"]},
+        router_llm=_StubPlanner(reply="你好，请问"),
+    )
+    events: list[str | None] = []
+    config = {"configurable": {TOKEN_CALLBACK_KEY: events.append, REPLY_START_CALLBACK_KEY: lambda: events.append(None)}}
+
+    async def collect():
+        seen = []
+        async for state in graph.astream(
+            {"messages": [{"role": "user", "content": "你好"}]}, config, stream_mode="values"
+        ):
+            seen.append(list(state.get("thinking_steps") or []))
+        return seen
+
+    snapshots = asyncio.run(collect())
+    assert events == [None, "你好，请问"]
+    assert len(snapshots) > 2
+    assert any("识别用户意图" in s for s in snapshots[-1])
+
+
+def test_graph_astream_marks_each_reply_start():
+    """无 planner 时 chat 会执行多次：每条回复前有一次 reply_start，最后一次之后的 token 即最终回复。"""
+    from packages.agent.streaming import REPLY_START_CALLBACK_KEY, TOKEN_CALLBACK_KEY
+
+    async def amock_chat(messages, on_token=None):
+        for piece in ("你好", "，", "请问"):
+            if on_token:
+                on_token(piece)
+        return "你好，请问"
+
+    graph = build_quote_graph(
+        achat_completion=amock_chat,
+        chat_completion=_mock_chat,
+        retrieve=_mock_retrieve,
+        list_series=_mock_list_series,
+        calculate_price=_mock_calculate_price,
+        run_intent_pipeline=lambda _raw: {"primary_intent": "其他", "intents": ["其他"]},
+    )
+    events: list[str | None] = []
+    config = {"configurable": {TOKEN_CALLBACK_KEY: events.append, REPLY_START_CALLBACK_KEY: lambda: events.append(None)}}
+    result = asyncio.run(graph.ainvoke({"messages": [{"role": "user", "content": "你好"}]}, config))
+
+    replies = [m for m in result["messages"] if m["role"] == "assistant"]
+    assert events.count(None) == len(replies) >= 1
+    last = len(events) - events[::-1].index(None)
+    assert "".join(events[last:]) == replies[-1]["content"]
+
+
+@pytest.mark.parametrize("planner_mode", ["split", "step_controller"])
+def test_graph_thinking_steps_not_duplicated(planner_mode):
+    """条件边不会把节点写入再追加一次：每个思考步骤只出现一次。"""
+    graph = build_quote_graph(
+        chat_completion=_mock_chat,
+        retrieve=_mock_retrieve,
+        list_series=_mock_list_series,
+        calculate_price=_mock_calculate_price,
+        run_intent_pipeline=lambda _raw: {"primary_intent": "公司介绍", "intents": ["公司介绍"]},
+        router_llm=_StubPlanner(),
+        planner_mode=planner_mode,
+    )
+    result = graph.invoke({"messages": [{"role": "user", "content": "介绍下公司"}]})
+    steps = result["thinking_steps"]
+    assert steps and len(steps) == len(set(steps)), steps
+    assert [m["role"] for m in result["messages"]] == ["user", "assistant"]
+
+
+def test_graph_fan_out_returns_single_merged_reply():
+    """多意图扇出：各分支回复合并为本轮唯一一条 assistant 消息。"""
+    graph = build_quote_graph(
+        chat_completion=_mock_chat,
+        retrieve=_mock_retrieve,
+        list_series=_mock_list_series,
+        calculate_price=_mock_calculate_price,
+        run_intent_pipeline=lambda _raw: {
+            "primary_intent": "公司介绍",
+            "intents": ["公司介绍", "价格咨询"],
+            "tasks": [{"intent": "公司介绍"}, {"intent": "价格咨询"}],
+        },
+        router_llm=_StubPlanner(),
+    )
+    result = graph.invoke({"messages": [{"role": "user", "content": "你们公司怎么样，报价多少"}]})
+    assert any(s.startswith("合并并行子任务") for s in result["thinking_steps"])
+    assert [m["role"] for m in result["messages"]] == ["user", "assistant"]
+    reply = result["messages"][-1]["content"]
+    assert reply.startswith("我们是专业门窗公司") and len(reply) > len("我们是专业门窗公司")
@@ -0,0 +1,99 @@
+"""意图流水线结果缓存：按 cleaned_prompt + 分类器版本命中，默认分类器进程内只创建一次。"""
+import pytest
+
+from packages.intent import pipeline
+from packages.intent import uncertainty_classifier as uc
+from packages.intent.pipeline import clear_intent_cache, intent_cache_stats, run_intent_pipeline
+from packages.intent.uncertainty_classifier import UncertaintyClassifier
+from packages.observability.metrics import metrics
+
+
+class _CountingClassifier(UncertaintyClassifier):
+    def __init__(self, version="counting:1", intent="公司介绍"):
+        self.version = version
+        self.intent = intent
+        self.calls = 0
+
+    def predict(self, text):
+        self.calls += 1
+        return {"intents": [self.intent], "confidence": 0.9}
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache(monkeypatch):
+    monkeypatch.delenv("INTENT_CACHE_SIZE", raising=False)
+    monkeypatch.delenv("INTENT_CACHE_TTL_SECONDS", raising=False)
+    clear_intent_cache()
+    metrics.reset()
+    yield
+    clear_intent_cache()
+    uc.reset_uncertainty_classifier()
+
+
+def test_repeated_prompt_hits_cache():
+    clf = _CountingClassifier()
+    first = run_intent_pipeline("晚安", uncertainty_classifier=clf)
+    # 清洗后相同的消息共用一条缓存，raw_prompt 仍为本次原文
+    second = run_intent_pipeline("  晚安 ", uncertainty_classifier=clf)
+    assert clf.calls == 1
+    assert second["raw_prompt"] == "  晚安 "
+    assert {k: v for k, v in second.items() if k != "raw_prompt"} == {
+        k: v for k, v in first.items() if k != "raw_prompt"
+    }
+    stats = intent_cache_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["hit_rate"] == 0.5
+    assert metrics.counter("intent_pipeline_cache_total", result="hit") == 1
+
+
+def test_cache_hit_does_not_touch_model():
+    """命中时只读一次 version，不预测、不访问模型参数。"""
+    from packages.intent.local_classifier import LocalUncertaintyClassifier, train_local_model
+
+    clf = LocalUncertaintyClassifier(train_local_model(["晚安", "多少钱一平"], ["其他", "价格咨询"], epochs=5))
+    first = run_intent_pipeline("晚安", uncertainty_classifier=clf)
+    clf.model = None  # 命中路径若访问模型会抛 AttributeError
+    assert run_intent_pipeline("晚安", uncertainty_classifier=clf) == first
+
+
+def test_cached_output_is_not_shared_with_callers():
+    clf = _CountingClassifier()
+    run_intent_pipeline("晚安", uncertainty_classifier=clf)["tasks"].append({"intent": "其他", "description": "x"})
+    assert len(run_intent_pipeline("晚安", uncertainty_classifier=clf)["tasks"]) == 1
+
+
+def test_classifier_version_is_part_of_key():
+    run_intent_pipeline("晚安", uncertainty_classifier=_CountingClassifier("counting:1", "公司介绍"))
+    out = run_intent_pipeline("晚安", uncertainty_classifier=_CountingClassifier("counting:2", "产品咨询"))
+    assert out["primary_intent"] == "产品咨询"
+
+
+def test_unversioned_classifier_bypasses_cache():
+    clf = _CountingClassifier(version=UncertaintyClassifier.version)
+    run_intent_pipeline("晚安", uncertainty_classifier=clf)
+    run_intent_pipeline("晚安", uncertainty_classifier=clf)
+    assert clf.calls == 2
+
+
+def test_cache_disabled(monkeypatch):
+    monkeypatch.setenv("INTENT_CACHE_SIZE", "0")
+    clf = _CountingClassifier()
+    run_intent_pipeline("晚安", uncertainty_classifier=clf)
+    run_intent_pipeline("晚安", uncertainty_classifier=clf)
+    assert clf.calls == 2
+    assert intent_cache_stats() == {"enabled": False}
+
+
+def test_default_classifier_is_singleton(monkeypatch):
+    created = []
+
+    def factory(kind=None):
+        created.append(kind)
+        return _CountingClassifier()
+
+    monkeypatch.setattr(uc, "create_uncertainty_classifier", factory)
+    uc.reset_uncertainty_classifier()
+    for text in ("晚安", "早上好", "晚安"):
+        run_intent_pipeline(text)
+    assert len(created) == 1
+    assert uc.get_uncertainty_classifier() is uc.get_uncertainty_classifier()
+    assert pipeline.get_intent_cache().stats()["hits"] == 1
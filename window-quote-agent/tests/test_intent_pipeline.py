@@ -1,14 +1,15 @@
 """Prompt 清洗 + 多意图识别流水线单测：各步骤可单测、可回放。"""
 import pytest
 
-from packages.intent.preprocess import preprocess
+from packages.intent.preprocess import preprocess, preprocess_many
 from packages.intent.rule_intents import rule_based_intent_tagging
 from packages.intent.uncertainty_classifier import (
     UncertaintyClassifier,
     StubUncertaintyClassifier,
     GptMiniUncertaintyClassifier,
 )
-from packages.intent.pipeline import run_intent_pipeline
+from packages.intent.evaluation import evaluate_intent_pipeline
+from packages.intent.pipeline import run_intent_pipeline, run_intent_pipeline_batch
 from packages.intent.schemas import (
     INTENT_PRIORITY,
 )
@@ -38,6 +39,16 @@ def test_preprocess_remove_filler():
     assert out["cleaned_prompt"].strip() != "" or "报价" in out["cleaned_prompt"]
 
 
+def test_preprocess_width_and_punctuation_single_pass():
+    out = preprocess("　ＬＯＷ－Ｅ玻璃　　多少钱？？？！！")
+    assert out["cleaned_prompt"] == "LOW-E玻璃 多少钱?!"
+
+
+def test_preprocess_many_matches_preprocess():
+    prompts = ["那个 窗户 漏风 啊", "你好。。。", "", "那个 窗户 漏风 啊", "３米宽"]
+    assert preprocess_many(prompts) == [preprocess(p) for p in prompts]
+
+
 # --- Step 2: Rule-based ---
 def test_rule_intents_single():
     out = rule_based_intent_tagging("多少钱一平")
@@ -103,6 +114,39 @@ def test_pipeline_structured_output_keys():
         assert k in out, f"missing key: {k}"
 
 
+# --- Batch ---
+class _CountingClassifier(UncertaintyClassifier):
+    version = "counting"
+
+    def __init__(self):
+        self.seen = []
+
+    def predict(self, text):
+        self.seen.append(text)
+        return {"intents": ["公司介绍"], "confidence": 0.9}
+
+
+def test_pipeline_batch_matches_single_and_sends_only_misses():
+    prompts = ["我想报价，多少钱", "晚安", "  晚安 ", "推荐一款，顺便报个价", "早上好"]
+    clf = _CountingClassifier()
+    batch = run_intent_pipeline_batch(prompts, uncertainty_classifier=clf, concurrency=4)
+    # 规则未命中且去重后只有「晚安」「早上好」两条交给分类器
+    assert sorted(clf.seen) == ["早上好", "晚安"]
+    assert batch == [run_intent_pipeline(p, uncertainty_classifier=_CountingClassifier()) for p in prompts]
+
+
+def test_evaluate_reports_accuracy_and_confusion():
+    report = evaluate_intent_pipeline(
+        ["多少钱一平", "晚安", "推荐一款"],
+        ["价格咨询", "其他", "产品咨询"],
+        uncertainty_classifier=StubUncertaintyClassifier(),
+    )
+    assert report.n == 3 and report.model_calls == 1
+    assert report.accuracy == pytest.approx(2 / 3)
+    assert report.confusion["产品咨询"]["产品推荐"] == 1
+    assert report.per_intent()["价格咨询"]["recall"] == 1.0
+    assert "准确率" in report.format()
+
 
 if __name__ == "__main__":
     print("GPT Intent Classifier ready.")
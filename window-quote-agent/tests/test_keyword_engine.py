@@ -0,0 +1,52 @@
+"""关键词自动机：意图命中与位置、同义词改写、语气词删除，一次扫描完成。"""
+import random
+
+from packages.intent.keyword_engine import KeywordEngine, get_keyword_engine
+from packages.intent.preprocess import map as syn_map
+from packages.intent.preprocess import preprocess
+from packages.intent.intent_check import keyword_switch
+
+
+def test_intent_hits_with_spans():
+    scan = get_keyword_engine().scan("这款怎么样，报价多少钱")
+    assert {(m.start, m.end, m.keyword) for m in scan.intent_hits["产品咨询"]} == {(0, 2, "这款"), (0, 5, "这款怎么样")}
+    assert {m.keyword for m in scan.intent_hits["价格咨询"]} == {"报价", "多少钱"}
+
+
+def test_synonyms_are_applied_once_longest_first():
+    # 只扫描原文一次，替换结果不会被再次改写；"小孩爬" 优先于 "小孩"
+    assert syn_map("窗户晃动") == "窗户不稳定"
+    assert syn_map("小孩爬窗") == "安全防范窗"
+    assert preprocess("那个 窗户 漏风 啊")["cleaned_prompt"] == "窗户 密封性差"
+
+
+def test_text_already_using_target_term_is_unchanged():
+    # 术语中包含更短的口语词（"不稳定" ⊃ "不稳"、"型材变形" ⊃ "变形"）时保持原样
+    assert preprocess("不稳定的窗户")["cleaned_prompt"] == "不稳定的窗户"
+    assert syn_map("不稳定的窗户") == "不稳定的窗户"
+    assert syn_map("型材变形了") == "型材变形了"
+    assert syn_map("窗户不稳") == "窗户不稳定"
+
+
+def test_fillers_only_removed_as_whole_tokens():
+    # "这个" 在词中不删，独立出现时删除
+    assert preprocess("这个窗户多少钱")["cleaned_prompt"] == "这个窗户多少钱"
+    assert preprocess("这个 窗户 多少钱 呢")["cleaned_prompt"] == "窗户 多少钱"
+
+
+def test_keyword_switch_uses_engine():
+    assert keyword_switch("这款报价多少", "产品咨询") == "价格咨询"
+    assert keyword_switch("随便聊聊", "产品咨询") is None
+
+
+def test_matches_naive_substring_on_large_vocab():
+    rng = random.Random(0)
+    alphabet = "窗门铝玻璃隔音价格推荐型号"
+    vocab = list({"".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(3000)})
+    rules = {"A": vocab[: len(vocab) // 2], "B": vocab[len(vocab) // 2 :]}
+    engine = KeywordEngine(rules)
+    for _ in range(50):
+        text = "".join(rng.choice(alphabet) for _ in range(30))
+        got = engine.intent_keywords(text)
+        for intent, kws in rules.items():
+            assert got.get(intent, []) == [kw for kw in kws if kw in text]
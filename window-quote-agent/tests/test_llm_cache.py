@@ -0,0 +1,92 @@
+"""LLM 响应缓存：键由 namespace + messages + 参数决定，内存层在前、SQLite 层在后，按节点开启。"""
+import asyncio
+
+from packages.llm.cache import CachedChatModel, LLMCache, cached_async_chat_completion, cached_chat_completion, make_cache_key
+from packages.llm.model_config import is_llm_cache_enabled
+
+
+def test_key_depends_on_messages_and_params():
+    msgs = [{"role": "user", "content": "我想装窗户"}]
+    assert make_cache_key("router", msgs, model="gpt-4o") == make_cache_key("router", list(msgs), model="gpt-4o")
+    assert make_cache_key("router", msgs, model="gpt-4o") != make_cache_key("router", msgs, model="gpt-4o-mini")
+    assert make_cache_key("router", msgs) != make_cache_key("check", msgs)
+
+
+def test_cached_chat_completion_calls_llm_once():
+    calls = []
+
+    def fake(messages, **kwargs):
+        calls.append(messages)
+        return "你好"
+
+    cache = LLMCache()
+    fn = cached_chat_completion(fake, namespace="chat", cache=cache, model="m")
+    msgs = [{"role": "user", "content": "你好"}]
+    assert fn(msgs) == "你好"
+    assert fn(msgs) == "你好"
+    assert len(calls) == 1
+    assert cache.stats()["memory_hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_async_hit_replays_on_token():
+    cache = LLMCache()
+
+    async def fake(messages, **kwargs):
+        return "流式回复"
+
+    fn = cached_async_chat_completion(fake, namespace="chat", cache=cache)
+    tokens = []
+
+    async def run():
+        await fn([{"role": "user", "content": "hi"}])
+        return await fn([{"role": "user", "content": "hi"}], on_token=tokens.append)
+
+    assert asyncio.run(run()) == "流式回复"
+    assert tokens == ["流式回复"]
+
+
+def test_sqlite_tier_survives_new_process_cache(tmp_path):
+    path = str(tmp_path / "llm_cache.db")
+    first = LLMCache(sqlite_path=path)
+    first.set("k", "v")
+    first.close()
+    second = LLMCache(sqlite_path=path)
+    assert second.get("k") == "v"
+    assert second.disk_hits == 1
+    assert second.get("k") == "v"
+    assert second.memory_hits == 1
+    second.close()
+
+
+def test_expired_entries_are_misses():
+    cache = LLMCache(ttl_seconds=-1)
+    cache.set("k", "v")
+    assert cache.get("k") is None
+
+
+def test_cached_chat_model_wraps_invoke():
+    class FakeResponse:
+        def __init__(self, content):
+            self.content = content
+
+    class FakeLLM:
+        calls = 0
+
+        def invoke(self, messages):
+            FakeLLM.calls += 1
+            return FakeResponse('{"next_node": "chat"}')
+
+    llm = CachedChatModel(FakeLLM(), namespace="router", cache=LLMCache(), model="gpt-4o", temperature=0)
+    assert llm.invoke([{"role": "user", "content": "x"}]).content == '{"next_node": "chat"}'
+    assert asyncio.run(llm.ainvoke([{"role": "user", "content": "x"}])).content == '{"next_node": "chat"}'
+    assert FakeLLM.calls == 1
+
+
+def test_per_node_opt_in(monkeypatch):
+    monkeypatch.delenv("LLM_CACHE_NODES", raising=False)
+    assert is_llm_cache_enabled("router")
+    assert not is_llm_cache_enabled("chat")
+    monkeypatch.setenv("LLM_CACHE_NODES", "chat")
+    assert is_llm_cache_enabled("chat") and not is_llm_cache_enabled("router")
+    monkeypatch.setenv("LLM_CACHE_NODES", "none")
+    assert not is_llm_cache_enabled("router")
@@ -0,0 +1,42 @@
+"""LLM 客户端注册表：同一 (base_url, api_key) 复用客户端与连接池，按档位读超时。"""
+import asyncio
+
+import pytest
+
+from packages.llm.client import get_timeout
+
+
+def test_timeout_per_profile(monkeypatch):
+    monkeypatch.delenv("LLM_TIMEOUT", raising=False)
+    monkeypatch.delenv("MODEL_CHAT_TIMEOUT", raising=False)
+    assert get_timeout("chat") == 60.0
+    monkeypatch.setenv("LLM_TIMEOUT", "30")
+    assert get_timeout("chat") == 30.0
+    monkeypatch.setenv("MODEL_CHAT_TIMEOUT", "12.5")
+    assert get_timeout("chat") == 12.5
+    assert get_timeout("collect") == 30.0
+
+
+def test_sync_clients_shared_by_base_url_and_key():
+    pytest.importorskip("openai")
+    from packages.llm.client import get_http_client, get_openai_client
+
+    a = get_openai_client("http://localhost:8000/v1", "k1")
+    assert get_openai_client("http://localhost:8000/v1/", "k1") is a
+    b = get_openai_client("http://localhost:8000/v1", "k2")
+    assert b is not a
+    # 不同档位共用同一个 httpx 连接池
+    assert a._client is b._client is get_http_client()
+
+
+def test_async_clients_shared_within_event_loop():
+    pytest.importorskip("openai")
+    from packages.llm.client import get_async_openai_client
+
+    async def pair():
+        return get_async_openai_client("http://localhost:8000/v1", "k"), get_async_openai_client("http://localhost:8000/v1", "k")
+
+    first, second = asyncio.run(pair())
+    assert first is second
+    other, _ = asyncio.run(pair())
+    assert other is not first
@@ -0,0 +1,98 @@
+"""本地意图分类器：训练 / 保存 / 加载、置信度范围、预测耗时，以及本地 → LLM 的分级升级。"""
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from packages.intent.local_classifier import LocalIntentModel, LocalUncertaintyClassifier, train_local_model
+from packages.intent.pipeline import run_intent_pipeline
+from packages.intent.preprocess import preprocess_many
+from packages.intent.schemas import INTENTS
+from packages.intent.uncertainty_classifier import (
+    StubUncertaintyClassifier,
+    TieredUncertaintyClassifier,
+    UncertaintyClassifier,
+    create_uncertainty_classifier,
+)
+
+SEED = Path(__file__).resolve().parent.parent / "eval" / "datasets" / "intent_seed.jsonl"
+
+
+@pytest.fixture(scope="module")
+def model():
+    rows = [json.loads(line) for line in SEED.read_text(encoding="utf-8").splitlines() if line.strip()]
+    texts = [p["cleaned_prompt"] for p in preprocess_many(r["text"] for r in rows)]
+    return train_local_model(texts, [r["intent"] for r in rows], label_order=INTENTS, epochs=150)
+
+
+class _FixedClassifier(UncertaintyClassifier):
+    version = "fixed"
+
+    def __init__(self, intent, confidence):
+        self.calls = 0
+        self.result = {"intents": [intent], "confidence": confidence}
+
+    def predict(self, text):
+        self.calls += 1
+        return self.result
+
+
+def test_predict_returns_calibrated_confidence(model):
+    clf = LocalUncertaintyClassifier(model)
+    out = clf.predict("你们工厂在哪个城市")
+    assert out["intents"][0] in INTENTS
+    assert 0.0 <= out["confidence"] <= 1.0
+    assert clf.predict("晚安")["intents"] == ["其他"]
+
+
+def test_predict_batch_matches_predict(model):
+    clf = LocalUncertaintyClassifier(model)
+    texts = ["你们工厂在哪个城市", "晚安", "多少钱一平", "哪款适合卧室"]
+    batch = clf.predict_batch(texts)
+    for text, out in zip(texts, batch):
+        single = clf.predict(text)
+        assert out["intents"] == single["intents"]
+        assert out["confidence"] == pytest.approx(single["confidence"], abs=1e-5)
+
+
+def test_save_load_roundtrip(model, tmp_path):
+    path = model.save(tmp_path / "intent.npz")
+    loaded = LocalIntentModel.load(path)
+    assert loaded.labels == model.labels
+    assert loaded.version == model.version
+    assert loaded.predict_proba("多少钱一平").tolist() == pytest.approx(model.predict_proba("多少钱一平").tolist())
+
+
+def test_version_is_computed_once(model, monkeypatch):
+    clf = LocalUncertaintyClassifier(model)
+    # 构造后读取 version 不再哈希模型参数
+    monkeypatch.setattr("packages.intent.local_classifier.hashlib.sha256", None)
+    assert clf.version == f"local:{model.version}" and len(model.version) == 12
+
+
+def test_predict_under_a_millisecond(model):
+    texts = ["你们是做什么的", "哪款适合卧室", "玻璃厚度多少"] * 200
+    start = time.perf_counter()
+    for t in texts:
+        model.predict_proba(t)
+    assert (time.perf_counter() - start) / len(texts) < 1e-3
+
+
+def test_tiered_escalates_only_below_threshold():
+    llm = _FixedClassifier("产品推荐", 0.9)
+    confident = TieredUncertaintyClassifier(_FixedClassifier("价格咨询", 0.8), llm, escalate_below=0.6)
+    assert confident.predict("x")["intents"] == ["价格咨询"] and llm.calls == 0
+    unsure = TieredUncertaintyClassifier(_FixedClassifier("价格咨询", 0.3), llm, escalate_below=0.6)
+    assert unsure.predict("x")["intents"] == ["产品推荐"] and llm.calls == 1
+
+
+def test_factory_uses_local_model(model, tmp_path, monkeypatch):
+    monkeypatch.setenv("INTENT_CLASSIFIER_PATH", str(model.save(tmp_path / "intent.npz")))
+    monkeypatch.delenv("INTENT_LLM_ESCALATE", raising=False)
+    clf = create_uncertainty_classifier("local")
+    assert clf.version == f"local:{model.version}"
+    assert isinstance(create_uncertainty_classifier("stub"), StubUncertaintyClassifier)
+    # pipeline 使用传入的分类器，规则未命中时不再发网络请求
+    out = run_intent_pipeline("晚安", uncertainty_classifier=clf)
+    assert out["source"] == "model"
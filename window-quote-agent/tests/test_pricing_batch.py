@@ -0,0 +1,46 @@
+"""批量定价：与逐行 calculate_price 结果一致。"""
+import pytest
+
+pytest.importorskip("numpy")
+
+from packages.tools.pricing import calculate_price
+from packages.tools.pricing.batch import calculate_price_batch, parse_quote_csv
+
+_ITEMS = [
+    {"w": 1.5, "h": 1.2, "opening_count": 2, "series_id": "65"},
+    {"w": 0.8, "h": 1.0, "opening_count": 1, "model": "ROW100P"},
+    {"w": 1.1, "h": 1.7, "opening_count": 3, "series_id": "65"},
+    {"w": 2.4, "h": 2.2, "opening_count": 2, "series_id": "185"},
+    {"w": 0, "h": 0, "opening_count": 5, "series_id": "70"},
+    {"w": 1.2, "h": 1.2, "model": "NOPE"},
+]
+
+
+def _single(item):
+    requirements = {k: item[k] for k in ("w", "h", "opening_count") if k in item}
+    selection = {k: item[k] for k in ("model", "series_id") if k in item}
+    return calculate_price(requirements, selection)
+
+
+def test_batch_matches_single_calculation():
+    result = calculate_price_batch(_ITEMS)
+    assert result["lines"] == [_single(it) for it in _ITEMS]
+    assert result["count"] == len(_ITEMS)
+    assert result["failed"] == 1
+    assert result["total"] == round(sum(line["total"] for line in result["lines"]), 2)
+
+
+def test_batch_invalid_row_does_not_break_others():
+    result = calculate_price_batch([{"w": "abc", "h": 1, "series_id": "65"}, _ITEMS[0]])
+    assert result["lines"][0]["error"]
+    assert result["lines"][1] == _single(_ITEMS[0])
+
+
+def test_parse_quote_csv():
+    text = "W, h ,opening_count,series_id\n1.5,1.2,2,65\n\n0.8,1.0,1,70\n"
+    rows = parse_quote_csv(text)
+    assert rows == [
+        {"w": "1.5", "h": "1.2", "opening_count": "2", "series_id": "65"},
+        {"w": "0.8", "h": "1.0", "opening_count": "1", "series_id": "70"},
+    ]
+    assert calculate_price_batch(rows)["failed"] == 0
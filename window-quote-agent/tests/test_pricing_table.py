@@ -0,0 +1,78 @@
+"""编译定价表：别名解析、版本号、按文件变化热更新。"""
+import json
+import os
+
+from packages.tools.pricing import calculate_price, get_pricing_table
+from packages.tools.pricing.calculate_price import CATEGORY_TO_TYPE, SERIES_ID_TO_MODEL, TYPE_FACTORS
+from packages.tools.pricing.table import PricingTableLoader
+
+
+def _price_doc(base_lo: int) -> dict:
+    return {
+        "models": [
+            {
+                "model": "ROW100P",
+                "category": "casement_window",
+                "base_price_range": {"1_panel": [base_lo, base_lo + 200], "2_panel": [base_lo * 2, base_lo * 2 + 200]},
+                "size_tiers": [
+                    {"width_range": [36, 48], "height_range": [60, 72], "multiplier": 1.25},
+                    {"width_range": [24, 36], "height_range": [36, 60], "multiplier": 1.0},
+                ],
+            }
+        ]
+    }
+
+
+def _loader(path):
+    return PricingTableLoader(
+        path, aliases=SERIES_ID_TO_MODEL, type_factors=TYPE_FACTORS, category_to_type=CATEGORY_TO_TYPE
+    )
+
+
+def test_table_resolves_model_and_series_alias():
+    table = get_pricing_table()
+    assert table.resolve("ROW100P") is table.resolve("65")
+    assert table.resolve("nope") is None
+    cm = table.resolve("65")
+    assert cm.base_price == 950.0
+    assert cm.panel_factor(99) == 1.0
+    # 档位按宽度下界排序后仍按宽高区间匹配
+    assert [t.w_lo for t in cm.tiers] == sorted(t.w_lo for t in cm.tiers)
+
+
+def test_quote_records_pricing_version():
+    result = calculate_price({"w": 1.5, "h": 1.2, "opening_count": 2}, {"series_id": "65"})
+    assert result["pricing_version"] == get_pricing_table().version
+    assert len(result["pricing_version"]) == 12
+
+
+def test_loader_reloads_only_when_content_changes(tmp_path):
+    path = tmp_path / "price.json"
+    path.write_text(json.dumps(_price_doc(800)), encoding="utf-8")
+    loader = _loader(path)
+    first = loader.get()
+    assert loader.get() is first
+    assert first.resolve("65").area_factor(40, 65) == 1.25
+
+    # 仅 touch（mtime 变化、内容不变）不重新编译
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert loader.get() is first
+
+    path.write_text(json.dumps(_price_doc(1000)), encoding="utf-8")
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 2_000_000))
+    second = loader.get()
+    assert second is not first
+    assert second.version != first.version
+    assert second.resolve("ROW100P").base_price == 1100.0
+
+
+def test_loader_keeps_previous_table_on_broken_file(tmp_path):
+    path = tmp_path / "price.json"
+    path.write_text(json.dumps(_price_doc(800)), encoding="utf-8")
+    loader = _loader(path)
+    first = loader.get()
+    st = os.stat(path)
+    path.write_text("{ broken", encoding="utf-8")
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert loader.get() is first
@@ -0,0 +1,54 @@
+"""prompt 模板注册表单测：缓存、编译校验、版本哈希与热更新。"""
+import os
+
+import pytest
+
+from packages.agent import prompts
+
+
+def test_preload_prompts_loads_all_templates():
+    names = prompts.preload_prompts()
+    assert {"router_planner", "check", "recommend", "collect_requirements"} <= set(names)
+
+
+def test_load_prompt_reads_disk_once(monkeypatch):
+    prompts.preload_prompts()
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("预加载后不应再读盘")
+
+    monkeypatch.setattr(type(prompts.PROMPTS_DIR), "read_text", _fail)
+    assert "{{user_message}}" in prompts.load_prompt("check")
+
+
+def test_render_prompt_validates_placeholders():
+    tpl = prompts.compile_prompt("demo", "用户：{{user_message}}\n检索：{{rag_context}}")
+    assert tpl.placeholders == {"user_message", "rag_context"}
+    assert tpl.render(user_message="你好", rag_context="无") == "用户：你好\n检索：无"
+    with pytest.raises(ValueError):
+        tpl.render(user_message="你好")
+    with pytest.raises(ValueError):
+        tpl.render(user_message="你好", rag_context="无", extra="x")
+    with pytest.raises(ValueError):
+        prompts.compile_prompt("bad", "{{ user_message }}")
+
+
+def test_all_templates_compile():
+    prompts.preload_prompts()
+    versions = prompts.prompt_versions()
+    assert prompts.get_prompt("check").placeholders >= {"last_step", "user_message", "state_summary"}
+    assert versions["check"] == prompts.prompt_hash("check") and len(versions["check"]) == 12
+
+
+def test_hot_reload_picks_up_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(prompts, "PROMPTS_DIR", tmp_path)
+    monkeypatch.setenv("PROMPTS_HOT_RELOAD", "1")
+    monkeypatch.setenv("PROMPTS_RELOAD_INTERVAL", "0")
+    path = tmp_path / "hot.md"
+    path.write_text("v1 {{x}}", encoding="utf-8")
+    first = prompts.prompt_hash("hot")
+    assert prompts.render_prompt("hot", x=1) == "v1 1"
+    path.write_text("v2 {{x}}", encoding="utf-8")
+    os.utime(path, (path.stat().st_atime, path.stat().st_mtime + 5))
+    assert prompts.render_prompt("hot", x=1) == "v2 1"
+    assert prompts.prompt_hash("hot") != first
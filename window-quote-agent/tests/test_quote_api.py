@@ -0,0 +1,55 @@
+"""POST /quote：结构化一步报价，不经过图与 LLM。"""
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from apps.api.routers.quote import router
+from packages.tools.pricing import calculate_price
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_quote_returns_price_result_and_markdown(client):
+    resp = client.post("/quote", json={"w": 1.5, "h": 1.2, "opening_count": 2, "series_id": "65"})
+    assert resp.status_code == 200
+    data = resp.json()
+    expected = calculate_price({"w": 1.5, "h": 1.2, "opening_count": 2}, {"series_id": "65"})
+    assert data["price_result"] == expected
+    assert "总价" in data["quote_md"] and "明细表格" in data["quote_md"]
+
+
+def test_quote_requires_model_or_series(client):
+    assert client.post("/quote", json={"w": 1.5, "h": 1.2}).status_code == 422
+
+
+def test_quote_unknown_model_is_404(client):
+    assert client.post("/quote", json={"w": 1.5, "h": 1.2, "model": "NOPE"}).status_code == 404
+
+
+def test_quote_batch_accepts_json_and_raw_csv(client):
+    items = [{"w": 1.5, "h": 1.2, "opening_count": 2, "series_id": "65"}, {"w": 1.5, "h": 1.2, "model": "NOPE"}]
+    data = client.post("/quote/batch", json=items).json()
+    assert data["count"] == 2 and data["failed"] == 1
+    expected = calculate_price({"w": 1.5, "h": 1.2, "opening_count": 2}, {"series_id": "65"})
+    assert data["lines"][0]["total"] == pytest.approx(expected["total"])
+
+    csv_body = "w,h,opening_count,series_id\n1.5,1.2,2,65\n"
+    resp = client.post("/quote/batch", content=csv_body.encode("utf-8"), headers={"Content-Type": "text/csv"})
+    assert resp.status_code == 200
+    assert resp.json()["total"] == pytest.approx(expected["total"])
+
+
+def test_quote_batch_rejects_multipart_upload(client):
+    files = {"file": ("items.csv", b"w,h,opening_count,series_id\n1.5,1.2,2,65\n", "text/csv")}
+    resp = client.post("/quote/batch", files=files)
+    assert resp.status_code == 415
+    assert "text/csv" in resp.json()["detail"]
@@ -0,0 +1,109 @@
+"""BM25 索引产物：构建 / 发布 / mmap 加载、版本与检索结果一致，离线构建任务，以及中文分词与默认 retrieve。"""
+import numpy as np
+import pytest
+
+from apps.worker.jobs.build_index import build_index
+from packages.rag.indexing import (
+    build_bm25_index,
+    load_bm25_index,
+    load_documents,
+    prune_index_versions,
+    resolve_index_dir,
+)
+from packages.rag.retriever import BM25ChunkRetriever
+from packages.rag.tokenizer import Tokenizer, tokenize
+
+DOCS = [
+    {"text": "Casement Window ROW100P slim frame", "metadata": {"model": "ROW100P", "pages": [9]}},
+    {"text": "Sliding Door heavy duty sliding", "metadata": {"model": "SD200", "pages": [12]}},
+    {"text": "Tilt Turn Window triple glass", "metadata": {"model": "TT88", "pages": [20]}},
+    {"text": "Casement Door with screen", "metadata": {"model": "CD60", "pages": [30]}},
+]
+
+
+def test_search_ranks_matching_docs():
+    index = build_bm25_index(DOCS)
+    assert index.search("Sliding Door", k=1)[0][0] == 1
+    assert index.search("triple glass", k=1)[0][0] == 2
+    assert index.search("没有的词", k=2) == []
+
+
+def test_save_and_mmap_load_roundtrip(tmp_path):
+    index = build_bm25_index(DOCS)
+    target = index.save(tmp_path)
+    assert target.name == index.version and resolve_index_dir(tmp_path) == target
+    loaded = load_bm25_index(tmp_path)
+    assert isinstance(loaded.weights, np.memmap)
+    assert loaded.version == index.version
+    for q in ("Casement Window", "glass", "Door Door"):
+        assert loaded.scores(q).tolist() == pytest.approx(index.scores(q).tolist())
+    assert loaded.document(2) == DOCS[2]
+
+
+def test_version_is_content_hash(tmp_path):
+    assert build_bm25_index(DOCS).version == build_bm25_index(list(DOCS)).version
+    changed = build_bm25_index(DOCS[:3])
+    assert changed.version != build_bm25_index(DOCS).version
+    # 发布新版本后 CURRENT 切换，旧版本按 keep 清理
+    build_bm25_index(DOCS).save(tmp_path)
+    changed.save(tmp_path)
+    assert load_bm25_index(tmp_path).version == changed.version
+    assert len(prune_index_versions(tmp_path, keep=1)) == 1
+    assert load_bm25_index(tmp_path).n_docs == 3
+
+
+def test_missing_index_raises(tmp_path):
+    assert resolve_index_dir(tmp_path) is None
+    with pytest.raises(FileNotFoundError):
+        load_bm25_index(tmp_path)
+
+
+def test_build_index_job_publishes_brochure(tmp_path):
+    target = build_index(out=tmp_path)
+    index = load_bm25_index(tmp_path)
+    assert index.path == target
+    assert index.n_docs == len(load_documents())
+
+
+ZH_DOCS = [
+    {"text": "ROW100P 平开窗，三玻两腔，隔音好", "metadata": {"model": "ROW100P", "pages": [9]}},
+    {"text": "SL80 推拉窗，隔音 32dB，适合临街卧室", "metadata": {"model": "SL80", "pages": [12]}},
+    {"text": "FD60 折叠门，LOW-E 玻璃，保温", "metadata": {"model": "FD60", "pages": [20]}},
+]
+
+
+def test_tokenizer_bigrams_and_model_codes():
+    assert tokenize("隔音好的推拉窗") == ["隔音", "音好", "好的", "的推", "推拉", "拉窗"]
+    assert tokenize("ROW100P 断桥铝 ＬＯＷ－Ｅ 1.8mm") == ["row100p", "断桥", "桥铝", "low-e", "1.8mm"]
+    assert Tokenizer(cjk_unigrams=True)("推拉窗") == ["推", "拉", "窗", "推拉", "拉窗"]
+
+
+def test_chinese_query_retrieval():
+    index = build_bm25_index(ZH_DOCS)
+    assert index.manifest["tokenizer"] == "zh"
+    assert index.search("隔音好的推拉窗", k=1)[0][0] == 1
+    assert index.search("low-e 玻璃", k=1)[0][0] == 2
+    assert index.search("row100p", k=1)[0][0] == 0
+    # 无命中时不返回 0 分文档
+    assert index.search("天气", k=3) == []
+
+
+def test_topk_matches_full_sort():
+    rng = np.random.default_rng(0)
+    words = ["推拉", "平开", "隔音", "保温", "防水", "玻璃", "型材", "窗扇"]
+    docs = [{"text": " ".join(rng.choice(words, size=6)), "metadata": {}} for _ in range(300)]
+    index = build_bm25_index(docs, tokenizer="whitespace")
+    for q in ("推拉 隔音", "玻璃 玻璃 型材", "防水"):
+        s = index.scores(q)
+        expected = sorted((i for i in range(len(docs)) if s[i] > 0), key=lambda i: (-s[i], i))[:5]
+        assert [i for i, _ in index.search(q, k=5)] == expected
+
+
+def test_retriever_prefers_prebuilt_index(tmp_path):
+    build_bm25_index(ZH_DOCS).save(tmp_path)
+    retriever = BM25ChunkRetriever(index_path=tmp_path, source=tmp_path / "missing.json", k=2)
+    chunks = retriever("推拉窗隔音怎么样")
+    assert chunks[0].startswith("[model=SL80 | pages=[12]]\n")
+    assert isinstance(retriever.index.weights, np.memmap)
+    # 无索引、无源文件时返回空列表
+    assert BM25ChunkRetriever(index_path=tmp_path / "none", source=tmp_path / "missing.json")("推拉窗") == []
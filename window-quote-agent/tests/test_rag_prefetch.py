@@ -0,0 +1,79 @@
+"""RAG 预取：与 intent 并行检索，recommend / chat 检索工具 query 一致时复用。"""
+import asyncio
+import threading
+
+from packages.agent.nodes.rag_prefetch import arag_prefetch, lookup_prefetched, prefetch_queries, rag_prefetch
+from packages.agent.nodes.recommend import arecommend, recommend
+from packages.agent.state import AgentState
+
+
+def _no_retrieve(_query):
+    raise AssertionError("预取命中时不应再检索")
+
+
+def test_prefetch_queries_include_recommend_query_when_params_known():
+    state: AgentState = {"messages": [{"role": "user", "content": "65系列隔音怎么样？？"}]}
+    assert len(prefetch_queries(state)) == 1
+    state["requirements"] = {"w": 3.0, "h": 2.0}
+    queries = list(prefetch_queries(state).values())
+    assert len(queries) == 2
+    assert "型材推荐" in queries[1]
+
+
+def test_prefetch_searches_raw_query_and_keys_by_normalized():
+    """术语映射只影响查找的 key，检索仍用原始用户消息（与未命中时下游的检索一致）。"""
+    seen = []
+
+    def retrieve(q):
+        seen.append(q)
+        return [f"片段:{q}"]
+
+    state: AgentState = {"messages": [{"role": "user", "content": "窗户漏风怎么办"}]}
+    state.update(rag_prefetch(state, retrieve))
+    assert seen == ["窗户漏风怎么办"]
+    assert list(state["rag_prefetch"]) == ["窗户密封性差怎么办"]
+    assert lookup_prefetched(state, "窗户漏风怎么办") == ["片段:窗户漏风怎么办"]
+
+
+def test_prefetch_and_lookup():
+    seen = []
+
+    def retrieve(q):
+        seen.append(q)
+        return [f"片段:{q}"]
+
+    state: AgentState = {"messages": [{"role": "user", "content": "断桥铝是什么"}]}
+    out = asyncio.run(arag_prefetch(state, retrieve))
+    assert rag_prefetch(state, retrieve) == out
+    state.update(out)
+    assert lookup_prefetched(state, " 断桥铝是什么 ") == [f"片段:{seen[0]}"]
+    assert lookup_prefetched(state, "70系列价格") is None
+
+
+def test_prefetch_failure_is_ignored():
+    state: AgentState = {"messages": [{"role": "user", "content": "你好"}]}
+    assert rag_prefetch(state, _no_retrieve) == {"rag_prefetch": {}}
+
+
+def test_recommend_reuses_prefetched_chunks():
+    state: AgentState = {"messages": [{"role": "user", "content": "我要报价"}], "requirements": {"w": 3.0, "h": 2.0}}
+    state.update(rag_prefetch(state, lambda q: ["断桥铝 65 系列适合家用"]))
+    out = recommend(state, _no_retrieve, lambda: [{"id": "65", "name": "65系列"}], lambda _m: '{"series_id": "65"}')
+    assert out["rag_context"] == ["断桥铝 65 系列适合家用"]
+    assert out["selection"]["series_id"] == "65"
+
+
+def test_arecommend_retrieves_in_thread_on_prefetch_miss():
+    threads = []
+
+    def retrieve(_q):
+        threads.append(threading.current_thread())
+        return ["断桥铝 65 系列适合家用"]
+
+    async def achat(_messages):
+        return '{"series_id": "65"}'
+
+    state: AgentState = {"requirements": {"w": 3.0, "h": 2.0}, "rag_prefetch": {"其他 query": []}}
+    out = asyncio.run(arecommend(state, retrieve, lambda: [{"id": "65", "name": "65系列"}], achat))
+    assert out["rag_context"] == ["断桥铝 65 系列适合家用"]
+    assert threads and threads[0] is not threading.main_thread()
@@ -1,7 +1,9 @@
 """Task 4.4：推荐节点测试。"""
+import asyncio
+
 import pytest
 
-from packages.agent.nodes.recommend import recommend, create_recommend_node
+from packages.agent.nodes.recommend import arecommend, recommend, create_recommend_node
 from packages.agent.state import AgentState
 
 
@@ -37,3 +39,14 @@ def test_create_recommend_node():
     out = node(state)
     assert out["selection"].get("series_id") == "65"
     assert len(out.get("rag_context", [])) >= 0
+
+
+def test_arecommend_outputs_selection():
+    async def achat(_messages):
+        return '{"series_id": "70"}'
+
+    state: AgentState = {"requirements": {"w": 3.0, "h": 2.0}}
+    out = asyncio.run(arecommend(state, _mock_retrieve, _mock_list_series, achat))
+    assert out["selection"]["series_id"] == "70"
+    assert out["selection_ready"] is True
+    assert out["step"] == "recommend"
@@ -1,7 +1,10 @@
 """Task 4.2：Router 节点测试。"""
+import asyncio
+
 import pytest
 
 from packages.agent.nodes.router import (
+    arouter_planner,
     router,
     create_router_node,
     create_router_planner_node,
@@ -128,3 +131,15 @@ def test_router_by_current_intent():
     out = router_by_current_intent(state)
     assert out["step"] == "router"
     assert out["next_node"] == "collect_requirements"
+
+
+def test_arouter_planner_fallback_without_llm():
+    """异步 planner 无 LLM 时与同步 fallback 一致。"""
+    state: AgentState = {
+        "messages": [{"role": "user", "content": "推荐一款"}],
+        "current_intent": "产品推荐",
+        "turns_with_same_intent": 1,
+    }
+    out = asyncio.run(arouter_planner(state, llm=None))
+    assert out == router_planner(state, llm=None)
+    assert out["next_node"] == "collect_recommend_params"
@@ -0,0 +1,94 @@
+"""会话并发控制单测：同会话串行、幂等请求合并。"""
+import asyncio
+
+import pytest
+
+from packages.memory import RequestCoalescer, SessionLocks
+
+
+def test_session_locks_serialize_same_session_only():
+    locks = SessionLocks()
+    events: list[str] = []
+
+    async def turn(session_id: str, name: str):
+        async with locks.hold(session_id):
+            events.append(f"{name}:start")
+            await asyncio.sleep(0.01)
+            events.append(f"{name}:end")
+
+    async def main():
+        await asyncio.gather(turn("s1", "a"), turn("s1", "b"), turn("s2", "c"))
+
+    asyncio.run(main())
+    # s1 的两轮不交叠；s2 不受 s1 阻塞
+    assert events.index("a:end") < events.index("b:start")
+    assert events.index("c:start") < events.index("a:end")
+    assert len(locks) == 0
+
+
+def test_coalescer_runs_once_for_concurrent_duplicates():
+    coalescer = RequestCoalescer()
+    calls = 0
+
+    async def factory():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"reply": "ok"}
+
+    async def main():
+        results = await asyncio.gather(*(coalescer.run(("s1", "k1", "hi"), factory) for _ in range(3)))
+        # 完成后的重试直接复用结果
+        late = await coalescer.run(("s1", "k1", "hi"), factory)
+        return results, late
+
+    results, late = asyncio.run(main())
+    assert calls == 1
+    assert results == [{"reply": "ok"}] * 3
+    assert late == {"reply": "ok"}
+
+
+def test_coalescer_does_not_cache_failures():
+    coalescer = RequestCoalescer()
+    calls = 0
+
+    async def factory():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("llm timeout")
+        return "ok"
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            await coalescer.run("k", factory)
+        return await coalescer.run("k", factory)
+
+    assert asyncio.run(main()) == "ok"
+    assert calls == 2
+
+
+def test_coalescer_shared_task_survives_caller_cancel():
+    coalescer = RequestCoalescer()
+
+    async def factory():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(coalescer.run("k", factory))
+        await asyncio.sleep(0)
+        first.cancel()  # 第一个客户端断开
+        return await coalescer.run("k", factory)
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_coalesce_key_requires_session_id():
+    pytest.importorskip("fastapi")
+    from apps.api.main import ChatRequest, _coalesce_key
+
+    # 新会话的请求互不相关，即使 idempotency_key 与消息相同也不合并
+    assert _coalesce_key(ChatRequest(message="你好", idempotency_key="k1")) is None
+    assert _coalesce_key(ChatRequest(message="你好", session_id="s1")) is None
+    assert _coalesce_key(ChatRequest(message=" 你好 ", session_id="s1", idempotency_key="k1")) == ("s1", "k1", "你好")
@@ -0,0 +1,101 @@
+"""会话存储单测：内存 LRU+TTL、SQLite、Redis 协议（fakeredis）三种后端。"""
+import time
+
+import pytest
+
+from packages.memory import (
+    InMemorySessionStore,
+    RedisSessionStore,
+    SqliteSessionStore,
+    create_session_store,
+)
+
+_STATE = {
+    "messages": [{"role": "user", "content": "我想装窗户"}],
+    "current_intent": "价格咨询",
+    "requirements": {"w": 1.5, "h": 1.2},
+    "thinking_steps": ["识别用户意图：价格咨询"],
+}
+
+
+def test_memory_store_roundtrip_returns_copy():
+    store = InMemorySessionStore()
+    store.set("s1", _STATE)
+    got = store.get("s1")
+    assert got == _STATE
+    got["messages"].append({"role": "assistant", "content": "x"})
+    assert store.get("s1") == _STATE
+    store.delete("s1")
+    assert store.get("s1") is None
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = InMemorySessionStore(max_sessions=2)
+    store.set("a", {"n": 1})
+    store.set("b", {"n": 2})
+    store.get("a")  # a 变为最近使用
+    store.set("c", {"n": 3})
+    assert store.get("b") is None
+    assert store.get("a") == {"n": 1}
+    assert store.get("c") == {"n": 3}
+
+
+def test_memory_store_byte_budget():
+    store = InMemorySessionStore(max_bytes=200)
+    for i in range(10):
+        store.set(f"s{i}", {"text": "x" * 50})
+    assert store.stats()["bytes"] <= 200
+    assert store.get("s9") is not None
+    assert store.get("s0") is None
+
+
+def test_memory_store_ttl_expires():
+    store = InMemorySessionStore(ttl_seconds=0.01)
+    store.set("s1", _STATE)
+    time.sleep(0.02)
+    assert store.get("s1") is None
+
+
+def test_sqlite_store_roundtrip_and_shared_file(tmp_path):
+    path = tmp_path / "sessions.db"
+    store = SqliteSessionStore(path)
+    store.set("s1", _STATE)
+    store.set("s1", {**_STATE, "current_intent": "产品推荐"})
+    # 另一个连接（模拟另一个 worker）能读到同一份数据
+    other = SqliteSessionStore(path)
+    assert other.get("s1")["current_intent"] == "产品推荐"
+    other.delete("s1")
+    assert store.get("s1") is None
+    store.close()
+    other.close()
+
+
+def test_sqlite_store_ttl_expires(tmp_path):
+    store = SqliteSessionStore(tmp_path / "sessions.db", ttl_seconds=0.01)
+    store.set("s1", _STATE)
+    time.sleep(0.02)
+    assert store.get("s1") is None
+    store.close()
+
+
+def test_redis_store_roundtrip_with_fakeredis():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeRedis()
+    store = RedisSessionStore(client, ttl_seconds=60)
+    store.set("s1", _STATE)
+    assert store.get("s1") == _STATE
+    assert 0 < client.ttl("wqa:session:s1") <= 60
+    store.delete("s1")
+    assert store.get("s1") is None
+
+
+def test_create_session_store_from_url(tmp_path, monkeypatch):
+    monkeypatch.delenv("SESSION_STORE_URL", raising=False)
+    assert isinstance(create_session_store(), InMemorySessionStore)
+    store = create_session_store(f"sqlite:///{tmp_path}/s.db")
+    assert isinstance(store, SqliteSessionStore)
+    # tmp_path 为绝对路径，拼出 sqlite:////abs/s.db
+    assert store.path == f"{tmp_path}/s.db"
+    store.close()
+    with pytest.raises(ValueError):
+        create_session_store("mongodb://localhost")
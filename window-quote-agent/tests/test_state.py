@@ -0,0 +1,37 @@
+"""AgentState reducer：节点只返回增量，reducer 返回新列表，不修改通道中已有的列表。"""
+from packages.agent.state import (
+    MAX_STATE_MESSAGES,
+    ReplaceList,
+    append_messages,
+    append_steps,
+    append_thinking_step,
+)
+
+
+def test_append_messages_returns_new_list_without_mutating_left():
+    caller = [{"role": "user", "content": "你好"}]
+    merged = append_messages(None, caller)
+    assert merged == caller and merged is not caller
+    again = append_messages(merged, [{"role": "assistant", "content": "您好"}])
+    assert again is not merged
+    assert len(merged) == 1 and len(caller) == 1
+    assert [m["role"] for m in again] == ["user", "assistant"]
+
+
+def test_append_messages_keeps_recent_window():
+    merged = append_messages(None, [{"role": "user", "content": str(i)} for i in range(MAX_STATE_MESSAGES)])
+    merged = append_messages(merged, [{"role": "assistant", "content": "last"}])
+    assert len(merged) == MAX_STATE_MESSAGES
+    assert merged[0]["content"] == "1" and merged[-1]["content"] == "last"
+
+
+def test_thinking_step_is_delta():
+    state = {"thinking_steps": ["识别用户意图：其他"]}
+    assert append_thinking_step(state, " 生成回复 ") == ["生成回复"]
+    assert append_thinking_step(state, "  ") == []
+    assert append_steps(state["thinking_steps"], ["生成回复"]) == ["识别用户意图：其他", "生成回复"]
+
+
+def test_replace_list_resets_channel():
+    merged = append_steps(None, ["上一轮"])
+    assert append_steps(merged, ReplaceList()) == []
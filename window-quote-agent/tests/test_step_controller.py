@@ -0,0 +1,47 @@
+"""Step controller：一次规划同时给出 should_end 与 next_node。"""
+import pytest
+
+from packages.agent.nodes.step_controller import _parse_step_response, step_controller
+from packages.agent.state import AgentState
+
+
+class _MockLLM:
+    def __init__(self, content: str):
+        self.content = content
+        self.calls = 0
+
+    def invoke(self, _messages):
+        self.calls += 1
+        return type("Resp", (), {"content": self.content})()
+
+
+def test_parse_step_response():
+    parsed = _parse_step_response('```json\n{"should_end": false, "next_node": "recommend"}\n```')
+    assert parsed == {"should_end": False, "next_node": "recommend", "task_split": False, "plan_tasks": []}
+    assert _parse_step_response('{"should_end": false, "next_node": "END"}')["next_node"] == ""
+    assert _parse_step_response("not json") is None
+
+
+def test_fallback_without_llm(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    done: AgentState = {"step": "generate_quote", "messages": []}
+    assert step_controller(done)["should_end"] is True
+    state: AgentState = {"step": "price_quote", "messages": []}
+    out = step_controller(state)
+    assert out["should_end"] is False
+    assert out["next_node"] == "generate_quote"
+
+
+def test_single_llm_call_decides_end_and_next():
+    pytest.importorskip("langchain_core")
+    llm = _MockLLM('{"should_end": false, "next_node": "price_quote"}')
+    state: AgentState = {"step": "recommend", "current_intent": "价格咨询", "messages": [{"role": "user", "content": "报价"}]}
+    out = step_controller(state, llm=llm)
+    assert llm.calls == 1
+    assert out["should_end"] is False
+    assert out["next_node"] == "price_quote"
+
+    llm_end = _MockLLM('{"should_end": true}')
+    out = step_controller(state, llm=llm_end)
+    assert out["should_end"] is True
+    assert "next_node" not in out
@@ -0,0 +1,38 @@
+"""确定性转移表：结论确定时 check / router 不调用 LLM，并记录节省的调用次数。"""
+import pytest
+
+from packages.agent.nodes.check_node import check_node
+from packages.agent.nodes.router import router_planner
+from packages.agent.policies.transitions import match_transition
+from packages.observability.metrics import metrics
+
+
+class _FailingLLM:
+    def invoke(self, _messages):
+        raise AssertionError("转移表已确定结论，不应调用 LLM")
+
+
+def test_match_transition():
+    assert match_transition({"step": "price_quote"}).next_node == "generate_quote"
+    assert match_transition({"step": "generate_quote"}).should_end is True
+    assert match_transition({"step": "collect_requirements"}).should_end is True
+    assert match_transition({"step": "collect_requirements", "requirements_ready": True}) is None
+    assert match_transition({"step": "chat"}) is None
+
+
+@pytest.mark.parametrize("step", ["generate_quote", "collect_requirements", "collect_recommend_params"])
+def test_check_skips_llm_when_turn_must_end(step):
+    out = check_node({"step": step, "messages": []}, llm=_FailingLLM())
+    assert out["should_end"] is True
+    assert out["llm_calls_saved"] == 1
+
+
+def test_price_quote_skips_check_and_router():
+    before = metrics.counter("planner_llm_calls_saved_total", node="router")
+    state = {"step": "price_quote", "messages": [], "requirements_ready": True}
+    checked = check_node(state, llm=_FailingLLM())
+    assert checked["should_end"] is False
+    planned = router_planner({**state, **checked}, llm=_FailingLLM())
+    assert planned["next_node"] == "generate_quote"
+    assert planned["llm_calls_saved"] == 2
+    assert metrics.counter("planner_llm_calls_saved_total", node="router") == before + 1